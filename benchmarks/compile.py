@@ -0,0 +1,119 @@
+import argparse
+import time
+
+import torch
+
+from laia.data import PaddingCollater
+from laia.engine.engine_module import compile_for_static_shapes
+from laia.engine.feeder import ImageFeeder
+from laia.losses import CTCLoss
+from laia.models.htr import LaiaCRNN
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--train", action="store_true", help="Time forward + backward")
+parser.add_argument("--num_batches", type=int, default=48)
+parser.add_argument("--batch_size", type=int, default=8)
+parser.add_argument(
+    "--width_buckets", type=int, nargs="+", default=[256, 384, 512, 768, 1024]
+)
+args = parser.parse_args()
+
+height, min_width, max_width = 64, 200, 1000
+
+
+def crnn():
+    torch.manual_seed(0)
+    return LaiaCRNN(
+        num_input_channels=1,
+        num_output_labels=80,
+        cnn_num_features=[16, 16, 32, 32],
+        cnn_kernel_size=[3] * 4,
+        cnn_stride=[1] * 4,
+        cnn_dilation=[1] * 4,
+        cnn_activation=[torch.nn.LeakyReLU] * 4,
+        cnn_poolsize=[2, 2, 2, 0],
+        cnn_dropout=[0.0] * 4,
+        cnn_batchnorm=[False] * 4,
+        image_sequencer="avgpool-16",
+        rnn_units=256,
+        rnn_layers=3,
+        rnn_dropout=0.5,
+        lin_dropout=0.5,
+    ).train(args.train)
+
+
+def step(model, x, y):
+    if args.train:
+        CTCLoss()(model(x), y).backward()
+    else:
+        with torch.no_grad():
+            model(x)
+
+
+def run(model, batches):
+    """Time of each batch, and whether it is the first one of its shape"""
+    shapes, times = set(), []
+    for x, y in batches:
+        shape = tuple(x.data.size())
+        start = time.perf_counter()
+        step(model, x, y)
+        times.append((time.perf_counter() - start, shape not in shapes))
+        shapes.add(shape)
+    return len(shapes), times
+
+
+def collate(collater, images):
+    return [
+        (
+            ImageFeeder()(collater(imgs)),
+            [[1 + i % 79 for i in range(img.size(2) // 32)] for img in imgs],
+        )
+        for imgs in images
+    ]
+
+
+torch.manual_seed(31102020)
+images = [
+    [
+        torch.rand(1, height, w)
+        for w in torch.randint(min_width, max_width + 1, (args.batch_size,))
+        .sort(descending=True)
+        .values.tolist()
+    ]
+    for _ in range(args.num_batches)
+]
+# the images of each batch are sorted by decreasing width
+batches = collate(PaddingCollater((1, height, None)), images)
+bucketed = collate(
+    PaddingCollater((1, height, None), width_buckets=args.width_buckets), images
+)
+
+print(
+    f"{torch.get_num_threads()} threads, {args.num_batches} batches of "
+    f"{args.batch_size} images of width {min_width}-{max_width}, "
+    f"{'forward + backward' if args.train else 'inference'}"
+)
+print(f"{'':<18}{'shapes':>8}{'compile (s)':>14}{'ms/batch':>10}{'speedup':>9}")
+baseline = None
+for name, compiled, data in (
+    ("eager", False, batches),
+    ("eager, buckets", False, bucketed),
+    ("compiled", True, batches),
+    ("compiled, buckets", True, bucketed),
+):
+    torch._dynamo.reset()
+    model = crnn()
+    if compiled:
+        compile_for_static_shapes(model)
+    else:
+        # warm up
+        step(model, *data[0])
+    num_shapes, times = run(model, data)
+    steady = [t for t, first in times if not first or not compiled]
+    steady = sum(steady) / len(steady)
+    compilation = sum(t - steady for t, first in times if first) if compiled else 0
+    baseline = baseline or steady
+    print(
+        f"{name:<18}{num_shapes:>8}{compilation:>14.1f}{1000 * steady:>10.1f}"
+        f"{baseline / steady:>8.2f}x"
+    )
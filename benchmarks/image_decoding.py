@@ -0,0 +1,44 @@
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from laia.data import ImageLoader
+from laia.data.image_directory_index import IMAGE_EXTENSIONS
+from laia.data.image_loader import IMAGE_BACKENDS
+from laia.data.transforms.vision import ToImageTensor
+
+n = 100
+height, width = 128, 2048
+
+
+def make_line_image(rng):
+    # dark strokes on a light, slightly noisy background
+    x = rng.normal(230, 10, size=(height, width))
+    for _ in range(60):
+        i, j = rng.integers(16, height - 16), rng.integers(0, width - 32)
+        x[i - 12 : i + 12, j : j + rng.integers(2, 32)] = rng.normal(40, 20)
+    return Image.fromarray(x.clip(0, 255).astype(np.uint8)).convert("RGB")
+
+
+def run(img_dir):
+    rng = np.random.default_rng(31102020)
+    img = make_line_image(rng)
+    transform = ToImageTensor(mode="L")
+    print(f"{n} images of {height}x{width} pixels, time per image in ms")
+    print(f"{'extension':<10}" + "".join(f"{b:>14}" for b in IMAGE_BACKENDS))
+    for ext in IMAGE_EXTENSIONS:
+        filepath = str(img_dir / f"img{ext}")
+        (img.convert("1") if ext == ".pbm" else img).save(filepath)
+        row = f"{ext:<10}"
+        for backend in IMAGE_BACKENDS:
+            loader = ImageLoader(backend, mode="L")
+            t = timeit.timeit(lambda: transform(loader(filepath)), number=n)
+            row += f"{1000 * t / n:>14.2f}"
+        print(row)
+
+
+with tempfile.TemporaryDirectory() as tmpdir:
+    run(Path(tmpdir))
@@ -0,0 +1,44 @@
+import timeit
+
+import torch
+
+from laia.nn.temporal_pyramid_maxpool_2d import (
+    _adaptive_maxpool_2d,
+    _adaptive_maxpool_2d_per_sample,
+)
+
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+n = 3
+channels, height, width = 32, 8, 256
+# levels of a PHOC model, as used by PyramidMaxPool2d
+output_sizes = [(2 ** (level - 1),) * 2 for level in (1, 2, 3, 4, 5)]
+
+
+def pyramid(f, x, xs):
+    y = torch.cat([f(x, s, xs).flatten(1) for s in output_sizes], dim=1)
+    y.sum().backward()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+
+
+torch.manual_seed(31102020)
+print(f"device: {device}, forward + backward time per batch in ms")
+print(f"{'batch size':<12}{'per sample':>12}{'batched':>12}{'speedup':>10}")
+for batch_size in (8, 16, 32, 64, 128, 256):
+    x = torch.randn(batch_size, channels, height, width, device=device)
+    x.requires_grad_()
+    xs = torch.stack(
+        (
+            torch.randint(height // 2, height + 1, (batch_size,)),
+            torch.randint(width // 4, width + 1, (batch_size,)),
+        ),
+        dim=1,
+    )
+    times = []
+    for f in (_adaptive_maxpool_2d_per_sample, _adaptive_maxpool_2d):
+        pyramid(f, x, xs)  # warm-up
+        times.append(1000 * timeit.timeit(lambda: pyramid(f, x, xs), number=n) / n)
+    print(
+        f"{batch_size:<12}{times[0]:>12.2f}{times[1]:>12.2f}"
+        f"{times[0] / times[1]:>9.2f}x"
+    )
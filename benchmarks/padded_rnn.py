@@ -0,0 +1,68 @@
+import timeit
+
+import torch
+
+from laia.data import PaddedTensor
+from laia.losses import CTCLoss
+from laia.models.htr import LaiaCRNN
+
+n = 3
+height, max_width = 64, 1024
+# widths of the images of a batch, sorted in decreasing order
+distributions = {
+    "uniform": lambda b: torch.randint(max_width // 4, max_width + 1, (b,)),
+    "skewed": lambda b: (max_width * torch.rand(b) ** 4).long().clamp(min=64),
+    "outlier": lambda b: torch.cat(
+        (torch.tensor([max_width]), torch.randint(96, 160, (b - 1,)))
+    ),
+    "equal": lambda b: torch.full((b,), max_width),
+}
+
+
+def crnn(padded_rnn):
+    torch.manual_seed(0)
+    return LaiaCRNN(
+        num_input_channels=1,
+        num_output_labels=80,
+        cnn_num_features=[16, 16, 32, 32],
+        cnn_kernel_size=[3] * 4,
+        cnn_stride=[1] * 4,
+        cnn_dilation=[1] * 4,
+        cnn_activation=[torch.nn.LeakyReLU] * 4,
+        cnn_poolsize=[2, 2, 2, 0],
+        cnn_dropout=[0.0] * 4,
+        cnn_batchnorm=[False] * 4,
+        image_sequencer="avgpool-16",
+        rnn_units=256,
+        rnn_layers=3,
+        rnn_dropout=0.5,
+        lin_dropout=0.5,
+        padded_rnn=padded_rnn,
+    )
+
+
+def step(model, x, y):
+    CTCLoss()(model(x), y).backward()
+
+
+models = [crnn(False), crnn(True)]
+torch.manual_seed(31102020)
+print(f"{torch.get_num_threads()} threads, forward + backward time per batch in ms")
+print(f"{'widths':<10}{'batch size':>12}{'packed':>12}{'padded':>12}{'speedup':>10}")
+for name, widths in distributions.items():
+    for batch_size in (8, 32):
+        ws = widths(batch_size).sort(descending=True).values
+        x = torch.rand(batch_size, 1, height, int(ws[0]))
+        xs = torch.stack((torch.full_like(ws, height), ws), dim=1)
+        y = [[1 + i % 79 for i in range(int(w) // 32)] for w in ws]
+        batch = PaddedTensor(x, xs)
+        times = []
+        for model in models:
+            step(model, batch, y)  # warm-up
+            times.append(
+                1000 * timeit.timeit(lambda: step(model, batch, y), number=n) / n
+            )
+        print(
+            f"{name:<10}{batch_size:>12}{times[0]:>12.2f}{times[1]:>12.2f}"
+            f"{times[0] / times[1]:>9.2f}x"
+        )
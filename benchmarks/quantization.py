@@ -0,0 +1,104 @@
+import argparse
+import copy
+import time
+
+import torch
+
+from laia.callbacks.meters import SequenceError
+from laia.common.loader import ModelLoader
+from laia.decoders import CTCGreedyDecoder
+from laia.engine import Compose, DataModule, ImageFeeder, ItemFeeder
+from laia.engine.engine_module import uint8_to_float
+from laia.models.htr import optimize_for_inference
+from laia.models.htr.quantization import quantize_conv_static, quantize_dynamic
+from laia.utils import SymbolsTable
+
+parser = argparse.ArgumentParser(
+    description=(
+        "Decode the same images with the float model and its int8 quantized "
+        "versions, and compare their CER and throughput"
+    )
+)
+parser.add_argument("syms", help="Symbols table")
+parser.add_argument("img_list", help="List of images to decode")
+parser.add_argument("img_dirs", nargs="+", help="Directories of the images")
+parser.add_argument("--train_path", default=".", help="Directory of the model")
+parser.add_argument("--model_filename", default="model")
+parser.add_argument("--checkpoint", required=True, help="Path of the checkpoint")
+parser.add_argument(
+    "--gt",
+    help=(
+        "Reference transcripts (text table: id followed by the symbols). "
+        "By default, the CER is computed against the float model's decoding"
+    ),
+)
+parser.add_argument("--batch_size", type=int, default=8)
+parser.add_argument("--calibration_batches", type=int, default=8)
+parser.add_argument("--num_threads", type=int, default=torch.get_num_threads())
+args = parser.parse_args()
+
+torch.set_num_threads(args.num_threads)
+syms = SymbolsTable(args.syms)
+loader = ModelLoader(args.train_path, filename=args.model_filename, device="cpu")
+model = optimize_for_inference(loader.load_by(args.checkpoint))
+
+# load the images once, so that only the model is timed
+data_module = DataModule(
+    syms=syms,
+    img_dirs=args.img_dirs,
+    te_img_list=args.img_list,
+    batch_size=args.batch_size,
+    min_valid_size=model.get_min_valid_image_size(4096),
+    stage="test",
+    uint8_pipeline=True,
+)
+data_module.setup(stage="test")
+batch_input_fn = Compose([ItemFeeder("img"), ImageFeeder()])
+batches = [
+    (batch["id"], uint8_to_float(batch_input_fn(batch)))
+    for batch in data_module.test_dataloader()
+]
+num_lines = sum(len(ids) for ids, _ in batches)
+
+
+def decode(model):
+    decoder = CTCGreedyDecoder()
+    hyps, elapsed = {}, 0.0
+    with torch.no_grad():
+        model(batches[0][1])  # warm-up
+        for ids, x in batches:
+            start = time.perf_counter()
+            y = model(x)
+            elapsed += time.perf_counter() - start
+            hyps.update(zip(ids, decoder(y)["hyp"]))
+    return hyps, num_lines / elapsed
+
+
+dynamic = quantize_dynamic(copy.deepcopy(model))
+static = quantize_conv_static(
+    quantize_dynamic(copy.deepcopy(model)),
+    (x for _, x in batches[: args.calibration_batches]),
+)
+results = {
+    name: decode(m)
+    for name, m in (("float", model), ("dynamic", dynamic), ("static", static))
+}
+if args.gt:
+    with open(args.gt, encoding="utf-8") as f:
+        lines = [l.split() for l in f if l.strip()]
+    refs = {line[0]: [syms[s] for s in line[1:]] for line in lines}
+else:
+    refs = results["float"][0]
+ids = sorted(results["float"][0])
+
+print(f"{num_lines} lines, batch size {args.batch_size}, {args.num_threads} threads")
+print(f"{'model':<10}{'lines/sec':>12}{'speedup':>10}{'CER (%)':>10}{'delta':>10}")
+float_cer = None
+for name, (hyps, lines_per_sec) in results.items():
+    cer = 100 * SequenceError.compute([refs[i] for i in ids], [hyps[i] for i in ids])
+    float_cer = cer if float_cer is None else float_cer
+    print(
+        f"{name:<10}{lines_per_sec:>12.2f}"
+        f"{lines_per_sec / results['float'][1]:>9.2f}x"
+        f"{cer:>10.2f}{cer - float_cer:>+10.2f}"
+    )
@@ -1,3 +1,5 @@
+from laia.callbacks.activation_checkpointing import ActivationCheckpointingReport
+from laia.callbacks.compiled_model_report import CompiledModelReport
 from laia.callbacks.decode import Decode
 from laia.callbacks.learning_rate import LearningRate
 from laia.callbacks.netout import Netout
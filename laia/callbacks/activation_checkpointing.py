@@ -0,0 +1,133 @@
+import time
+import weakref
+from typing import Any, Set, Tuple
+
+import pytorch_lightning as pl
+import torch
+from pytorch_lightning.utilities import rank_zero_only
+from pytorch_lightning.utilities.apply_func import move_data_to_device
+from torch.utils._python_dispatch import TorchDispatchMode
+from torch.utils._pytree import tree_flatten
+
+import laia.common.logging as log
+from laia.engine.engine_module import uint8_to_float
+
+_logger = log.get_logger(__name__)
+
+
+class _TensorTracker(TorchDispatchMode):
+    """Keep a weak reference to each tensor computed inside the context"""
+
+    def __init__(self):
+        super().__init__()
+        self.refs = []
+
+    def __torch_dispatch__(self, func, types, args=(), kwargs=None):
+        output = func(*args, **(kwargs or {}))
+        for tensor in tree_flatten(output)[0]:
+            if isinstance(tensor, torch.Tensor):
+                self.refs.append(weakref.ref(tensor))
+        return output
+
+    def alive_bytes(self, exclude: Set[int]) -> int:
+        storages = {}
+        for ref in self.refs:
+            tensor = ref()
+            if tensor is not None:
+                storage = tensor.untyped_storage()
+                if storage.data_ptr() not in exclude:
+                    storages[storage.data_ptr()] = storage.nbytes()
+        return sum(storages.values())
+
+
+def _backward(y: Any) -> None:
+    y = y if isinstance(y, torch.Tensor) else y.data
+    y.sum().backward()
+
+
+def measure_forward_backward(
+    model: torch.nn.Module, batch_x: Any
+) -> Tuple[int, float, int]:
+    """
+    Run the forward and backward passes of a model on a batch twice, and
+    return the size in bytes of the activations kept by the forward pass for
+    the backward pass, the elapsed time in seconds of the second run and, on
+    CUDA, its peak memory allocated in bytes (0 otherwise).
+    """
+    tracker = _TensorTracker()
+    with tracker:
+        y = model(batch_x)
+    parameters = {p.untyped_storage().data_ptr() for p in model.parameters()}
+    activations = tracker.alive_bytes(exclude=parameters)
+    _backward(y)
+    del y, tracker
+
+    device = next(model.parameters()).device
+    cuda = device.type == "cuda"
+    if cuda:
+        torch.cuda.synchronize(device)
+        torch.cuda.reset_peak_memory_stats(device)
+    start = time.perf_counter()
+    _backward(model(batch_x))
+    if cuda:
+        torch.cuda.synchronize(device)
+    elapsed = time.perf_counter() - start
+    peak = torch.cuda.max_memory_allocated(device) if cuda else 0
+    return activations, elapsed, peak
+
+
+class ActivationCheckpointingReport(pl.Callback):
+    """
+    Log the memory versus time trade-off of the activation checkpointing of a
+    model (see :meth:`~laia.models.htr.LaiaCRNN.set_activation_checkpointing`),
+    measured on the first training batch with and without it.
+
+    The parameters, their gradients and the running statistics of the model
+    are left as they were before the measurement.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.reported = False
+
+    @rank_zero_only
+    def on_train_batch_start(self, trainer, pl_module, batch, *args, **kwargs):
+        super().on_train_batch_start(trainer, pl_module, batch, *args, **kwargs)
+        if self.reported:
+            return
+        self.reported = True
+        model = pl_module.model
+        batch_x, _ = pl_module.prepare_batch(batch)
+        batch_x = uint8_to_float(move_data_to_device(batch_x, pl_module.device))
+        conv_blocks, rnn = model.checkpoint_conv_blocks, model.checkpoint_rnn
+        grads = [p.grad for p in model.parameters()]
+        buffers = [b.clone() for b in model.buffers()]
+        devices = [pl_module.device] if pl_module.device.type == "cuda" else []
+
+        with torch.random.fork_rng(devices=devices):
+            model.set_activation_checkpointing()
+            saved, elapsed, peak = measure_forward_backward(model, batch_x)
+            model.set_activation_checkpointing(conv_blocks, rnn=rnn)
+            ckpt_saved, ckpt_elapsed, ckpt_peak = measure_forward_backward(
+                model, batch_x
+            )
+
+        for p, grad in zip(model.parameters(), grads):
+            p.grad = grad
+        with torch.no_grad():
+            for b, value in zip(model.buffers(), buffers):
+                b.copy_(value)
+
+        msg = (
+            "Activation checkpointing on the first training batch: "
+            f"saved activations {saved / 2**20:.1f}MiB -> "
+            f"{ckpt_saved / 2**20:.1f}MiB ({ckpt_saved / saved - 1:+.0%}), "
+            f"forward + backward time {1000 * elapsed:.0f}ms -> "
+            f"{1000 * ckpt_elapsed:.0f}ms ({ckpt_elapsed / elapsed - 1:+.0%})"
+        )
+        if peak:
+            msg += (
+                f", peak GPU memory {peak / 2**20:.1f}MiB -> "
+                f"{ckpt_peak / 2**20:.1f}MiB ({ckpt_peak / peak - 1:+.0%})"
+            )
+        _logger.info(msg)
@@ -0,0 +1,117 @@
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Set, Tuple
+
+import pytorch_lightning as pl
+from pytorch_lightning.utilities import rank_zero_only
+
+import laia.common.logging as log
+
+_logger = log.get_logger(__name__)
+
+
+class _StageStats:
+    def __init__(self):
+        self.shapes: Set[Tuple[int, ...]] = set()
+        # time of the first batch of each shape, which includes its compilation
+        self.first: List[float] = []
+        self.other: List[float] = []
+        self.start = None
+        self.new_shape = False
+
+    def batch_start(self, shape: Tuple[int, ...]) -> None:
+        self.new_shape = shape not in self.shapes
+        self.shapes.add(shape)
+        self.start = time.perf_counter()
+
+    def batch_end(self) -> None:
+        if self.start is None:
+            return
+        elapsed = time.perf_counter() - self.start
+        (self.first if self.new_shape else self.other).append(elapsed)
+        self.start = None
+
+    def __str__(self) -> str:
+        msg = f"{len(self.shapes)} distinct input shapes"
+        if not self.other:
+            return msg + f", {sum(self.first):.1f}s in the first batch of each shape"
+        steady = sum(self.other) / len(self.other)
+        compilation = sum(max(t - steady, 0.0) for t in self.first)
+        return (
+            msg + f", compilation time {compilation:.1f}s, "
+            f"steady-state time {1000 * steady:.1f}ms per batch "
+            f"({len(self.other)} batches)"
+        )
+
+
+class CompiledModelReport(pl.Callback):
+    """
+    Log the number of distinct input shapes seen by a compiled model (see
+    :func:`~laia.engine.engine_module.compile_for_static_shapes`), which is
+    compiled again for each of them, the time spent compiling it, estimated
+    from the time of the first batch of each shape, and the time per batch
+    of the other batches.
+
+    The training and validation batches are reported at the end of the
+    training, and the test batches at the end of the test.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.stats: Dict[str, _StageStats] = defaultdict(_StageStats)
+
+    @staticmethod
+    def input_shape(pl_module: pl.LightningModule, batch: Any) -> Tuple[int, ...]:
+        if hasattr(pl_module, "prepare_batch"):
+            batch_x, _ = pl_module.prepare_batch(batch)
+        else:
+            batch_x = pl_module.batch_input_fn(batch)
+        return tuple(getattr(batch_x, "data", batch_x).size())
+
+    def batch_start(self, stage: str, pl_module: pl.LightningModule, batch: Any):
+        self.stats[stage].batch_start(self.input_shape(pl_module, batch))
+
+    def report(self, *stages: str) -> None:
+        for stage in stages:
+            if stage in self.stats:
+                _logger.info("Compiled model, {} batches: {}", stage, self.stats[stage])
+
+    @rank_zero_only
+    def on_train_batch_start(self, trainer, pl_module, batch, *args, **kwargs):
+        super().on_train_batch_start(trainer, pl_module, batch, *args, **kwargs)
+        self.batch_start("training", pl_module, batch)
+
+    @rank_zero_only
+    def on_train_batch_end(self, *args, **kwargs):
+        super().on_train_batch_end(*args, **kwargs)
+        self.stats["training"].batch_end()
+
+    @rank_zero_only
+    def on_validation_batch_start(self, trainer, pl_module, batch, *args, **kwargs):
+        super().on_validation_batch_start(trainer, pl_module, batch, *args, **kwargs)
+        self.batch_start("validation", pl_module, batch)
+
+    @rank_zero_only
+    def on_validation_batch_end(self, *args, **kwargs):
+        super().on_validation_batch_end(*args, **kwargs)
+        self.stats["validation"].batch_end()
+
+    @rank_zero_only
+    def on_test_batch_start(self, trainer, pl_module, batch, *args, **kwargs):
+        super().on_test_batch_start(trainer, pl_module, batch, *args, **kwargs)
+        self.batch_start("test", pl_module, batch)
+
+    @rank_zero_only
+    def on_test_batch_end(self, *args, **kwargs):
+        super().on_test_batch_end(*args, **kwargs)
+        self.stats["test"].batch_end()
+
+    @rank_zero_only
+    def on_train_end(self, *args, **kwargs):
+        super().on_train_end(*args, **kwargs)
+        self.report("training", "validation")
+
+    @rank_zero_only
+    def on_test_end(self, *args, **kwargs):
+        super().on_test_end(*args, **kwargs)
+        self.report("test")
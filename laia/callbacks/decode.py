@@ -6,7 +6,7 @@ from tqdm.auto import tqdm
 
 import laia.common.logging as log
 from laia.common.arguments import ReadingOrder
-from laia.data.transforms.text import tokenize, untokenize
+from laia.data.transforms.text import Tokenizer
 from laia.decoders import CTCGreedyDecoder
 from laia.utils import SymbolsTable
 
@@ -67,6 +67,15 @@ class Decode(pl.Callback):
         self.print_line_confidence_scores = print_line_confidence_scores
         self.print_word_confidence_scores = print_word_confidence_scores
         self.reading_order = reading_order
+        # the tokenizer of the symbols is only needed to reorder RTL lines
+        self.tokenizer = (
+            Tokenizer(
+                syms.values() if isinstance(syms, dict) else syms,
+                space_token=input_space,
+            )
+            if self.reading_order == ReadingOrder.RTL and use_symbols
+            else None
+        )
 
         if self.reading_order == ReadingOrder.RTL and not convert_spaces:
             # cannot use get_display() if convert_spaces is False
@@ -105,9 +114,9 @@ class Decode(pl.Callback):
         for i, (img_id, hyp) in enumerate(zip(img_ids, hyps)):
             if self.use_symbols:
                 hyp = [self.syms[v] for v in hyp]
-                if self.reading_order == ReadingOrder.RTL:
-                    hyp = get_display(untokenize(" ".join(hyp)))
-                    hyp = tokenize(hyp).split(" ")
+                if self.tokenizer is not None:
+                    hyp = get_display(self.tokenizer.untokenize(" ".join(hyp)))
+                    hyp = self.tokenizer.tokenize(hyp).split(" ")
 
                 if self.convert_spaces:
                     hyp = [
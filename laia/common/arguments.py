@@ -96,6 +96,9 @@ class CreateCRNNArgs:
         rnn_dropout: Dropout probability at the input of each recurrent layer
         rnn_type: Type of recurrent layer. From `torch.nn`
         lin_dropout: Dropout probability at the input of the final linear layer
+        padded_rnn: Whether to run the recurrent layers on padded sequences,
+            masking the frames after the length of each sequence, instead of
+            packing them
     """
 
     num_input_channels: PositiveInt = 1
@@ -123,6 +126,7 @@ class CreateCRNNArgs:
     rnn_dropout: ClosedUnitInterval = 0.5
     rnn_type: str = "LSTM"
     lin_dropout: ClosedUnitInterval = 0.5
+    padded_rnn: bool = False
 
     def __post_init__(self):
         dimensions = map(
@@ -181,6 +185,43 @@ class DataArgs:
         batch_size: Batch size
         color_mode: L (grayscale): 1 channel, RGB: 3 channels, RGBA: 4 channels
         num_workers: Number of worker processes created in dataloaders
+        reading_order: Reading order of the input lines: LTR (Left-to-Right)
+            or RTL (Right-to-Left)
+        bucketing: Whether to group images of similar size in the same batches
+            to reduce padding
+        num_buckets: Number of size buckets used when `bucketing` or
+            `max_batch_pixels` is set
+        max_batch_pixels: If set, the number of images in a batch is not fixed
+            but limited by the number of pixels of the padded batch.
+            Images are bucketed by size and `batch_size` is ignored
+        index_cache_dir: If set, the listing of the image directories and the
+            encoded transcripts are cached in this directory and reused until
+            they are modified
+        img_cache_size: If set, the decoded training and validation images are
+            cached in `img_cache_dir` up to this number of bytes. The cache is
+            shared by all the processes of a host. It is not used to decode
+        img_cache_dir: Directory of the decoded image cache. It should be in a
+            memory-backed filesystem. Modified images are decoded again
+        streaming: Whether to read the list of images to decode lazily (use
+            "/dev/stdin" to read it from stdin). The images are decoded as soon as they
+            are listed, but the dataset statistics are not computed
+        uint8_pipeline: Whether to keep the images as uint8 in the dataloaders,
+            which makes the batches 4 times smaller. They are converted to
+            float in the model device
+        fixed_height: If set, the images are resized to this height when
+            loaded, keeping their aspect ratio unless `fixed_width` is also set.
+            Large JPEG images are decoded at a reduced scale
+        fixed_width: If set, the images are resized to this width when
+            loaded, keeping their aspect ratio unless `fixed_height` is also set
+        image_backend: Library decoding the images. "torchvision" decodes JPEG
+            and 8-bit grayscale or RGB PNG images directly in `color_mode`
+            (except RGBA) and falls back to "pil" for the other images. JPEG
+            images are only decoded at a reduced scale by "pil"
+        width_buckets: If set, the width of the padded batches is rounded up
+            to the smallest of these widths that fits the batch, or to a
+            multiple of the largest one, so the batches take a small set of
+            shapes. Useful with a compiled model, which is compiled again for
+            each new shape
     """
 
     class ColorMode(str, Enum):
@@ -188,10 +229,26 @@ class DataArgs:
         RGB = "RGB"
         RGBA = "RGBA"
 
+    class ImageBackend(str, Enum):
+        pil = "pil"
+        torchvision = "torchvision"
+
     batch_size: PositiveInt = 8
     color_mode: ColorMode = ColorMode.L
     num_workers: Optional[int] = None
     reading_order: ReadingOrder = ReadingOrder.LTR
+    bucketing: bool = False
+    num_buckets: PositiveInt = 10
+    max_batch_pixels: Optional[PositiveInt] = None
+    index_cache_dir: Optional[str] = None
+    img_cache_size: Optional[PositiveInt] = None
+    img_cache_dir: str = "/dev/shm/pylaia-img-cache"
+    streaming: bool = False
+    uint8_pipeline: bool = False
+    fixed_height: Optional[PositiveInt] = None
+    fixed_width: Optional[PositiveInt] = None
+    image_backend: ImageBackend = ImageBackend.pil
+    width_buckets: Optional[List[PositiveInt]] = None
 
 
 @dataclass
@@ -218,6 +275,24 @@ class TrainArgs:
         gpu_stats: Whether to include GPU stats in the training progress bar
         augment_training: Whether to use dynamic distortions to augment
             the training data
+        batched_augmentation: Whether to apply the distortions of
+            `augment_training` to whole batches in the model device, instead
+            of to each image in the dataloader workers
+        log_to_wandb: Whether to log training metrics and parameters to
+            Weights & Biases
+        pixels_per_step: If set with `data.max_batch_pixels`, accumulate the
+            gradients of several batches to process approximately this number
+            of pixels per optimizer step. It sets
+            `trainer.accumulate_grad_batches`, which must not be set
+        activation_checkpointing: If positive, recompute the activations of
+            groups of this number of consecutive convolutional blocks during
+            the backward pass instead of saving them, which reduces the memory
+            used by the training at the cost of some training time
+        activation_checkpointing_rnn: Whether to also recompute the
+            activations of the recurrent layers during the backward pass
+        compile_model: Whether to compile the model with `torch.compile`. It
+            is compiled again for each new input shape, see
+            `data.width_buckets`
     """
 
     delimiters: Optional[List[str]] = field(default_factory=lambda: ["<space>"])
@@ -228,7 +303,41 @@ class TrainArgs:
     early_stopping_patience: NonNegativeInt = 20
     gpu_stats: bool = False
     augment_training: bool = False
+    batched_augmentation: bool = False
     log_to_wandb: bool = False
+    pixels_per_step: Optional[PositiveInt] = None
+    activation_checkpointing: NonNegativeInt = 0
+    activation_checkpointing_rnn: bool = False
+    compile_model: bool = False
+
+
+@dataclass
+class DistillArgs:
+    """Distillation arguments
+
+    Args:
+        teacher_train_path: Directory of the teacher model
+        teacher_model_filename: Filename of the teacher model
+        teacher_experiment_dirname: Directory name of the teacher checkpoints,
+            inside `teacher_train_path`
+        teacher_checkpoint: Checkpoint of the teacher, see `common.checkpoint`.
+            If not set, the best checkpoint of `teacher_experiment_dirname`
+        teacher_matrix: Path of a Kaldi's archive with the output matrices of
+            the teacher for the training images, written by
+            `pylaia-htr-netout`. If set, it is used instead of running the
+            teacher model
+        alpha: Weight of the KL divergence to the teacher's frame posteriors.
+            The CTC loss is weighted by `1 - alpha`
+        temperature: Temperature of the softmax of the teacher and the student
+    """
+
+    teacher_train_path: str = ""
+    teacher_model_filename: str = "model"
+    teacher_experiment_dirname: str = "experiment"
+    teacher_checkpoint: Optional[str] = None
+    teacher_matrix: Optional[str] = None
+    alpha: ClosedUnitInterval = 0.5
+    temperature: PositiveFloat = 1.0
 
 
 @dataclass
@@ -323,12 +432,41 @@ class DecodeArgs:
             (`input_space` -> `output_space`)
         segmentation: Print this kind of segmentation instead of decoding.
         temperature: Temperature scalar parameter.
+        optimize_model: Whether to optimize the model for inference before
+            decoding, e.g. by folding the batch normalizations into the
+            convolutions
+        exported_model: If set, path of a TorchScript (".pt") or ONNX (".onnx")
+            model exported by pylaia-htr-export, which is used instead of the
+            model and its checkpoint. It is run on CPU, without the trainer,
+            so the trainer options and `optimize_model` are ignored. It cannot
+            be used with `quantize`, `chunk_width` or GPUs
+        quantize: If set, quantize the model to int8 for CPU decoding. With
+            "dynamic", the LSTM, GRU and Linear layers are quantized when the
+            model is loaded. With "static", the convolutional blocks are also
+            statically quantized, calibrated on the first batches to decode.
+            "static" cannot be used with streamed images. It cannot be used
+            with GPUs
+        quantize_calibration_batches: Number of batches used to calibrate the
+            statically quantized convolutional blocks
+        chunk_width: If set, the images wider than this number of pixels are
+            decoded in overlapping windows of this width, whose frames are
+            stitched back together
+        chunk_context: Number of frames discarded at each border of the
+            windows, on top of those affected by the borders, to give some
+            context to the recurrent layers
+        compile_model: Whether to compile the model with `torch.compile`. It
+            is compiled again for each new input shape, see
+            `data.width_buckets`
     """
 
     class Segmentation(str, Enum):
         char = "char"
         word = "word"
 
+    class Quantization(str, Enum):
+        dynamic = "dynamic"
+        static = "static"
+
     include_img_ids: bool = True
     separator: str = " "
     join_string: Optional[str] = " "
@@ -347,6 +485,13 @@ class DecodeArgs:
     lexicon_path: str = None
     unk_token: str = "<unk>"
     blank_token: str = "<ctc>"
+    optimize_model: bool = True
+    exported_model: Optional[str] = None
+    quantize: Optional[Quantization] = None
+    quantize_calibration_batches: PositiveInt = 8
+    chunk_width: Optional[PositiveInt] = None
+    chunk_context: NonNegativeInt = 32
+    compile_model: bool = False
 
 
 @dataclass
@@ -363,6 +508,12 @@ class NetoutArgs:
         lattice: Path of the Kaldi's archive containing the output lattices
             (one for each sample), representing the CTC output
         digits: Number of digits to be used for formatting
+        optimize_model: Whether to optimize the model for inference before
+            running it, e.g. by folding the batch normalizations into the
+            convolutions
+        compile_model: Whether to compile the model with `torch.compile`. It
+            is compiled again for each new input shape, see
+            `data.width_buckets`
     """
 
     class OutputTransform(str, Enum):
@@ -373,3 +524,29 @@ class NetoutArgs:
     matrix: Optional[str] = None
     lattice: Optional[str] = None
     digits: NonNegativeInt = 10
+    optimize_model: bool = True
+    compile_model: bool = False
+
+
+@dataclass
+class ExportArgs:
+    """Export arguments
+
+    Args:
+        model_filename: Filename of the exported model, written in `train_path`.
+            The extension of each format is added to it
+        formats: Formats of the exported model. "pylaia": a model file and its
+            weights (".ckpt"), "torchscript": a TorchScript graph (".pt"),
+            "onnx": an ONNX graph (".onnx"). The graphs take a batch of images
+            and their widths, and return the logits and the output lengths
+        onnx_opset: ONNX opset version of the "onnx" format
+    """
+
+    class Format(str, Enum):
+        pylaia = "pylaia"
+        torchscript = "torchscript"
+        onnx = "onnx"
+
+    model_filename: str = "model_inference"
+    formats: List[Format] = field(default_factory=lambda: [ExportArgs.Format.pylaia])
+    onnx_opset: PositiveInt = 17
@@ -14,6 +14,7 @@ from pytorch_lightning.callbacks.model_checkpoint import ModelCheckpoint
 
 from laia.common.arguments import Layer
 from laia.common.logging import get_logger
+from laia.models.htr.quantization import quantize_dynamic
 from laia.utils import SymbolsTable
 
 _logger = get_logger(__name__)
@@ -111,12 +112,19 @@ class ModelLoader(ObjectLoader):
             return
         return ns.natsorted(matches, key=key, reverse=reverse, alg=ns.ns.PATH)[0]
 
-    def load_by(self, checkpoint: str) -> Optional[torch.nn.Module]:
+    def load_by(
+        self, checkpoint: str, quantize: bool = False
+    ) -> Optional[torch.nn.Module]:
         _logger.info('Using checkpoint "{}"', checkpoint)
         model = self.load()
         if model is not None:
             state_dict = self.get_model_state_dict(checkpoint)
             model.load_state_dict(state_dict)
+            if quantize:
+                model = quantize_dynamic(model)
+                _logger.info(
+                    "Quantized the recurrent and linear layers of the model to int8"
+                )
         return model
 
     @staticmethod
@@ -1,5 +1,14 @@
+from laia.data.bucketing_batch_sampler import (
+    BucketingBatchSampler,
+    PixelBudgetBatchSampler,
+)
 from laia.data.image_dataset import ImageDataset
 from laia.data.image_from_list_dataset import ImageFromListDataset
+from laia.data.image_loader import ImageLoader
+from laia.data.image_stream_dataset import ImageIdStreamSampler, ImageStreamDataset
+from laia.data.packed_image_dataset import PackedImageDataset
 from laia.data.padding_collater import PaddedTensor, PaddingCollater
+from laia.data.shared_image_cache import SharedImageCache
+from laia.data.string_array import StringArray
 from laia.data.text_image_dataset import TextImageDataset
 from laia.data.text_image_from_text_table_dataset import TextImageFromTextTableDataset
@@ -0,0 +1,247 @@
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import Sampler
+
+import laia.common.logging as log
+
+_logger = log.get_logger(__name__)
+
+
+class BucketingBatchSampler(Sampler):
+    """Batch sampler which groups images of similar size.
+
+    The indices given by ``sampler`` are sorted by image height and width and
+    split into ``num_buckets`` buckets with the same number of samples.
+    Batches are built within each bucket, so the images of a batch have
+    similar sizes and :class:`~laia.data.PaddingCollater` adds little padding.
+    If ``shuffle`` is set, samples are shuffled within each bucket and batches
+    are shuffled across buckets every epoch.
+
+    The padding ratio of the batches (fraction of the collated pixels which
+    are padding) is computed from the image sizes and logged every epoch,
+    together with the ratio obtained without bucketing.
+
+    Args:
+        sampler: Sampler of the dataset indices to batch.
+        sizes: Size (height, width) of each image in the dataset.
+        batch_size: Maximum number of samples in a batch.
+        num_buckets: Number of buckets.
+        shuffle: Whether to shuffle the samples and the batches every epoch.
+        drop_last: Whether to drop the last incomplete batch of each bucket.
+        seed: Seed used for shuffling. If None, it is drawn from PyTorch's
+            default generator.
+    """
+
+    def __init__(
+        self,
+        sampler: Iterable[int],
+        sizes: Sequence[Tuple[int, int]],
+        batch_size: int = 8,
+        num_buckets: int = 10,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        assert batch_size > 0
+        assert num_buckets > 0
+        self.sampler = sampler
+        sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+        self.heights, self.widths = sizes[:, 0], sizes[:, 1]
+        self.batch_size = batch_size
+        self.num_buckets = num_buckets
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = (
+            int(torch.empty((), dtype=torch.int64).random_().item())
+            if seed is None
+            else seed
+        )
+        self.epoch = 0
+        self.padding_ratio = None
+
+    def get_buckets(self, indices: List[int]) -> List[np.ndarray]:
+        indices = np.asarray(indices, dtype=np.int64)
+        # sort by height and then by width
+        order = np.lexsort((self.widths[indices], self.heights[indices]))
+        num_buckets = min(self.num_buckets, max(len(indices), 1))
+        return np.array_split(indices[order], num_buckets)
+
+    def get_bucket_batches(self, bucket: np.ndarray) -> List[List[int]]:
+        batches = [
+            bucket[i : i + self.batch_size].tolist()
+            for i in range(0, len(bucket), self.batch_size)
+        ]
+        if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+            batches.pop()
+        return batches
+
+    def get_batches(self, indices: List[int], epoch: int) -> List[List[int]]:
+        g = torch.Generator()
+        g.manual_seed(self.seed + epoch)
+        batches = []
+        for bucket in self.get_buckets(indices):
+            if self.shuffle:
+                bucket = bucket[torch.randperm(len(bucket), generator=g).numpy()]
+            batches.extend(self.get_bucket_batches(bucket))
+        if self.shuffle:
+            batches = [
+                batches[i] for i in torch.randperm(len(batches), generator=g).tolist()
+            ]
+        return batches
+
+    def compute_padding_ratio(self, batches: List[List[int]]) -> float:
+        """Fraction of padding pixels after collating the given batches"""
+        batches = [b for b in batches if b]
+        if not batches:
+            return 0.0
+        indices = np.concatenate(batches)
+        starts = np.cumsum([0] + [len(b) for b in batches[:-1]])
+        heights, widths = self.heights[indices], self.widths[indices]
+        max_heights = np.maximum.reduceat(heights, starts)
+        max_widths = np.maximum.reduceat(widths, starts)
+        counts = np.diff(np.append(starts, len(indices)))
+        padded = (counts * max_heights * max_widths).sum()
+        return 1.0 - (heights * widths).sum() / padded if padded else 0.0
+
+    def get_indices(self) -> List[int]:
+        if hasattr(self.sampler, "set_epoch"):
+            # e.g. a DistributedSampler, which shuffles based on the epoch
+            self.sampler.set_epoch(self.epoch)
+        return list(self.sampler)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        indices = self.get_indices()
+        batches = self.get_batches(indices, self.epoch)
+        self.padding_ratio = self.compute_padding_ratio(batches)
+        # padding obtained by batching the sampler indices in order
+        unbucketed_ratio = self.compute_padding_ratio(
+            self.get_bucket_batches(np.asarray(indices, dtype=np.int64))
+        )
+        _logger.info(
+            "Epoch {} batches padding ratio: {:.2%} (without bucketing: {:.2%})",
+            self.epoch,
+            self.padding_ratio,
+            unbucketed_ratio,
+        )
+        self.epoch += 1
+        yield from batches
+
+    def __len__(self) -> int:
+        n = len(self.sampler)
+        num_buckets = min(self.num_buckets, max(n, 1))
+        bucket_lens = [len(b) for b in np.array_split(np.arange(n), num_buckets)]
+        if self.drop_last:
+            return sum(b // self.batch_size for b in bucket_lens)
+        return sum(-(-b // self.batch_size) for b in bucket_lens)
+
+
+class PixelBudgetBatchSampler(BucketingBatchSampler):
+    """Bucketing batch sampler with a variable number of samples per batch.
+
+    Instead of using a fixed batch size, the samples of each bucket are packed
+    in a batch until the number of pixels of the collated (padded) batch
+    would exceed ``max_batch_pixels``. Batches of small images contain many
+    samples while batches of large images contain few, keeping the memory
+    usage of each batch roughly constant. An image larger than the budget is
+    put alone in its batch.
+
+    The batches depend on the shuffling, so they are computed (and cached)
+    when the length of the sampler is requested.
+
+    In distributed training, each process must run the same number of
+    batches, which packing the shard of each process would not guarantee.
+    Instead, with ``num_replicas > 1``, every process batches all the indices
+    given by ``sampler`` with the same ``seed``, the batches are padded by
+    repeating the first ones (or truncated if ``drop_last``) to a multiple of
+    ``num_replicas``, and each process takes every ``num_replicas``-th batch
+    starting at ``rank``.
+
+    Args:
+        sampler: Sampler of the dataset indices to batch.
+        sizes: Size (height, width) of each image in the dataset.
+        max_batch_pixels: Maximum number of pixels of a padded batch.
+        batch_size: Maximum number of samples in a batch. If None, the
+            number of samples is only limited by ``max_batch_pixels``.
+        num_buckets: Number of buckets.
+        shuffle: Whether to shuffle the samples and the batches every epoch.
+        drop_last: Whether to drop the last batch of each bucket.
+        seed: Seed used for shuffling. If None, it is drawn from PyTorch's
+            default generator. It must be the same in all the processes.
+        num_replicas: Number of distributed processes.
+        rank: Rank of the current process.
+    """
+
+    def __init__(
+        self,
+        sampler: Iterable[int],
+        sizes: Sequence[Tuple[int, int]],
+        max_batch_pixels: int,
+        batch_size: Optional[int] = None,
+        num_buckets: int = 10,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: Optional[int] = None,
+        num_replicas: int = 1,
+        rank: int = 0,
+    ) -> None:
+        assert max_batch_pixels > 0
+        assert 0 <= rank < num_replicas
+        super().__init__(
+            sampler,
+            sizes,
+            batch_size=batch_size or 1,
+            num_buckets=num_buckets,
+            shuffle=shuffle,
+            drop_last=drop_last,
+            seed=seed,
+        )
+        self.batch_size = batch_size
+        self.max_batch_pixels = max_batch_pixels
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self._cache = None
+
+    def get_bucket_batches(self, bucket: np.ndarray) -> List[List[int]]:
+        batches, batch = [], []
+        max_height, max_width = 0, 0
+        for i, height, width in zip(
+            bucket.tolist(),
+            self.heights[bucket].tolist(),
+            self.widths[bucket].tolist(),
+        ):
+            height, width = max(max_height, height), max(max_width, width)
+            if batch and (
+                (len(batch) + 1) * height * width > self.max_batch_pixels
+                or len(batch) == self.batch_size
+            ):
+                batches.append(batch)
+                batch = []
+                height, width = self.heights[i], self.widths[i]
+            batch.append(i)
+            max_height, max_width = height, width
+        if batch and not self.drop_last:
+            batches.append(batch)
+        return batches
+
+    def get_batches(self, indices: List[int], epoch: int) -> List[List[int]]:
+        # the sampler yields the same indices within an epoch, so the
+        # batches computed by __len__ can be reused by __iter__
+        if self._cache is None or self._cache[0] != epoch:
+            self._cache = epoch, self.shard(super().get_batches(indices, epoch))
+        return self._cache[1]
+
+    def shard(self, batches: List[List[int]]) -> List[List[int]]:
+        """Batches of the current process, the same number in all of them"""
+        if self.num_replicas == 1:
+            return batches
+        if self.drop_last:
+            batches = batches[: len(batches) - len(batches) % self.num_replicas]
+        else:
+            padding = -len(batches) % self.num_replicas
+            batches = batches + (batches * padding)[:padding]
+        return batches[self.rank :: self.num_replicas]
+
+    def __len__(self) -> int:
+        return len(self.get_batches(self.get_indices(), self.epoch))
@@ -0,0 +1,67 @@
+import heapq
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+from torch.utils.data import Dataset
+from torch.utils.data.distributed import DistributedSampler
+
+
+class CostBalancedDistributedSampler(DistributedSampler):
+    """Distributed sampler which splits the dataset into shards with similar
+    total cost (e.g. number of pixels) instead of round-robin.
+
+    The samples are assigned from the most to the least costly to the shard
+    with the lowest total cost so far (longest processing time first), so no
+    process gets most of the expensive samples. Like
+    :class:`~laia.data.unpadded_distributed_sampler.UnpaddedDistributedSampler`,
+    it is deterministic, does not repeat samples and the number of samples
+    of each process can differ, so it is meant for validation and testing.
+    Each shard yields its indices in increasing order, so it can be combined
+    with a :class:`~laia.data.BucketingBatchSampler`.
+
+    Args:
+        dataset: Dataset to sample from.
+        costs: Cost of each sample of the dataset.
+        num_replicas: Number of processes.
+        rank: Rank of the current process.
+
+    Example::
+        >>> costs = [h * w for h, w in img_sizes]
+        >>> sampler = CostBalancedDistributedSampler(dataset, costs)
+        >>> loader = DataLoader(dataset, sampler=sampler)
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        costs: Sequence[float],
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+    ) -> None:
+        super().__init__(dataset, num_replicas=num_replicas, rank=rank, shuffle=False)
+        assert len(costs) == len(dataset)
+        self.total_size = len(dataset)
+        self.shards = self.split(costs, self.num_replicas)
+        self.num_samples = len(self.shards[self.rank])
+        # If any process has at least one batch, every other process needs to
+        # have at least one batch, or the DistributedDataParallel could lock up.
+        assert self.num_samples >= 1 or self.total_size == 0
+
+    @staticmethod
+    def split(costs: Sequence[float], num_shards: int) -> List[List[int]]:
+        """Split the indices of the samples into shards with similar total
+        cost. Each shard gets a sample before any shard gets a second one"""
+        costs = np.asarray(costs, dtype=np.float64)
+        # stable sort, so equal costs are assigned in order
+        order = np.argsort(-costs, kind="stable")
+        shards = [[] for _ in range(num_shards)]
+        # (total cost, number of samples, rank) of each shard
+        heap = [(0.0, 0, rank) for rank in range(num_shards)]
+        for i in order.tolist():
+            total, num_samples, rank = heapq.heappop(heap)
+            shards[rank].append(i)
+            heapq.heappush(heap, (total + costs[i], num_samples + 1, rank))
+        return [sorted(shard) for shard in shards]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.shards[self.rank])
@@ -0,0 +1,115 @@
+import hashlib
+import os
+from os.path import isfile, join
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Union
+
+import numpy as np
+
+import laia.common.logging as log
+
+_logger = log.get_logger(__name__)
+
+
+class EncodedTexts:
+    """Transcripts encoded once, stored as a flat array with the symbol values
+    of all the transcripts and the offset of each transcript in it.
+
+    Symbols missing from the symbols table are stored as -1 and returned as
+    None, like the text transform does.
+
+    Args:
+        values: Symbol values of all the transcripts (int32).
+        offsets: Offset of each transcript in ``values``, followed by the
+            total number of values.
+    """
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray) -> None:
+        assert values.ndim == 1 and offsets.ndim == 1
+        assert len(offsets) > 0 and offsets[-1] == len(values)
+        self.values = values
+        self.offsets = offsets
+        # transcripts with symbols missing from the symbols table
+        unknown = np.searchsorted(offsets, np.flatnonzero(values < 0), side="right")
+        self.unknown = set((unknown - 1).tolist())
+
+    @classmethod
+    def encode(
+        cls, txts: Sequence[str], txt_transform: Callable[[str], List[int]]
+    ) -> "EncodedTexts":
+        encoded = [txt_transform(txt) for txt in txts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in encoded], out=offsets[1:])
+        values = np.fromiter(
+            (-1 if v is None else v for x in encoded for v in x),
+            dtype=np.int32,
+            count=int(offsets[-1]),
+        )
+        return cls(values, offsets)
+
+    @classmethod
+    def load(cls, filepath: Union[str, Path]) -> "EncodedTexts":
+        with np.load(str(filepath)) as f:
+            return cls(f["values"], f["offsets"])
+
+    def save(self, filepath: Union[str, Path]) -> None:
+        tmp_filepath = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "wb") as f:
+            np.savez(f, values=self.values, offsets=self.offsets)
+        os.replace(tmp_filepath, filepath)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> List[Optional[int]]:
+        values = self.values[self.offsets[index] : self.offsets[index + 1]].tolist()
+        if index in self.unknown:
+            return [None if v < 0 else v for v in values]
+        return values
+
+
+def get_cache_filepath(
+    txts: Sequence[str], txt_transform: Callable, cache_dir: Union[str, Path]
+) -> str:
+    """Filepath of the cached encoding of the given transcripts. It depends
+    on the transcripts and on the text transform (see ``cache_key``)"""
+    sha1 = hashlib.sha1(txt_transform.cache_key.encode())
+    for txt in txts:
+        sha1.update(txt.encode())
+        sha1.update(b"\n")
+    return join(cache_dir, f"{sha1.hexdigest()}.txts.npz")
+
+
+def get_encoded_texts(
+    txts: Sequence[str],
+    txt_transform: Callable[[str], List[int]],
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> EncodedTexts:
+    """Encode the given transcripts with the text transform.
+
+    If ``cache_dir`` is given, the encoded transcripts are saved in this
+    directory and reused while neither the transcripts nor the transform
+    change. The transform must then have a ``cache_key`` attribute.
+    """
+    cache_filepath = (
+        get_cache_filepath(txts, txt_transform, cache_dir)
+        if cache_dir is not None
+        else None
+    )
+    if cache_filepath is not None and isfile(cache_filepath):
+        encoded = EncodedTexts.load(cache_filepath)
+        _logger.debug("Loaded the encoded transcripts from {}", cache_filepath)
+        if encoded.unknown:
+            _logger.error(
+                "{} transcripts contain symbols missing from the symbols table",
+                len(encoded.unknown),
+            )
+        return encoded
+    encoded = EncodedTexts.encode(txts, txt_transform)
+    if cache_filepath is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            encoded.save(cache_filepath)
+        except OSError as e:
+            _logger.warning("Could not save the encoded transcripts: {}", e)
+    return encoded
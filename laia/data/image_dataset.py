@@ -1,24 +1,85 @@
+import os
+from os.path import abspath
 from typing import Any, Callable, Dict, List, Optional
 
+import numpy as np
 import torch
 from PIL import Image
 
+from laia.data.shared_image_cache import SharedImageCache
+from laia.data.string_array import StringArray
+
 
 class ImageDataset(torch.utils.data.Dataset):
+    """Dataset of images read from their filepaths.
+
+    If ``img_cache`` is given, the output of ``transform.decode`` is cached
+    and ``transform.finalize`` (e.g. the data augmentation) is applied after
+    the cache lookup. The images are cached by path, modification time and
+    size, image loader backend and ``transform.decode_key``, so the datasets
+    sharing a cache can decode the images differently, and modified images
+    are decoded again.
+
+    Args:
+        imgs: Filepath of each image.
+        transform: Transform applied to the PIL image.
+        img_cache: Cache of decoded images.
+        img_loader: Function loading the PIL image of a filepath, e.g. an
+            :class:`~laia.data.ImageLoader`. Defaults to :func:`PIL.Image.open`.
+    """
+
     def __init__(
-        self, imgs: List[str], transform: Optional[Callable[[Image.Image], Any]] = None
+        self,
+        imgs: List[str],
+        transform: Optional[Callable[[Image.Image], Any]] = None,
+        img_cache: Optional[SharedImageCache] = None,
+        img_loader: Optional[Callable[[str], Image.Image]] = None,
     ):
-        assert isinstance(imgs, (list, tuple))
+        assert isinstance(imgs, (list, tuple, StringArray))
+        assert img_cache is None or all(
+            hasattr(transform, attr) for attr in ("decode", "finalize", "decode_key")
+        ), (
+            "The transform must be split in `decode` and `finalize`, and have a "
+            "`decode_key`, to cache images"
+        )
         super().__init__()
-        self._imgs = imgs
+        self._imgs = StringArray(imgs) if not isinstance(imgs, StringArray) else imgs
         self._transform = transform
+        self._img_cache = img_cache
+        self._img_loader = img_loader or Image.open
+
+    def get_cache_key(self, filepath: str) -> str:
+        """Key of the decoded image in the cache: the image file, its version
+        and the parameters changing the output of the decoding"""
+        stat = os.stat(filepath)
+        return ":".join(
+            (
+                abspath(filepath),
+                str(stat.st_mtime_ns),
+                str(stat.st_size),
+                getattr(self._img_loader, "backend", "pil"),
+                self._transform.decode_key,
+            )
+        )
+
+    def load_decoded_image(self, filepath: str) -> Image.Image:
+        key = self.get_cache_key(filepath)
+        img = self._img_cache.get(key)
+        if img is not None:
+            return Image.fromarray(img)
+        img = self._transform.decode(self._img_loader(filepath))
+        self._img_cache.put(key, np.asarray(img))
+        return img
 
     def __getitem__(self, index: int) -> Dict[str, Any]:
         """Returns a dictionary containing the given image from the dataset.
         The image is associated with the key 'img'."""
-        img = Image.open(self._imgs[index])
-        if self._transform:
-            img = self._transform(img)
+        if self._img_cache is not None:
+            img = self._transform.finalize(self.load_decoded_image(self._imgs[index]))
+        else:
+            img = self._img_loader(self._imgs[index])
+            if self._transform:
+                img = self._transform(img)
         return {"img": img}
 
     def __len__(self) -> int:
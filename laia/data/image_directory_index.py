@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+from os.path import abspath, isdir, isfile, join, splitext
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import laia.common.logging as log
+
+IMAGE_EXTENSIONS = ".jpg", ".png", ".jpeg", ".pbm", ".pgm", ".ppm", ".bmp"
+
+_logger = log.get_logger(__name__)
+
+
+def _get_extensions(img_extensions: Sequence[str]) -> Tuple[str, ...]:
+    # lower-case and upper-case versions of each extension, without duplicates
+    return tuple(
+        dict.fromkeys(
+            [ext.lower() for ext in img_extensions]
+            + [ext.upper() for ext in img_extensions]
+        )
+    )
+
+
+def find_image_filepath_from_id(
+    img_id: str, img_dir: Union[str, Path], img_extensions: List[str] = IMAGE_EXTENSIONS
+) -> Optional[str]:
+    for ext in _get_extensions(img_extensions):
+        filepath = join(img_dir, img_id if img_id.endswith(ext) else img_id + ext)
+        if isfile(filepath):
+            return filepath
+    return
+
+
+class ImageDirectoryIndex:
+    """Index of the image files of a directory.
+
+    The directory is listed once, so finding the image of an id does not
+    need to check whether a file exists for each of the image extensions.
+    Ids containing a path separator are looked up in the filesystem.
+
+    If ``cache_dir`` is given, the listing is saved in this directory and
+    reused as long as the modification time of the image directory does not
+    change.
+
+    Args:
+        img_dir: Directory containing the images.
+        img_extensions: Extensions of the images, in any case.
+        cache_dir: Directory where the listing is cached.
+    """
+
+    def __init__(
+        self,
+        img_dir: Union[str, Path],
+        img_extensions: Sequence[str] = IMAGE_EXTENSIONS,
+        cache_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.img_dir = str(img_dir)
+        self.extensions = _get_extensions(img_extensions)
+        self.mtime = self.get_mtime(self.img_dir)
+        cache_filepath = (
+            self.get_cache_filepath(cache_dir) if cache_dir is not None else None
+        )
+        self.filenames = self.load_cache(cache_filepath)
+        if self.filenames is None:
+            self.filenames = self.list_filenames()
+            if cache_filepath is not None:
+                self.save_cache(cache_filepath)
+
+    @staticmethod
+    def get_mtime(img_dir: str) -> Optional[int]:
+        return os.stat(img_dir).st_mtime_ns if isdir(img_dir) else None
+
+    def list_filenames(self) -> Set[str]:
+        if self.mtime is None:
+            return set()
+        with os.scandir(self.img_dir) as it:
+            return {
+                entry.name
+                for entry in it
+                if splitext(entry.name)[1] in self.extensions and entry.is_file()
+            }
+
+    def get_cache_filepath(self, cache_dir: Union[str, Path]) -> str:
+        key = "\n".join((abspath(self.img_dir),) + self.extensions)
+        return join(cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def load_cache(self, cache_filepath: Optional[str]) -> Optional[Set[str]]:
+        if cache_filepath is None or not isfile(cache_filepath):
+            return
+        with open(cache_filepath) as f:
+            cache = json.load(f)
+        if cache["mtime"] != self.mtime:
+            return
+        _logger.debug("Loaded the index of {} from {}", self.img_dir, cache_filepath)
+        return set(cache["filenames"])
+
+    def save_cache(self, cache_filepath: str) -> None:
+        os.makedirs(os.path.dirname(cache_filepath), exist_ok=True)
+        tmp_filepath = f"{cache_filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "w") as f:
+            json.dump(
+                {
+                    "img_dir": abspath(self.img_dir),
+                    "mtime": self.mtime,
+                    "filenames": sorted(self.filenames),
+                },
+                f,
+            )
+        os.replace(tmp_filepath, cache_filepath)
+
+    def is_outdated(self) -> bool:
+        return self.get_mtime(self.img_dir) != self.mtime
+
+    def find(self, img_id: str) -> Optional[str]:
+        """Find the image filepath of the given id, or None if not found"""
+        if os.sep in img_id or (os.altsep and os.altsep in img_id):
+            return find_image_filepath_from_id(img_id, self.img_dir, self.extensions)
+        if img_id in self.filenames and img_id.endswith(self.extensions):
+            return join(self.img_dir, img_id)
+        for ext in self.extensions:
+            if img_id + ext in self.filenames:
+                return join(self.img_dir, img_id + ext)
+        return
+
+    def __len__(self) -> int:
+        return len(self.filenames)
+
+
+_indexes: Dict[Tuple[str, Tuple[str, ...]], ImageDirectoryIndex] = {}
+
+
+def get_image_directory_index(
+    img_dir: Union[str, Path],
+    img_extensions: Sequence[str] = IMAGE_EXTENSIONS,
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> ImageDirectoryIndex:
+    """Get the index of the given directory.
+
+    The indexes are shared by all the datasets of the process and rebuilt
+    if the directory has been modified.
+    """
+    key = abspath(img_dir), _get_extensions(img_extensions)
+    index = _indexes.get(key)
+    if index is None or index.is_outdated():
+        index = ImageDirectoryIndex(img_dir, img_extensions, cache_dir=cache_dir)
+        _indexes[key] = index
+    return index
+
+
+def find_image_filepath(
+    img_id: str,
+    indexes: List[ImageDirectoryIndex],
+) -> Optional[str]:
+    """Find the image of the given id in the first indexed directory containing
+    it. If not found, the id may be a path to the image."""
+    for index in indexes:
+        filepath = index.find(img_id)
+        if filepath is not None:
+            return filepath
+    if isfile(img_id):
+        return img_id
+    return
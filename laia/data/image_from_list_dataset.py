@@ -1,12 +1,16 @@
-from os.path import isfile
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from PIL import Image
+
 import laia.common.logging as log
 from laia.data import ImageDataset
-from laia.data.text_image_from_text_table_dataset import (
+from laia.data.image_directory_index import (
     IMAGE_EXTENSIONS,
-    find_image_filepath_from_id,
+    find_image_filepath,
+    get_image_directory_index,
 )
+from laia.data.shared_image_cache import SharedImageCache
+from laia.data.string_array import StringArray
 
 _logger = log.get_logger(__name__)
 
@@ -18,11 +22,20 @@ class ImageFromListDataset(ImageDataset):
         img_dirs: Optional[List[str]] = None,
         img_transform: Callable = None,
         img_extensions: List[str] = IMAGE_EXTENSIONS,
+        index_cache_dir: Optional[str] = None,
+        img_cache: Optional[SharedImageCache] = None,
+        img_loader: Optional[Callable[[str], Image.Image]] = None,
     ):
-        self._ids, imgs = _get_img_ids_and_filepaths(
-            img_list, img_dirs=img_dirs, img_extensions=img_extensions
+        ids, imgs = _get_img_ids_and_filepaths(
+            img_list,
+            img_dirs=img_dirs,
+            img_extensions=img_extensions,
+            index_cache_dir=index_cache_dir,
+        )
+        self._ids = StringArray(ids)
+        super().__init__(
+            imgs, img_transform, img_cache=img_cache, img_loader=img_loader
         )
-        super().__init__(imgs, img_transform)
 
     def __getitem__(self, index: int) -> Dict[str, Any]:
         """Returns the ID of the example, and its image.
@@ -51,28 +64,28 @@ def _get_img_ids_and_filepaths(
     img_list: Union[str, List[str]],
     img_dirs: Optional[List[str]] = None,
     img_extensions: List[str] = IMAGE_EXTENSIONS,
+    index_cache_dir: Optional[str] = None,
 ) -> Tuple[List[str], List[str]]:
     if img_dirs is None:
         img_dirs = []
     assert isinstance(img_dirs, list)
     img_list = _load_image_list_from_file(img_list)
+    indexes = [
+        get_image_directory_index(dir, img_extensions, cache_dir=index_cache_dir)
+        for dir in img_dirs
+    ]
     ids, filepaths = [], []
     for img_id in img_list:
         img_id = img_id.strip()
-        for dir in img_dirs:
-            filepath = find_image_filepath_from_id(img_id, dir, img_extensions)
-            if filepath is not None:
-                break
-        else:
-            if isfile(img_id):
-                # img_list must contain whole paths to the images
-                filepath = img_id
-            else:
-                _logger.warning(
-                    "No image file found for image ID '{}', ignoring it...",
-                    img_id,
-                )
-                continue
+        # if not found in the directories, img_list must contain whole paths
+        # to the images
+        filepath = find_image_filepath(img_id, indexes)
+        if filepath is None:
+            _logger.warning(
+                "No image file found for image ID '{}', ignoring it...",
+                img_id,
+            )
+            continue
         ids.append(img_id)
         filepaths.append(filepath)
     return ids, filepaths
@@ -0,0 +1,97 @@
+import os
+from os.path import splitext
+from typing import Any, Dict, Optional
+
+import numpy as np
+import torch
+from PIL import Image
+from torchvision.io import ImageReadMode, decode_image
+
+IMAGE_BACKENDS = "pil", "torchvision"
+# formats decoded by torchvision, the others are loaded with PIL
+TORCHVISION_EXTENSIONS = ".jpg", ".jpeg", ".png"
+_READ_MODES = {
+    "L": ImageReadMode.GRAY,
+    "RGB": ImageReadMode.RGB,
+    "RGBA": ImageReadMode.RGB_ALPHA,
+}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG color types decoded by torchvision like PIL: grayscale and RGB
+_PNG_COLOR_TYPES = 0, 2
+
+
+class ImageLoader:
+    """Load the image of a filepath as a PIL image.
+
+    With the "pil" backend, the image is opened lazily with
+    :func:`PIL.Image.open`, so the transforms can still choose how it is
+    decoded (e.g. JPEG draft mode).
+
+    With the "torchvision" backend, JPEG and PNG files are read into a buffer
+    reused across calls and decoded by :func:`torchvision.io.decode_image`
+    directly in the given color mode, so the color conversion of the
+    transforms does nothing. The images which torchvision does not decode
+    like PIL fall back to PIL: the other formats (e.g. PBM/PGM), the RGBA
+    color mode, the PNG images which are not 8-bit grayscale or RGB (e.g.
+    palette, 1-bit or 16-bit images) and the images torchvision fails to
+    decode.
+
+    Args:
+        backend: Decoding backend, "pil" or "torchvision".
+        mode: Color mode of the decoded images. Required by the
+            "torchvision" backend.
+    """
+
+    def __init__(self, backend: str = "pil", mode: Optional[str] = None) -> None:
+        assert backend in IMAGE_BACKENDS, f"Unknown image backend {backend}"
+        assert backend == "pil" or mode in _READ_MODES
+        self.backend = backend
+        self.mode = mode
+        # grown as needed, each dataloader worker has its own buffer
+        self._buffer = bytearray()
+
+    def read(self, filepath: str) -> torch.Tensor:
+        """Read the bytes of a file into the reused buffer. The returned
+        tensor is only valid until the next call"""
+        with open(filepath, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if len(self._buffer) < size:
+                self._buffer = bytearray(size)
+            n = f.readinto(memoryview(self._buffer)[:size])
+        return torch.frombuffer(self._buffer, dtype=torch.uint8, count=n)
+
+    @staticmethod
+    def is_supported_png(data: torch.Tensor) -> bool:
+        """Whether the bytes of an image are not a PNG image, or a PNG image
+        decoded by torchvision like PIL"""
+        header = bytes(data[:26])
+        if not header.startswith(_PNG_SIGNATURE):
+            return True
+        # bit depth and color type of the IHDR chunk
+        return len(header) == 26 and header[24] == 8 and header[25] in _PNG_COLOR_TYPES
+
+    def __call__(self, filepath: str) -> Image.Image:
+        if (
+            self.backend == "pil"
+            or self.mode == "RGBA"
+            or splitext(filepath)[1].lower() not in TORCHVISION_EXTENSIONS
+        ):
+            return Image.open(filepath)
+        data = self.read(filepath)
+        if not self.is_supported_png(data):
+            return Image.open(filepath)
+        try:
+            # C x H x W
+            x = decode_image(data, mode=_READ_MODES[self.mode])
+        except RuntimeError:
+            return Image.open(filepath)
+        x = x[0] if self.mode == "L" else x.permute(1, 2, 0)
+        return Image.fromarray(np.ascontiguousarray(x.numpy()))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_buffer"] = bytearray()
+        return state
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(backend={self.backend}, mode={self.mode})"
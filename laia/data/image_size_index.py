@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from os.path import isfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import imagesize
+
+import laia.common.logging as log
+
+SIZES_SUFFIX = ".sizes"
+
+_logger = log.get_logger(__name__)
+
+
+def get_size_index_filepath(table: Union[str, Path]) -> str:
+    """Filepath of the size index of the given table"""
+    return f"{table}{SIZES_SUFFIX}"
+
+
+def load_size_index(
+    index_filepath: Union[str, Path],
+) -> Dict[str, Tuple[int, int, int]]:
+    """Load a size index, mapping each image filepath to its width, height
+    and modification time"""
+    sizes = {}
+    with open(index_filepath) as f:
+        for line in f:
+            _, filepath, width, height, mtime = line.rstrip("\n").split("\t")
+            sizes[filepath] = int(width), int(height), int(mtime)
+    return sizes
+
+
+def save_size_index(
+    index_filepath: Union[str, Path],
+    ids: List[str],
+    filepaths: List[str],
+    sizes: List[Tuple[int, int, int]],
+) -> None:
+    """Save a size index with the id, filepath, width, height and modification
+    time of each image"""
+    tmp_filepath = f"{index_filepath}.{os.getpid()}.tmp"
+    with open(tmp_filepath, "w") as f:
+        for img_id, filepath, (width, height, mtime) in zip(ids, filepaths, sizes):
+            f.write(f"{img_id}\t{filepath}\t{width}\t{height}\t{mtime}\n")
+    os.replace(tmp_filepath, index_filepath)
+
+
+def get_image_sizes(
+    filepaths: List[str],
+    ids: Optional[List[str]] = None,
+    index_filepath: Optional[Union[str, Path]] = None,
+    num_workers: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """Read the size of the given images from their headers.
+
+    The headers are read by a pool of threads. If ``index_filepath`` is given,
+    the sizes of the images which have not been modified since the index was
+    saved are read from it, and the index is updated with the new sizes.
+
+    Args:
+        filepaths: Filepath of each image.
+        ids: Id of each image, saved in the index. Defaults to the filepaths.
+        index_filepath: Filepath of the size index.
+        num_workers: Number of threads used to read the headers.
+
+    Returns:
+        The size (width, height) of each image.
+    """
+    cached = (
+        load_size_index(index_filepath)
+        if index_filepath is not None and isfile(index_filepath)
+        else {}
+    )
+
+    def get_size(filepath: str) -> Tuple[int, int, int]:
+        mtime = os.stat(filepath).st_mtime_ns
+        size = cached.get(filepath)
+        if size is not None and size[2] == mtime:
+            return size
+        return (*imagesize.get(filepath), mtime)
+
+    with ThreadPoolExecutor(num_workers) as executor:
+        sizes = list(executor.map(get_size, filepaths))
+
+    num_read = sum(cached.get(f) != size for f, size in zip(filepaths, sizes))
+    if index_filepath is not None:
+        _logger.info(
+            "Read the size of {} images, {} reused from {}",
+            len(filepaths),
+            len(filepaths) - num_read,
+            index_filepath,
+        )
+        if num_read or len(cached) != len(set(filepaths)):
+            try:
+                save_size_index(index_filepath, ids or filepaths, filepaths, sizes)
+            except OSError as e:
+                _logger.warning("Could not save the size index: {}", e)
+    return [(width, height) for width, height, _ in sizes]
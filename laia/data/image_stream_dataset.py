@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import torch
+from PIL import Image
+from torch.utils.data import Sampler
+
+import laia.common.logging as log
+from laia.data.image_directory_index import (
+    IMAGE_EXTENSIONS,
+    find_image_filepath,
+    get_image_directory_index,
+)
+
+_logger = log.get_logger(__name__)
+
+STDIN = "-", "/dev/stdin"
+
+
+class ImageIdStreamSampler(Sampler):
+    """Stream of the images of a list, read lazily from a file or stdin.
+
+    Instead of dataset indices, it yields the id and the filepath of each
+    image, which are read by :class:`ImageStreamDataset`. Since the sampler
+    runs in the main process of the dataloader, the images are split among
+    its workers without overlap. When distributed, each process keeps one of
+    every ``num_replicas`` images.
+
+    Args:
+        img_list: File with an image id per line, or "-" (or "/dev/stdin") to
+            read stdin.
+        img_dirs: Directories containing the images. If an image is not
+            found in them, its id must be its filepath.
+        img_extensions: Extensions of the images.
+        index_cache_dir: Directory where the listing of the image
+            directories is cached.
+        num_replicas: Number of distributed processes.
+        rank: Rank of the current process.
+    """
+
+    def __init__(
+        self,
+        img_list: Union[str, Path],
+        img_dirs: Optional[List[Union[str, Path]]] = None,
+        img_extensions: List[str] = IMAGE_EXTENSIONS,
+        index_cache_dir: Optional[str] = None,
+        num_replicas: int = 1,
+        rank: int = 0,
+    ) -> None:
+        assert 0 <= rank < num_replicas
+        assert (
+            str(img_list) not in STDIN or num_replicas == 1
+        ), "stdin cannot be read by several processes"
+        super().__init__(None)
+        self.img_list = str(img_list)
+        self.img_dirs = img_dirs or []
+        self.img_extensions = img_extensions
+        self.index_cache_dir = index_cache_dir
+        self.num_replicas = num_replicas
+        self.rank = rank
+
+    def get_img_ids(self) -> Iterator[str]:
+        f = sys.stdin if self.img_list in STDIN else open(self.img_list)
+        try:
+            for line in f:
+                img_id = line.strip()
+                # skip empty lines and lines starting with '#'
+                if img_id and not img_id.startswith("#"):
+                    yield img_id
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        indexes = [
+            get_image_directory_index(
+                img_dir, self.img_extensions, cache_dir=self.index_cache_dir
+            )
+            for img_dir in self.img_dirs
+        ]
+        for i, img_id in enumerate(self.get_img_ids()):
+            if i % self.num_replicas != self.rank:
+                continue
+            filepath = find_image_filepath(img_id, indexes)
+            if filepath is None:
+                _logger.warning(
+                    "No image file found for image ID '{}', ignoring it...", img_id
+                )
+                continue
+            yield img_id, filepath
+
+
+class ImageStreamDataset(torch.utils.data.Dataset):
+    """Dataset of the images yielded by :class:`ImageIdStreamSampler`.
+
+    It is indexed by the (id, filepath) pairs of the sampler, so it has no
+    length and the images can be decoded as soon as they are listed.
+
+    Args:
+        img_transform: Transform applied to the PIL image.
+        img_loader: Function loading the PIL image of a filepath. Defaults
+            to :func:`PIL.Image.open`.
+    """
+
+    def __init__(
+        self,
+        img_transform: Optional[Callable[[Image.Image], Any]] = None,
+        img_loader: Optional[Callable[[str], Image.Image]] = None,
+    ) -> None:
+        super().__init__()
+        self._img_transform = img_transform
+        self._img_loader = img_loader or Image.open
+
+    def __getitem__(self, item: Tuple[str, str]) -> Dict[str, Any]:
+        """Returns the ID of the example, and its image."""
+        img_id, filepath = item
+        img = self._img_loader(filepath)
+        if self._img_transform:
+            img = self._img_transform(img)
+        return {"id": img_id, "img": img}
@@ -0,0 +1,181 @@
+import json
+import multiprocessing
+import os
+from os.path import isfile, join
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+from PIL import Image
+
+import laia.common.logging as log
+from laia.data.image_from_list_dataset import _load_image_list_from_file
+from laia.data.string_array import StringArray
+from laia.data.text_image_from_text_table_dataset import _load_text_table_from_file
+
+_logger = log.get_logger(__name__)
+
+INDEX_FILENAME = "index.npy"
+TABLE_FILENAME = "table.txt"
+META_FILENAME = "meta.json"
+SHARD_FILENAME = "shard-{:05d}.bin"
+
+
+def is_packed_dataset(path: Any) -> bool:
+    """Whether the given path is a directory created by `pylaia-htr-dataset-pack`"""
+    return isinstance(path, (str, os.PathLike)) and isfile(join(path, META_FILENAME))
+
+
+class PackedImageDataset(torch.utils.data.Dataset):
+    """Dataset of preprocessed images stored in a few large shard files.
+
+    The images are stored as raw uint8 pixels, already converted to the
+    color mode given when packing and inverted, so the image transform
+    should not invert them again. The pixels are read through
+    :class:`numpy.memmap` and wrapped in a PIL image without copying them.
+
+    Args:
+        path: Directory created by `pylaia-htr-dataset-pack`.
+        img_transform: Transform applied to the PIL image.
+        txt_transform: Transform applied to the transcript.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        img_transform: Optional[Callable[[Image.Image], Any]] = None,
+        txt_transform: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        assert is_packed_dataset(path), f"{path} is not a packed dataset"
+        super().__init__()
+        self.path = path
+        with open(join(path, META_FILENAME)) as f:
+            meta = json.load(f)
+        self.mode = meta["color_mode"]
+        self.num_shards = meta["num_shards"]
+        self.has_transcripts = meta["has_transcripts"]
+        # shard, offset, channels, height, width
+        self._index = np.load(join(path, INDEX_FILENAME))
+        table = join(path, TABLE_FILENAME)
+        if self.has_transcripts:
+            rows = list(_load_text_table_from_file(table))
+            self._ids = StringArray(img_id for img_id, _ in rows)
+            self._txts = StringArray(txt for _, txt in rows)
+        else:
+            self._ids = StringArray(_load_image_list_from_file(table))
+            self._txts = None
+        assert len(self._ids) == len(self._index)
+        self._img_transform = img_transform
+        self._txt_transform = txt_transform
+        # opened lazily, so that each dataloader worker maps its own files
+        self._shards = None
+
+    @property
+    def sizes(self) -> List[Tuple[int, int]]:
+        """Size (height, width) of each image"""
+        return self._index[:, 3:].tolist()
+
+    def get_shard(self, shard: int) -> np.memmap:
+        if self._shards is None:
+            self._shards = [
+                np.memmap(join(self.path, SHARD_FILENAME.format(i)), mode="r")
+                for i in range(self.num_shards)
+            ]
+        return self._shards[shard]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_shards"] = None
+        return state
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """Returns the ID of the example, the image and its transcript (if
+        the dataset has transcripts)."""
+        shard, offset, c, h, w = self._index[index].tolist()
+        buffer = self.get_shard(shard)[offset : offset + c * h * w]
+        img = Image.frombuffer(self.mode, (w, h), buffer, "raw", self.mode, 0, 1)
+        if self._img_transform:
+            img = self._img_transform(img)
+        out = {"id": self._ids[index], "img": img}
+        if self.has_transcripts:
+            txt = self._txts[index]
+            if self._txt_transform:
+                txt = self._txt_transform(txt)
+            out["txt"] = txt
+        return out
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class _ImageLoader:
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+
+    def __call__(self, filepath: str) -> np.ndarray:
+        # same conversion and inversion as `vision.ToImageTensor`
+        with Image.open(filepath) as img:
+            img = np.asarray(img.convert(self.mode), dtype=np.uint8)
+        if self.mode == "RGBA":
+            # the alpha channel is not inverted
+            return np.concatenate((np.invert(img[..., :3]), img[..., 3:]), axis=-1)
+        return np.invert(img)
+
+
+def pack_dataset(
+    output_dir: Union[str, Path],
+    ids: List[str],
+    filepaths: List[str],
+    txts: Optional[List[str]] = None,
+    color_mode: str = "L",
+    shard_size: int = 1 << 30,
+    num_workers: Optional[int] = None,
+) -> None:
+    """Write the given images in the format read by :class:`PackedImageDataset`.
+
+    Args:
+        output_dir: Directory where the packed dataset is written.
+        ids: ID of each image.
+        filepaths: Path of each image.
+        txts: Transcript of each image. If None, only the IDs are stored.
+        color_mode: Color mode the images are converted to.
+        shard_size: Approximate maximum size of each shard, in bytes.
+        num_workers: Number of processes used to load the images.
+    """
+    assert len(ids) == len(filepaths)
+    assert txts is None or len(txts) == len(ids)
+    os.makedirs(output_dir, exist_ok=True)
+    index = np.zeros((len(ids), 5), dtype=np.int64)
+    shard, offset = 0, 0
+    f = open(join(output_dir, SHARD_FILENAME.format(shard)), "wb")
+    with multiprocessing.Pool(num_workers) as pool:
+        for i, img in enumerate(
+            pool.imap(_ImageLoader(color_mode), filepaths, chunksize=64)
+        ):
+            if offset and offset + img.nbytes > shard_size:
+                f.close()
+                shard, offset = shard + 1, 0
+                f = open(join(output_dir, SHARD_FILENAME.format(shard)), "wb")
+            h, w = img.shape[:2]
+            c = img.shape[2] if img.ndim == 3 else 1
+            index[i] = shard, offset, c, h, w
+            np.ascontiguousarray(img).tofile(f)
+            offset += img.nbytes
+    f.close()
+    np.save(join(output_dir, INDEX_FILENAME), index)
+    with open(join(output_dir, TABLE_FILENAME), "w") as f:
+        for i, img_id in enumerate(ids):
+            f.write(f"{img_id} {txts[i]}\n" if txts is not None else f"{img_id}\n")
+    with open(join(output_dir, META_FILENAME), "w") as f:
+        json.dump(
+            {
+                "color_mode": color_mode,
+                "num_shards": shard + 1,
+                "has_transcripts": txts is not None,
+            },
+            f,
+        )
+    _logger.info(
+        "Packed {} images in {} shard(s) in {}", len(ids), shard + 1, output_dir
+    )
@@ -1,3 +1,4 @@
+import math
 from typing import (
     Any,
     Callable,
@@ -52,10 +53,51 @@ def by_descending_width(x):
     return -x["img"].size(2)
 
 
+def bucket_size(size: int, buckets: Sequence[int]) -> int:
+    """Smallest bucket size not smaller than `size`. Sizes larger than all
+    buckets are rounded up to a multiple of the largest bucket"""
+    larger = [b for b in buckets if b >= size]
+    if larger:
+        return min(larger)
+    largest = max(buckets)
+    return -(-size // largest) * largest
+
+
 class PaddingCollater:
-    def __init__(self, sizes: Any, sort_key: Callable = None):
+    """Collate a batch, padding the tensors with variable sizes with zeros.
+
+    Args:
+        sizes: Expected size of each dimension of the tensors, with the same
+            structure as the batch elements. ``None`` marks the dimensions
+            with variable size, which are padded.
+        sort_key: If given, the batch is sorted using this key.
+        pin_memory: Whether to allocate the collated tensors in pinned memory
+            when collating in the main process and CUDA is available.
+        shared_memory: Whether to allocate the collated tensors in shared
+            memory when collating in a dataloader worker, so the batch is not
+            copied again when sent to the main process.
+        width_buckets: If given, the last dimension of the padded tensors is
+            padded up to the smallest of these sizes that fits the batch (see
+            :func:`bucket_size`), so the batches take a small set of shapes,
+            e.g. to reuse the graphs of a compiled model.
+    """
+
+    def __init__(
+        self,
+        sizes: Any,
+        sort_key: Callable = None,
+        pin_memory: bool = False,
+        shared_memory: bool = True,
+        width_buckets: Optional[Sequence[int]] = None,
+    ):
+        assert not width_buckets or all(
+            b > 0 for b in width_buckets
+        ), f"The width buckets must be positive, got {width_buckets}"
         self._sizes = sizes
         self._sort_key = sort_key
+        self._pin_memory = pin_memory
+        self._shared_memory = shared_memory
+        self._width_buckets = width_buckets
 
     def __call__(self, batch: Any) -> torch.Tensor:
         if self._sort_key:
@@ -63,42 +105,85 @@ class PaddingCollater:
         return self.collate(batch, self._sizes)
 
     @staticmethod
-    def get_max_sizes(
-        batch: List[torch.Tensor], sizes: Optional[Tuple[Union[int, None], ...]] = None
-    ) -> Tuple[int, ...]:
+    def get_sizes(batch: List[torch.Tensor]) -> torch.Tensor:
+        """Size of each tensor in the batch, as a N x D tensor"""
         # All tensors in the batch must have the same number of dimensions
         dim = batch[0].dim()
         assert all(x.dim() == dim for x in batch)
-        max_sizes = [len(batch)]
-        for d in range(dim):
-            max_v = max(x.size(d) for x in batch)
-            min_v = min(x.size(d) for x in batch)
-            if sizes and sizes[d] is not None:
-                assert max_v == min_v == sizes[d]
-            max_sizes.append(max_v)
-        return tuple(max_sizes)
+        return torch.tensor([x.size() for x in batch]).view(len(batch), dim)
+
+    @staticmethod
+    def get_max_sizes(
+        batch: List[torch.Tensor],
+        sizes: Optional[Tuple[Union[int, None], ...]] = None,
+        batch_sizes: Optional[torch.Tensor] = None,
+    ) -> Tuple[int, ...]:
+        if batch_sizes is None:
+            batch_sizes = PaddingCollater.get_sizes(batch)
+        max_sizes = batch_sizes.max(dim=0).values.tolist()
+        if sizes:
+            min_sizes = batch_sizes.min(dim=0).values.tolist()
+            for max_v, min_v, size in zip(max_sizes, min_sizes, sizes):
+                if size is not None:
+                    assert max_v == min_v == size
+        return (len(batch), *max_sizes)
+
+    @staticmethod
+    def new_empty(
+        elem: torch.Tensor,
+        size: Tuple[int, ...],
+        pin_memory: bool = False,
+        shared_memory: bool = True,
+    ) -> torch.Tensor:
+        """Allocate an uninitialized tensor like `elem`, in pinned memory or
+        in shared memory (in a dataloader worker) if requested"""
+        if shared_memory and torch.utils.data.get_worker_info() is not None:
+            # same as `torch.utils.data.default_collate`
+            storage = (
+                elem._typed_storage()
+                if hasattr(elem, "_typed_storage")
+                else elem.storage()
+            )
+            storage = storage._new_shared(math.prod(size), device=elem.device)
+            return elem.new(storage).resize_(size)
+        if pin_memory and elem.device.type == "cpu" and torch.cuda.is_available():
+            return torch.empty(size, dtype=elem.dtype, pin_memory=True)
+        return elem.new_empty(size)
 
     @staticmethod
     def collate_tensors(
-        batch: List[torch.Tensor], max_sizes: Tuple[int, ...]
+        batch: List[torch.Tensor],
+        max_sizes: Tuple[int, ...],
+        out: Optional[torch.Tensor] = None,
     ) -> torch.Tensor:
-        out = batch[0].new_zeros(size=max_sizes)
+        if out is None:
+            out = batch[0].new_empty(max_sizes)
+        assert out.size() == max_sizes
+        out.zero_()
         for i, x in enumerate(batch):
-            batch_tensor = out[i]
-            for d in range(batch[0].dim()):
-                batch_tensor = batch_tensor.narrow(d, 0, x.size(d))
-            batch_tensor.add_(x)
+            out[(i, *(slice(0, s) for s in x.size()))].copy_(x)
         return out
 
     def collate(self, batch: Any, sizes: Any) -> Any:
         elem, elem_type = batch[0], type(batch[0])
         if isinstance(elem, torch.Tensor):
             if any(s is None for s in sizes):
-                max_sizes = PaddingCollater.get_max_sizes(batch, sizes)
-                x = PaddingCollater.collate_tensors(batch, max_sizes)
-                xs = torch.stack([torch.tensor(x.size()) for x in batch])
+                xs = PaddingCollater.get_sizes(batch)
+                max_sizes = PaddingCollater.get_max_sizes(batch, sizes, batch_sizes=xs)
+                if self._width_buckets and sizes[-1] is None:
+                    max_sizes = (
+                        *max_sizes[:-1],
+                        bucket_size(max_sizes[-1], self._width_buckets),
+                    )
+                out = PaddingCollater.new_empty(
+                    elem, max_sizes, self._pin_memory, self._shared_memory
+                )
+                x = PaddingCollater.collate_tensors(batch, max_sizes, out=out)
                 return PaddedTensor.build(x, xs)
-            return torch.stack(batch)
+            out = PaddingCollater.new_empty(
+                elem, (len(batch), *elem.size()), self._pin_memory, self._shared_memory
+            )
+            return torch.stack(batch, out=out)
         if isinstance(elem, np.ndarray):
             return self.collate([torch.from_numpy(b) for b in batch], sizes)
         if isinstance(elem, Mapping):
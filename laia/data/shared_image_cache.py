@@ -0,0 +1,135 @@
+import contextlib
+import fcntl
+import hashlib
+import os
+from os.path import join
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+import laia.common.logging as log
+
+_logger = log.get_logger(__name__)
+
+
+class SharedImageCache:
+    """Cache of decoded images shared by all the processes of a host.
+
+    Each image is stored as a ``.npy`` file in ``cache_dir``, which should be
+    in a memory-backed filesystem (e.g. ``/dev/shm``). Since the cache only
+    lives in the filesystem, all the dataloader workers and all the
+    distributed processes of a host using the same directory share it.
+
+    When adding an image would exceed ``max_bytes``, the least recently used
+    images are evicted. The modification time of the files is used to track
+    their last use.
+
+    Note that the images are only identified by their key, which must
+    change when the image file or the way it is decoded change (see
+    :meth:`~laia.data.ImageDataset.get_cache_key`).
+
+    Args:
+        cache_dir: Directory where the images are stored.
+        max_bytes: Maximum size of the cache, in bytes.
+    """
+
+    # fraction of the budget used after an eviction, to avoid evicting again
+    # for each new image once the cache is full
+    low_water_mark = 0.9
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int) -> None:
+        assert max_bytes > 0
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_filepath(self, key: str) -> str:
+        return join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".npy")
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        # the lock file is opened on each call: flock locks are shared by the
+        # file descriptors inherited from a forked process
+        with open(join(self.cache_dir, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @property
+    def usage(self) -> int:
+        """Size of the cached images, in bytes"""
+        try:
+            with open(join(self.cache_dir, ".usage")) as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    @usage.setter
+    def usage(self, value: int) -> None:
+        with open(join(self.cache_dir, ".usage"), "w") as f:
+            f.write(str(value))
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get the image stored with the given key, or None if not cached"""
+        filepath = self.get_filepath(key)
+        try:
+            img = np.load(filepath, mmap_mode="r")
+            os.utime(filepath)
+        except FileNotFoundError:
+            return
+        return img
+
+    def put(self, key: str, img: np.ndarray) -> None:
+        """Store an image with the given key, evicting other images if needed"""
+        filepath = self.get_filepath(key)
+        tmp_filepath = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "wb") as f:
+            np.save(f, img)
+        size = os.path.getsize(tmp_filepath)
+        if size > self.max_bytes:
+            os.remove(tmp_filepath)
+            return
+        with self.lock():
+            if os.path.exists(filepath):
+                # another process stored the same image meanwhile
+                os.remove(tmp_filepath)
+                return
+            usage = self.usage
+            if usage + size > self.max_bytes:
+                usage = self.evict(int(self.max_bytes * self.low_water_mark) - size)
+            os.replace(tmp_filepath, filepath)
+            self.usage = usage + size
+
+    def evict(self, max_bytes: int) -> int:
+        """Remove the least recently used images until the cache is smaller
+        than `max_bytes`. Must be called with the lock acquired.
+
+        Returns:
+            The size of the remaining images, in bytes.
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".npy"):
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        usage = sum(size for _, size, _ in entries)
+        num_evicted = 0
+        for _, size, path in sorted(entries):
+            if usage <= max_bytes:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            usage -= size
+            num_evicted += 1
+        _logger.debug("Evicted {} images from {}", num_evicted, self.cache_dir)
+        return usage
+
+    def clear(self) -> None:
+        with self.lock():
+            self.evict(0)
+            self.usage = 0
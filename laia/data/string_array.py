@@ -0,0 +1,56 @@
+from typing import Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+
+class StringArray(Sequence):
+    """Immutable sequence of strings stored in a single UTF-8 buffer, with
+    the offset of each string in it.
+
+    A list of strings is made of one Python object per string, whose
+    reference counts are updated whenever they are accessed. The memory pages
+    of a large list are thus copied by every forked dataloader worker. This
+    sequence only holds two NumPy arrays, which are shared by the workers, and
+    each string is decoded when it is accessed.
+
+    Args:
+        strings: The strings to store.
+    """
+
+    def __init__(self, strings: Iterable[str] = ()) -> None:
+        encoded = [s.encode() for s in strings]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in encoded], out=self.offsets[1:])
+        self.data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if isinstance(index, slice):
+            return StringArray(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"StringArray index {index} out of range")
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode()
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, StringArray):
+            return np.array_equal(self.offsets, other.offsets) and np.array_equal(
+                self.data, other.data
+            )
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def tolist(self) -> List[str]:
+        return list(self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.tolist()!r})"
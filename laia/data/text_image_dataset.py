@@ -1,29 +1,65 @@
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional
+
+from PIL import Image
 
 from laia.data import ImageDataset
+from laia.data.encoded_texts import get_encoded_texts
+from laia.data.shared_image_cache import SharedImageCache
+from laia.data.string_array import StringArray
 
 
 class TextImageDataset(ImageDataset):
+    """Dataset of images and their transcripts.
+
+    If the text transform has a ``cache_key`` (e.g.
+    :class:`~laia.data.transforms.text.ToTensor`), all the transcripts are
+    encoded when the dataset is built instead of on each access. If
+    ``txt_cache_dir`` is also given, the encoded transcripts are saved in this
+    directory and reused by later runs.
+
+    Args:
+        imgs: Filepath of each image.
+        txts: Transcript of each image.
+        img_transform: Transform applied to the PIL image.
+        txt_transform: Transform applied to the transcript.
+        img_cache: Cache of decoded images.
+        txt_cache_dir: Directory where the encoded transcripts are cached.
+        img_loader: Function loading the PIL image of a filepath.
+    """
+
     def __init__(
         self,
         imgs: List[str],
         txts: List[str],
         img_transform: Callable = None,
         txt_transform: Callable = None,
+        img_cache: Optional[SharedImageCache] = None,
+        txt_cache_dir: Optional[str] = None,
+        img_loader: Optional[Callable[[str], Image.Image]] = None,
     ):
-        super().__init__(imgs, img_transform)
+        super().__init__(
+            imgs, img_transform, img_cache=img_cache, img_loader=img_loader
+        )
         assert len(imgs) == len(txts)
-        self._txts = txts
+        self._txts = StringArray(txts) if not isinstance(txts, StringArray) else txts
         self._txt_transform = txt_transform
+        self._encoded_txts = (
+            get_encoded_texts(txts, txt_transform, cache_dir=txt_cache_dir)
+            if hasattr(txt_transform, "cache_key")
+            else None
+        )
 
     def __getitem__(self, index: int) -> Dict[str, Any]:
         """Returns an image and its transcript from the dataset."""
         # Get image
         out = super().__getitem__(index)
         # Get transcript
-        txt = self._txts[index]
-        if self._txt_transform:
-            txt = self._txt_transform(txt)
+        if self._encoded_txts is not None:
+            txt = self._encoded_txts[index]
+        else:
+            txt = self._txts[index]
+            if self._txt_transform:
+                txt = self._txt_transform(txt)
         # Return image and transcript
         out["txt"] = txt
         return out
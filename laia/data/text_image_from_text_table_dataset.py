@@ -1,12 +1,18 @@
-from os.path import isfile, join
 from pathlib import Path
 from typing import Any, Callable, Dict, Generator, List, Optional, TextIO, Tuple, Union
 
+from PIL import Image
+
 import laia.common.logging as log
+from laia.data.image_directory_index import (
+    IMAGE_EXTENSIONS,
+    find_image_filepath,
+    get_image_directory_index,
+)
+from laia.data.shared_image_cache import SharedImageCache
+from laia.data.string_array import StringArray
 from laia.data.text_image_dataset import TextImageDataset
 
-IMAGE_EXTENSIONS = ".jpg", ".png", ".jpeg", ".pbm", ".pgm", ".ppm", ".bmp"
-
 _logger = log.get_logger(__name__)
 
 
@@ -18,6 +24,10 @@ class TextImageFromTextTableDataset(TextImageDataset):
         img_transform: Callable = None,
         txt_transform: Callable = None,
         img_extensions: List[str] = IMAGE_EXTENSIONS,
+        index_cache_dir: Optional[str] = None,
+        img_cache: Optional[SharedImageCache] = None,
+        txt_cache_dir: Optional[str] = None,
+        img_loader: Optional[Callable[[str], Image.Image]] = None,
     ):
         if img_dirs is None:
             img_dirs = []
@@ -25,11 +35,23 @@ class TextImageFromTextTableDataset(TextImageDataset):
             img_dirs = [img_dirs]
         # First, load the transcripts and find the corresponding image filenames
         # in the given directory. Also save the IDs (basename) of the examples.
-        self._ids, imgs, txts = _get_images_and_texts_from_text_table(
-            txt_table, img_dirs=img_dirs, img_extensions=img_extensions
+        ids, imgs, txts = _get_images_and_texts_from_text_table(
+            txt_table,
+            img_dirs=img_dirs,
+            img_extensions=img_extensions,
+            index_cache_dir=index_cache_dir,
         )
+        self._ids = StringArray(ids)
         # Prepare dataset using the previous image filenames and transcripts.
-        super().__init__(imgs, txts, img_transform, txt_transform)
+        super().__init__(
+            imgs,
+            txts,
+            img_transform,
+            txt_transform,
+            img_cache=img_cache,
+            txt_cache_dir=txt_cache_dir,
+            img_loader=img_loader,
+        )
 
     def __getitem__(self, index: int) -> Dict[str, Any]:
         """Returns the ID of the example, the image and its transcript from
@@ -47,18 +69,6 @@ class TextImageFromTextTableDataset(TextImageDataset):
         return out
 
 
-def find_image_filepath_from_id(
-    img_id: str, img_dir: Union[str, Path], img_extensions: List[str] = IMAGE_EXTENSIONS
-) -> Optional[str]:
-    extensions = set(ext.lower() for ext in img_extensions)
-    extensions.update(ext.upper() for ext in img_extensions)
-    for ext in extensions:
-        filepath = join(img_dir, img_id if img_id.endswith(ext) else img_id + ext)
-        if isfile(filepath):
-            return filepath
-    return
-
-
 def _load_text_table_from_file(
     table_file: Union[TextIO, str, List[str], Path],
 ) -> Generator[Tuple[int, str, str], None, None]:
@@ -85,26 +95,23 @@ def _get_images_and_texts_from_text_table(
     table_file: Union[TextIO, str, List[str]],
     img_dirs: Optional[List[Union[str, Path]]] = None,
     img_extensions: List[str] = IMAGE_EXTENSIONS,
+    index_cache_dir: Optional[str] = None,
 ) -> Tuple[List[str], List[str], List[str]]:
     if img_dirs is None:
         img_dirs = []
+    indexes = [
+        get_image_directory_index(dir, img_extensions, cache_dir=index_cache_dir)
+        for dir in img_dirs
+    ]
     ids, filepaths, txts = [], [], []
     for img_id, txt in _load_text_table_from_file(table_file):
-        for dir in img_dirs:
-            filepath = find_image_filepath_from_id(
-                img_id, dir, img_extensions=img_extensions
+        # if not found in the directories, the img id must be a path to the image
+        filepath = find_image_filepath(img_id, indexes)
+        if filepath is None:
+            _logger.warning(
+                "No image file found for image ID '{}', ignoring example...", img_id
             )
-            if filepath is not None:
-                break
-        else:
-            if isfile(img_id):
-                # the img id must be a path to the image
-                filepath = img_id
-            else:
-                _logger.warning(
-                    "No image file found for image ID '{}', ignoring example...", img_id
-                )
-                continue
+            continue
         ids.append(img_id)
         filepaths.append(filepath)
         txts.append(txt)
@@ -1 +1,2 @@
+from laia.data.transforms.text.tokenizer import Tokenizer
 from laia.data.transforms.text.transforms import *
@@ -0,0 +1,101 @@
+from typing import Dict, Iterable, List, Union
+
+from laia.utils.symbols_table import SymbolsTable
+
+
+class Tokenizer:
+    """Tokenizer of sentences in the PyLaia format, built once for a set of
+    symbols.
+
+    The symbols are stored in a trie, so each sentence is tokenized in a
+    single pass, finding the longest symbol at each position. The text
+    between the symbols found is kept as a token, and the tokens equal to
+    ``space_display`` are replaced by ``space_token``. Without symbols, each
+    character is a token.
+
+    Args:
+        symbols: Symbols of the vocabulary, or a symbols table.
+        space_token: The token to use for spaces in the tokenized string.
+        space_display: The token used to represent spaces in the input string.
+
+    Example:
+        >>> tokenizer = Tokenizer(["<space>", "<loc>", "a", "b"])
+        >>> tokenizer.tokenize("ab <loc>b")
+        'a b <space> <loc> b'
+        >>> tokenizer.untokenize("a b <space> <loc> b")
+        'ab <loc>b'
+    """
+
+    # key of the trie nodes marking the end of a symbol
+    END = ""
+
+    def __init__(
+        self,
+        symbols: Union[Iterable[str], Dict[str, int], SymbolsTable] = (),
+        space_token: str = "<space>",
+        space_display: str = " ",
+    ) -> None:
+        if isinstance(symbols, SymbolsTable):
+            symbols = symbols._sym2val
+        self.space_token = space_token
+        self.space_display = space_display
+        self.trie = {}
+        for symbol in symbols:
+            if not symbol:
+                continue
+            node = self.trie
+            for c in symbol:
+                node = node.setdefault(c, {})
+            node[self.END] = symbol
+
+    def match(self, sentence: str, start: int) -> int:
+        """End of the longest symbol starting at the given position of the
+        sentence, or ``start`` if there is none"""
+        node, end = self.trie, start
+        for i in range(start, len(sentence)):
+            node = node.get(sentence[i])
+            if node is None:
+                break
+            if self.END in node:
+                end = i + 1
+        return end
+
+    def split(self, sentence: str) -> List[str]:
+        """Split the sentence into the symbols found and the text between
+        them"""
+        if not self.trie:
+            return list(sentence)
+        tokens = []
+        start = i = 0
+        while i < len(sentence):
+            end = self.match(sentence, i)
+            if end == i:
+                i += 1
+                continue
+            if start < i:
+                tokens.append(sentence[start:i])
+            tokens.append(sentence[i:end])
+            start = i = end
+        if start < len(sentence):
+            tokens.append(sentence[start:])
+        return tokens
+
+    def tokenize(self, sentence: str) -> str:
+        return " ".join(
+            self.space_token if token == self.space_display else token
+            for token in self.split(sentence)
+        )
+
+    def tokenize_batch(self, sentences: Iterable[str]) -> List[str]:
+        return [self.tokenize(sentence) for sentence in sentences]
+
+    def untokenize(self, tokenized_sentence: str) -> str:
+        return "".join(tokenized_sentence.split()).replace(
+            self.space_token, self.space_display
+        )
+
+    def untokenize_batch(self, tokenized_sentences: Iterable[str]) -> List[str]:
+        return [self.untokenize(sentence) for sentence in tokenized_sentences]
+
+    def __repr__(self) -> str:
+        return f"text.{self.__class__.__name__}()"
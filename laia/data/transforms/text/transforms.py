@@ -1,10 +1,12 @@
-import re
-from typing import Dict, List, Union
+import functools
+import hashlib
+from typing import Dict, List, Tuple, Union
 
 from bidi import get_display
 
 import laia.common.logging as log
 from laia.common.arguments import ReadingOrder
+from laia.data.transforms.text.tokenizer import Tokenizer
 from laia.utils.symbols_table import SymbolsTable
 
 _logger = log.get_logger(__name__)
@@ -32,6 +34,14 @@ def untokenize(
     return "".join(tokenized_sentence.split()).replace(space_token, space_display)
 
 
+@functools.lru_cache(maxsize=8)
+def _get_tokenizer(
+    symbols: Tuple[str, ...], space_token: str, space_display: str
+) -> Tokenizer:
+    # building the tokenizer of a large vocabulary is slow, reuse it
+    return Tokenizer(symbols, space_token=space_token, space_display=space_display)
+
+
 def tokenize(
     sentence: str,
     space_token: str = "<space>",
@@ -39,7 +49,9 @@ def tokenize(
     symbols: set = {},
 ) -> str:
     """
-    Tokenize the input text in PyLaia format.
+    Tokenize the input text in PyLaia format, using the longest symbol at each
+    position. The tokenizer of the last vocabularies used is kept, use a
+    :class:`Tokenizer` to tokenize many sentences.
 
     Args:
         sentence (str): The input text.
@@ -58,13 +70,7 @@ def tokenize(
         >>> tokenize("I love <location>Paris", symbols=symbols)
         'I <space> l o v e <space> <location> P a r i s'
     """
-    pattern = re.compile(rf"{'|'.join(f'({re.escape(word)})' for word in symbols)}")
-    return " ".join(
-        [
-            space_token if token == space_display else token
-            for token in list(filter(None, pattern.split(sentence)))
-        ]
-    )
+    return _get_tokenizer(tuple(symbols), space_token, space_display).tokenize(sentence)
 
 
 class ToTensor:
@@ -80,19 +86,15 @@ class ToTensor:
         self.reading_order = reading_order
         self.space_token = space_token
         self.space_display = space_display
+        self.tokenizer = (
+            Tokenizer(syms, space_token=space_token, space_display=space_display)
+            if reading_order == ReadingOrder.RTL
+            else None
+        )
 
     def __call__(self, x: str) -> List[int]:
-        if self.reading_order == ReadingOrder.RTL:
-            x = untokenize(
-                x, space_token=self.space_token, space_display=self.space_display
-            )
-            x = get_display(x)
-            x = tokenize(
-                x,
-                space_token=self.space_token,
-                space_display=self.space_display,
-                symbols=set(self._syms._sym2val.keys()),
-            )
+        if self.tokenizer is not None:
+            x = self.tokenizer.tokenize(get_display(self.tokenizer.untokenize(x)))
 
         values = []
         for c in x.split():
@@ -106,5 +108,20 @@ class ToTensor:
             values.append(v)
         return values
 
+    @property
+    def cache_key(self) -> str:
+        """Key identifying the output of the transform, used to cache the
+        encoded transcripts"""
+        syms = self._syms if isinstance(self._syms, Dict) else self._syms._sym2val
+        key = repr(
+            (
+                sorted(syms.items()),
+                ReadingOrder(self.reading_order).value,
+                self.space_token,
+                self.space_display,
+            )
+        )
+        return hashlib.sha1(key.encode()).hexdigest()
+
     def __repr__(self) -> str:
         return f"text.{self.__class__.__name__}()"
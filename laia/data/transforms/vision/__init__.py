@@ -1,3 +1,9 @@
+from laia.data.transforms.vision.batch_random_beta import (
+    BatchDilate,
+    BatchErode,
+    BatchRandomBetaAffine,
+    BatchRandomBetaPerspective,
+)
 from laia.data.transforms.vision.random_beta_affine import RandomBetaAffine
 from laia.data.transforms.vision.random_beta_morphology import Dilate, Erode
 from laia.data.transforms.vision.random_beta_perspective import RandomBetaPerspective
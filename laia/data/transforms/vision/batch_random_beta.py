@@ -0,0 +1,253 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+from laia.data.padding_collater import PaddedTensor
+from laia.data.transforms.vision.random_beta_morphology import RandomBetaMorphology
+
+Batch = Union[torch.Tensor, PaddedTensor]
+
+
+def get_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """Random generator with the given seed. If None, it is seeded from the
+    global NumPy generator, so it follows the seed of the experiment"""
+    if seed is None:
+        seed = np.random.randint(2**31)
+    return np.random.default_rng(seed)
+
+
+def _split_batch(x: Batch) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Data (N x C x H x W) and image sizes (N x 2) of a batch"""
+    if isinstance(x, PaddedTensor):
+        return x.data, x.sizes[:, -2:].to(x.data.device)
+    n, _, h, w = x.size()
+    return x, torch.tensor([[h, w]], device=x.device).expand(n, 2)
+
+
+def _join_batch(x: Batch, data: torch.Tensor) -> Batch:
+    return PaddedTensor(data, x.sizes) if isinstance(x, PaddedTensor) else data
+
+
+def get_mask(sizes: torch.Tensor, height: int, width: int) -> torch.Tensor:
+    """Mask (N x 1 x H x W) of the pixels of each image in a padded batch"""
+    sizes = sizes.to(torch.long)
+    ys = torch.arange(height, device=sizes.device)
+    xs = torch.arange(width, device=sizes.device)
+    mask = (ys[None, :, None] < sizes[:, 0, None, None]) & (
+        xs[None, None, :] < sizes[:, 1, None, None]
+    )
+    return mask.unsqueeze(1)
+
+
+def warp(data: torch.Tensor, sizes: torch.Tensor, matrix: np.ndarray) -> torch.Tensor:
+    """Warp each image of a padded batch with a projective transform.
+
+    Args:
+        data: Padded batch of images (N x C x H x W).
+        sizes: Size (height, width) of each image.
+        matrix: Transform (N x 3 x 3) mapping the pixel coordinates (x, y) of
+            the output images to the coordinates of the input images.
+
+    Returns:
+        The warped images, with zeros outside of the input images and in the
+        padding of the batch.
+    """
+    n, _, h, w = data.size()
+    matrix = torch.as_tensor(matrix, dtype=torch.float32, device=data.device)
+    # coordinates of the pixel centers
+    ys = torch.arange(h, dtype=torch.float32, device=data.device) + 0.5
+    xs = torch.arange(w, dtype=torch.float32, device=data.device) + 0.5
+    ys, xs = torch.meshgrid(ys, xs, indexing="ij")
+    points = torch.stack((xs, ys, torch.ones_like(xs)), dim=-1)
+    points = torch.einsum("hwj,nij->nhwi", points, matrix)
+    points = points[..., :2] / points[..., 2:]
+    # normalize to [-1, 1] for `grid_sample`, far coordinates only get zeros
+    scale = torch.tensor([w, h], dtype=torch.float32, device=data.device)
+    grid = torch.nan_to_num(2 * points / scale - 1, nan=-2, posinf=2, neginf=-2)
+    out = torch.nn.functional.grid_sample(
+        data.float(),
+        grid.clamp_(-2, 2),
+        mode="bilinear",
+        padding_mode="zeros",
+        align_corners=False,
+    )
+    return out.masked_fill_(~get_mask(sizes, h, w), 0).to(data.dtype)
+
+
+class BatchRandomBetaTransform:
+    """Base class of the random geometric transforms applied to whole batches.
+
+    The corners of each image are moved by offsets following a Beta
+    distribution, scaled by the shortest side of its real (unpadded) size.
+    The offsets of the whole batch are sampled at once.
+
+    Args:
+        max_offset_ratio: Maximum offset, relative to the shortest side.
+        alpha: Alpha parameter of the Beta distribution.
+        beta: Beta parameter of the Beta distribution.
+        seed: Seed of the random generator. If None, it is seeded from the
+            global NumPy generator.
+    """
+
+    # corners moved by the transform, relative to the image size
+    corners = ()
+
+    def __init__(
+        self,
+        max_offset_ratio: float = 0.2,
+        alpha: float = 2,
+        beta: float = 2,
+        seed: Optional[int] = None,
+    ) -> None:
+        assert max_offset_ratio > 0
+        assert alpha > 0
+        assert beta > 0
+        self.max_offset_ratio = max_offset_ratio
+        self.alpha = alpha
+        self.beta = beta
+        self.seed = seed
+        self.rng = get_rng(seed)
+
+    def sample_points(self, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Sample the source and destination corners of each image"""
+        h, w = sizes[:, 0].astype(np.float64), sizes[:, 1].astype(np.float64)
+        src = np.asarray(self.corners, dtype=np.float64) * np.stack(
+            (w, h), axis=-1
+        ).reshape(-1, 1, 2)
+        max_offset = np.minimum(w, h) * self.max_offset_ratio
+        z = self.rng.beta(self.alpha, self.beta, size=src.shape)
+        dst = src + (2.0 * z - 1.0) * max_offset.reshape(-1, 1, 1)
+        return src, dst
+
+    def get_matrix(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def __call__(self, x: Batch) -> Batch:
+        data, sizes = _split_batch(x)
+        src, dst = self.sample_points(sizes.cpu().numpy())
+        return _join_batch(x, warp(data, sizes, self.get_matrix(src, dst)))
+
+    def __repr__(self) -> str:
+        return (
+            f"vision.{self.__class__.__name__}("
+            f"max_offset_ratio={self.max_offset_ratio}, "
+            f"alpha={self.alpha}, beta={self.beta}"
+            f"{f', seed={self.seed}' if self.seed is not None else ''})"
+        )
+
+
+class BatchRandomBetaAffine(BatchRandomBetaTransform):
+    """Batched version of :class:`~laia.data.transforms.vision.RandomBetaAffine`."""
+
+    corners = (0, 0), (0, 1), (1, 0)
+
+    def get_matrix(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        # solve [src 1] @ M^T = dst for each image
+        ones = np.ones(src.shape[:2] + (1,))
+        m = np.linalg.solve(np.concatenate((src, ones), axis=-1), dst)
+        matrix = np.zeros((len(src), 3, 3))
+        matrix[:, :2] = m.transpose(0, 2, 1)
+        matrix[:, 2, 2] = 1
+        return matrix
+
+
+class BatchRandomBetaPerspective(BatchRandomBetaTransform):
+    """Batched version of
+    :class:`~laia.data.transforms.vision.RandomBetaPerspective`."""
+
+    corners = (0, 0), (0, 1), (1, 0), (1, 1)
+
+    def get_matrix(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        n = len(src)
+        x, y = src[..., 0], src[..., 1]
+        u, v = dst[..., 0], dst[..., 1]
+        zeros, ones = np.zeros_like(x), np.ones_like(x)
+        # u = (a x + b y + c) / (g x + h y + 1)
+        # v = (d x + e y + f) / (g x + h y + 1)
+        rows_u = np.stack((x, y, ones, zeros, zeros, zeros, -u * x, -u * y), -1)
+        rows_v = np.stack((zeros, zeros, zeros, x, y, ones, -v * x, -v * y), -1)
+        a = np.concatenate((rows_u, rows_v), axis=1)
+        b = np.concatenate((u, v), axis=1)
+        coeffs = np.linalg.solve(a, b[..., None])[..., 0]
+        return np.concatenate((coeffs, np.ones((n, 1))), axis=1).reshape(n, 3, 3)
+
+
+class BatchRandomBetaMorphology(RandomBetaMorphology):
+    """Base class of the random morphological operations applied to whole
+    batches, using max pooling. The filter size of each image is sampled
+    as in :class:`~laia.data.transforms.vision.RandomBetaMorphology`."""
+
+    def __init__(
+        self,
+        filter_size_min: int,
+        filter_size_max: int,
+        alpha: float,
+        beta: float,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(filter_size_min, filter_size_max, alpha, beta)
+        # np.random.Generator is stricter than np.random about the sum
+        probs = np.asarray(self.filter_probs, dtype=np.float64)
+        self.filter_probs = probs / probs.sum()
+        self.rng = get_rng(seed)
+
+    @staticmethod
+    def max_filter(
+        data: torch.Tensor, mask: torch.Tensor, filter_sizes: np.ndarray
+    ) -> torch.Tensor:
+        # the padding of the batch must not change the result
+        out = data.masked_fill(~mask, -float("inf"))
+        for filter_size in np.unique(filter_sizes):
+            idx = torch.from_numpy(np.flatnonzero(filter_sizes == filter_size))
+            idx = idx.to(data.device)
+            out[idx] = torch.nn.functional.max_pool2d(
+                out[idx], int(filter_size), stride=1, padding=int(filter_size) // 2
+            )
+        return out.masked_fill_(~mask, 0)
+
+    def apply(self, data: torch.Tensor, mask: torch.Tensor, filter_sizes: np.ndarray):
+        raise NotImplementedError
+
+    def __call__(self, x: Batch) -> Batch:
+        data, sizes = _split_batch(x)
+        filter_sizes = self.rng.choice(
+            self.filter_sizes, p=self.filter_probs, size=len(data)
+        )
+        mask = get_mask(sizes, data.size(2), data.size(3))
+        out = self.apply(data.float(), mask, filter_sizes)
+        return _join_batch(x, out.to(data.dtype))
+
+
+class BatchDilate(BatchRandomBetaMorphology):
+    """Batched version of :class:`~laia.data.transforms.vision.Dilate`."""
+
+    def __init__(
+        self,
+        filter_size_min: int = 3,
+        filter_size_max: int = 7,
+        alpha: float = 1,
+        beta: float = 3,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(filter_size_min, filter_size_max, alpha, beta, seed=seed)
+
+    def apply(self, data: torch.Tensor, mask: torch.Tensor, filter_sizes: np.ndarray):
+        return self.max_filter(data, mask, filter_sizes)
+
+
+class BatchErode(BatchRandomBetaMorphology):
+    """Batched version of :class:`~laia.data.transforms.vision.Erode`."""
+
+    def __init__(
+        self,
+        filter_size_min: int = 3,
+        filter_size_max: int = 5,
+        alpha: float = 1,
+        beta: float = 3,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(filter_size_min, filter_size_max, alpha, beta, seed=seed)
+
+    def apply(self, data: torch.Tensor, mask: torch.Tensor, filter_sizes: np.ndarray):
+        return -self.max_filter(-data, mask, filter_sizes)
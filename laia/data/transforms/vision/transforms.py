@@ -1,15 +1,21 @@
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
 
+import numpy as np
 import torch
 import torchvision
-from PIL import Image, ImageOps
+from PIL import Image
 
 
 class Invert:
-    """Invert the colors of a PIL image with the given probability."""
+    """Invert the colors of a PIL image. The alpha channel is kept."""
 
     def __call__(self, img: Image) -> Image:
-        return ImageOps.invert(img)
+        x = np.asarray(img)
+        if img.mode == "RGBA":
+            x = np.concatenate((np.invert(x[..., :3]), x[..., 3:]), axis=-1)
+        else:
+            x = np.invert(x)
+        return Image.fromarray(x)
 
     def __repr__(self) -> str:
         return f"vision.{self.__class__.__name__}()"
@@ -30,6 +36,16 @@ class Convert:
 
 
 class ToImageTensor:
+    """Transform a PIL image into a tensor, converting, inverting, distorting,
+    resizing and padding it as requested.
+
+    When the image is resized to ``fixed_height`` and/or ``fixed_width`` and
+    it is at least twice as large as the target size, JPEG images are decoded
+    at a reduced scale (see :meth:`PIL.Image.Image.draft`), which is much
+    faster and uses less memory than decoding them at full resolution.
+    The remaining downscale is then done by :meth:`resize_transform`.
+    """
+
     def __init__(
         self,
         invert: bool = True,
@@ -40,6 +56,7 @@ class ToImageTensor:
         min_height: Optional[int] = None,
         min_width: Optional[int] = None,
         pad_color: int = 0,
+        as_uint8: bool = False,
     ) -> None:
         assert mode in ("L", "RGB", "RGBA")
         assert fixed_height is None or fixed_height > 0
@@ -58,14 +75,35 @@ class ToImageTensor:
         self.min_width = min_width
         self.min_height = min_height
         self.pad_color = pad_color
-        self.tensor_transform = ToTensor()
+        # uint8 images are converted to float in the model device
+        self.tensor_transform = PILToTensor() if as_uint8 else ToTensor()
 
     def __call__(self, img: Image.Image) -> torch.Tensor:
+        return self.finalize(self.decode(img))
+
+    def decode(self, img: Image.Image) -> Image.Image:
+        """Deterministic part of the transform: color conversion and inversion.
+        Its output can be cached across epochs."""
         # W x H
         assert isinstance(img, Image.Image)
+        if self.resize_transform:
+            self.draft(img, fw=self.fixed_width, fh=self.fixed_height)
         img = self.convert_transform(img)
         if self.invert_transform:
             img = self.invert_transform(img)
+        return img
+
+    @property
+    def decode_key(self) -> str:
+        """Parameters changing the output of :meth:`decode`, e.g. to cache it"""
+        return (
+            f"mode={self.convert_transform.mode},"
+            f"invert={self.invert_transform is not None},"
+            f"fixed_size={self.fixed_width}x{self.fixed_height}"
+        )
+
+    def finalize(self, img: Image.Image) -> torch.Tensor:
+        """Rest of the transform, applied to the output of :meth:`decode`."""
         if self.random_transform:
             img = self.random_transform(img)
         if self.resize_transform:
@@ -78,6 +116,40 @@ class ToImageTensor:
         # C x H x W
         return img
 
+    @staticmethod
+    def get_resized_size(
+        size: Tuple[int, int], fw: Optional[int] = None, fh: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Approximate size (width, height) of an image of the given size once
+        resized by :meth:`resize_transform`"""
+        w, h = size
+        if fw and fh:
+            return fw, fh
+        if fw is None:
+            fw = w
+        if fh is None:
+            fh = h
+        if fw > w:
+            return fw, h * fw // w
+        if fh > h:
+            return w * fh // h, fh
+        # downscale keeping the aspect ratio
+        scale = min(fw / w, fh / h)
+        return max(round(w * scale), 1), max(round(h * scale), 1)
+
+    @staticmethod
+    def draft(
+        img: Image.Image, fw: Optional[int] = None, fh: Optional[int] = None
+    ) -> None:
+        """Configure the loader of a JPEG image not loaded yet to decode it at
+        a reduced scale, as long as it stays larger than its resized size"""
+        # draft() does nothing once the image is loaded
+        if img.format != "JPEG":
+            return
+        w, h = ToImageTensor.get_resized_size(img.size, fw=fw, fh=fh)
+        if img.width >= 2 * w and img.height >= 2 * h:
+            img.draft(None, (w, h))
+
     @staticmethod
     def resize_transform(
         img: Image.Image,
@@ -86,8 +158,9 @@ class ToImageTensor:
         resample: int = Image.Resampling.LANCZOS,
     ) -> Image.Image:
         if fw and fh:
-            # resize to a fixed size
-            return img.resize((fw, fh), resample=resample)
+            # resize to a fixed size. Large downscales are done in two steps,
+            # an integer reduction and the resampling, as thumbnail() does
+            return img.resize((fw, fh), resample=resample, reducing_gap=2.0)
         w, h = img.size
         if fw is None:
             fw = w
@@ -138,3 +211,4 @@ class ToImageTensor:
 
 
 ToTensor = torchvision.transforms.transforms.ToTensor
+PILToTensor = torchvision.transforms.transforms.PILToTensor
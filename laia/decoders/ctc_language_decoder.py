@@ -55,7 +55,8 @@ class CTCLanguageDecoder:
         Decode a feature vector using n-gram language modelling.
         Args:
             features (Any): feature vector of size (n_frame, batch_size, n_tokens).
-                Can be either a torch.tensor or a torch.nn.utils.rnn.PackedSequence
+                Can be either a torch.tensor, a torch.nn.utils.rnn.PackedSequence
+                or a tuple of padded features and their lengths.
         Returns:
             out (Dict[str, List]): a dictionary containing the hypothesis (the list of decoded tokens).
                 There is no character-based probability.
@@ -1,5 +1,9 @@
 from laia.engine.data_module import DataModule
+from laia.engine.distillation_engine_module import DistillationEngineModule
 from laia.engine.engine_module import EngineModule
 from laia.engine.evaluator_module import EvaluatorModule
+from laia.engine.exported_model_runtime import ExportedModelRuntime
 from laia.engine.feeder import Compose, ImageFeeder, ItemFeeder
 from laia.engine.htr_engine_module import HTREngineModule
+from laia.engine.sliding_window import SlidingWindow
+from laia.engine.teacher import ArchiveTeacher, ModelTeacher
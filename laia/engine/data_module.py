@@ -1,20 +1,39 @@
 import multiprocessing
+import os
 import random
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pytorch_lightning as pl
 import torch
 from pytorch_lightning.utilities import DeviceType, DistributedType
-from torch.utils.data import DataLoader, DistributedSampler
+from torch.utils.data import (
+    DataLoader,
+    DistributedSampler,
+    RandomSampler,
+    Sampler,
+    SequentialSampler,
+)
 
 import laia.common.logging as log
 import laia.data.transforms as transforms
 from laia.data import (
+    BucketingBatchSampler,
     ImageFromListDataset,
+    ImageIdStreamSampler,
+    ImageLoader,
+    ImageStreamDataset,
+    PackedImageDataset,
     PaddingCollater,
+    PixelBudgetBatchSampler,
+    SharedImageCache,
     TextImageFromTextTableDataset,
 )
+from laia.data.cost_balanced_distributed_sampler import (
+    CostBalancedDistributedSampler,
+)
+from laia.data.image_size_index import get_image_sizes
+from laia.data.packed_image_dataset import is_packed_dataset
 from laia.data.padding_collater import by_descending_width
 from laia.data.unpadded_distributed_sampler import UnpaddedDistributedSampler
 from laia.utils import SymbolsTable
@@ -40,14 +59,46 @@ class DataModule(pl.LightningDataModule):
         reading_order: str = "LTR",
         space_token: str = "<space>",
         space_display: str = " ",
+        bucketing: bool = False,
+        num_buckets: int = 10,
+        img_sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+        max_batch_pixels: Optional[int] = None,
+        index_cache_dir: Optional[str] = None,
+        img_cache_size: Optional[int] = None,
+        img_cache_dir: str = "/dev/shm/pylaia-img-cache",
+        streaming: bool = False,
+        uint8_pipeline: bool = False,
+        fixed_height: Optional[int] = None,
+        fixed_width: Optional[int] = None,
+        image_backend: str = "pil",
+        width_buckets: Optional[List[int]] = None,
     ) -> None:
         assert stage in ("fit", "test")
-        base_img_transform = transforms.vision.ToImageTensor(
-            mode=color_mode, invert=True, min_width=min_valid_size
-        )
+        assert not streaming or stage == "test", "Only test data can be streamed"
+        assert not streaming or not (
+            bucketing or max_batch_pixels
+        ), "Streamed images cannot be bucketed by size"
         self.img_dirs = img_dirs
         self.img_channels = len(color_mode)
         self.batch_size = batch_size
+        self.min_valid_size = min_valid_size
+        self.bucketing = bucketing
+        self.num_buckets = num_buckets
+        self.img_sizes = img_sizes
+        self.max_batch_pixels = max_batch_pixels
+        self.index_cache_dir = index_cache_dir
+        self.streaming = streaming
+        self.fixed_height = fixed_height
+        self.fixed_width = fixed_width
+        self.width_buckets = width_buckets
+        self.img_loader = ImageLoader(image_backend, mode=color_mode)
+        # images decoded differently (e.g. with another fixed size or image
+        # backend) have different keys, see ImageDataset.get_cache_key
+        self.img_cache = (
+            SharedImageCache(os.path.join(img_cache_dir, color_mode), img_cache_size)
+            if img_cache_size
+            else None
+        )
         # TODO: https://github.com/PyTorchLightning/pytorch-lightning/issues/2196
         self.num_workers = num_workers or multiprocessing.cpu_count()
         if stage == "fit":
@@ -56,10 +107,14 @@ class DataModule(pl.LightningDataModule):
             self.tr_txt_table = tr_txt_table
             self.va_txt_table = va_txt_table
             self.shuffle_tr = shuffle_tr
+            # packed datasets store their images already inverted
             tr_img_transform = transforms.vision.ToImageTensor(
                 mode=color_mode,
-                invert=True,
+                invert=not is_packed_dataset(tr_txt_table),
                 min_width=min_valid_size,
+                as_uint8=uint8_pipeline,
+                fixed_height=fixed_height,
+                fixed_width=fixed_width,
                 random_transform=transforms.vision.RandomBetaAffine()
                 if augment_tr
                 else None,
@@ -70,46 +125,113 @@ class DataModule(pl.LightningDataModule):
                 space_token=space_token,
                 space_display=space_display,
             )
-            self.save_hyperparameters()
+            # the image sizes can be too large to be logged
+            self.save_hyperparameters(ignore="img_sizes")
 
             _logger.info(f"Training data transforms:\n{tr_img_transform}")
             super().__init__(
                 train_transforms=(tr_img_transform, txt_transform),
-                val_transforms=base_img_transform,
+                val_transforms=transforms.vision.ToImageTensor(
+                    mode=color_mode,
+                    invert=not is_packed_dataset(va_txt_table),
+                    min_width=min_valid_size,
+                    as_uint8=uint8_pipeline,
+                    fixed_height=fixed_height,
+                    fixed_width=fixed_width,
+                ),
             )
         elif stage == "test":
             self.te_ds = None
             self.te_img_list = te_img_list
-            super().__init__(test_transforms=base_img_transform)
+            super().__init__(
+                test_transforms=transforms.vision.ToImageTensor(
+                    mode=color_mode,
+                    invert=not is_packed_dataset(te_img_list),
+                    min_width=min_valid_size,
+                    as_uint8=uint8_pipeline,
+                    fixed_height=fixed_height,
+                    fixed_width=fixed_width,
+                )
+            )
 
     def setup(self, stage: Optional[str] = None):
         if stage == "fit":
             tr_img_transform, txt_transform = self.train_transforms
-            self.tr_ds = TextImageFromTextTableDataset(
-                self.tr_txt_table,
-                self.img_dirs,
-                img_transform=tr_img_transform,
-                txt_transform=txt_transform,
+            self.tr_ds = self.get_text_image_dataset(
+                self.tr_txt_table, tr_img_transform, txt_transform
             )
-            self.va_ds = TextImageFromTextTableDataset(
-                self.va_txt_table,
-                self.img_dirs,
-                img_transform=self.val_transforms,
-                txt_transform=txt_transform,
+            self.va_ds = self.get_text_image_dataset(
+                self.va_txt_table, self.val_transforms, txt_transform
             )
         elif stage == "test":
-            self.te_ds = ImageFromListDataset(
-                self.te_img_list,
-                img_dirs=self.img_dirs,
-                img_transform=self.test_transforms,
-            )
+            if self.streaming:
+                # the images are listed by the sampler of the dataloader
+                self.te_ds = ImageStreamDataset(
+                    img_transform=self.test_transforms, img_loader=self.img_loader
+                )
+            elif is_packed_dataset(self.te_img_list):
+                self.te_ds = PackedImageDataset(
+                    self.te_img_list, img_transform=self.test_transforms
+                )
+            else:
+                self.te_ds = ImageFromListDataset(
+                    self.te_img_list,
+                    img_dirs=self.img_dirs,
+                    img_transform=self.test_transforms,
+                    index_cache_dir=self.index_cache_dir,
+                    img_loader=self.img_loader,
+                )
         else:
             raise ValueError
 
+    @property
+    def is_distributed(self) -> bool:
+        # the data module can be used without a trainer, e.g. by ExportedModelRuntime
+        return (
+            self.trainer is not None
+            and self.trainer.accelerator_connector.is_distributed
+        )
+
+    @property
+    def pin_memory(self) -> bool:
+        return self.trainer is not None and self.trainer._device_type == DeviceType.GPU
+
+    def get_text_image_dataset(
+        self, txt_table: str, img_transform: Callable, txt_transform: Callable
+    ) -> torch.utils.data.Dataset:
+        # packed datasets are not cached, their images are already decoded
+        if is_packed_dataset(txt_table):
+            return PackedImageDataset(
+                txt_table, img_transform=img_transform, txt_transform=txt_transform
+            )
+        return TextImageFromTextTableDataset(
+            txt_table,
+            self.img_dirs,
+            img_transform=img_transform,
+            txt_transform=txt_transform,
+            index_cache_dir=self.index_cache_dir,
+            img_cache=self.img_cache,
+            txt_cache_dir=self.index_cache_dir,
+            img_loader=self.img_loader,
+        )
+
+    def get_cost_balanced_distributed_sampler(
+        self, ds: torch.utils.data.Dataset
+    ) -> CostBalancedDistributedSampler:
+        costs = [h * w for h, w in self.get_img_sizes(ds)]
+        return CostBalancedDistributedSampler(
+            ds, costs, **self.trainer.distributed_sampler_kwargs
+        )
+
     def get_unpadded_distributed_sampler(
         self, ds: torch.utils.data.Dataset
     ) -> Optional[DistributedSampler]:
-        if not self.trainer._distrib_type == DistributedType.DP:
+        if self.is_distributed and (
+            self.bucketing or self.max_batch_pixels or self.img_sizes is not None
+        ):
+            # the image sizes are known, balance the pixels of each process
+            return self.get_cost_balanced_distributed_sampler(ds)
+        if self.trainer is None or self.trainer._distrib_type != DistributedType.DP:
             return
         return UnpaddedDistributedSampler(
             ds,
@@ -118,45 +240,154 @@ class DataModule(pl.LightningDataModule):
             shuffle=False,
         )
 
+    def get_img_sizes(self, ds: torch.utils.data.Dataset) -> List[Tuple[int, int]]:
+        """Size (height, width) of each image of the dataset once transformed"""
+        if isinstance(ds, PackedImageDataset):
+            sizes = ds.sizes
+        else:
+            img_sizes = self.img_sizes or {}
+            missing = [img for img in ds._imgs if img not in img_sizes]
+            missing_sizes = {
+                img: (h, w) for img, (w, h) in zip(missing, get_image_sizes(missing))
+            }
+            sizes = [img_sizes.get(img) or missing_sizes[img] for img in ds._imgs]
+        if self.fixed_height or self.fixed_width:
+            resized_sizes = (
+                transforms.vision.ToImageTensor.get_resized_size(
+                    (w, h), fw=self.fixed_width, fh=self.fixed_height
+                )
+                for h, w in sizes
+            )
+            sizes = [(h, w) for w, h in resized_sizes]
+        if self.min_valid_size is None:
+            return sizes
+        return [(h, max(w, self.min_valid_size)) for h, w in sizes]
+
+    def get_batching_kwargs(
+        self,
+        ds: torch.utils.data.Dataset,
+        shuffle: bool,
+        sampler: Optional[Sampler] = None,
+    ) -> Dict[str, Any]:
+        if not self.bucketing and self.max_batch_pixels is None:
+            return {
+                "batch_size": self.batch_size,
+                "shuffle": shuffle,
+                "sampler": sampler,
+            }
+        # with a pixel budget, the number of training batches of each process
+        # would differ and make the processes wait for each other forever at
+        # the gradient synchronization, so the batches of the whole dataset
+        # are distributed instead
+        distributed_batches = (
+            sampler is None
+            and self.is_distributed
+            and self.max_batch_pixels is not None
+        )
+        if distributed_batches:
+            sampler = SequentialSampler(ds)
+        elif sampler is None:
+            if self.is_distributed:
+                # the trainer cannot replace the sampler of our batch
+                # samplers, so they have to be distributed already
+                sampler = (
+                    DistributedSampler(
+                        ds, shuffle=True, **self.trainer.distributed_sampler_kwargs
+                    )
+                    if shuffle
+                    else self.get_cost_balanced_distributed_sampler(ds)
+                )
+            else:
+                sampler = RandomSampler(ds) if shuffle else SequentialSampler(ds)
+        if self.max_batch_pixels is None:
+            batch_sampler = BucketingBatchSampler(
+                sampler,
+                self.get_img_sizes(ds),
+                batch_size=self.batch_size,
+                num_buckets=self.num_buckets,
+                shuffle=shuffle,
+            )
+        else:
+            batch_sampler = PixelBudgetBatchSampler(
+                sampler,
+                self.get_img_sizes(ds),
+                self.max_batch_pixels,
+                num_buckets=self.num_buckets,
+                shuffle=shuffle,
+                **(
+                    # the same seed in all the processes, set by seed_everything
+                    dict(
+                        seed=torch.initial_seed(),
+                        **self.trainer.distributed_sampler_kwargs,
+                    )
+                    if distributed_batches
+                    else {}
+                ),
+            )
+        return {"batch_sampler": batch_sampler}
+
+    def get_collate_fn(self) -> PaddingCollater:
+        return PaddingCollater(
+            {"img": (self.img_channels, None, None)},
+            sort_key=by_descending_width,
+            # without workers, the batches are collated directly in pinned memory
+            pin_memory=self.pin_memory,
+            width_buckets=self.width_buckets,
+        )
+
     def train_dataloader(self) -> DataLoader:
         assert self.tr_ds is not None
         return DataLoader(
             dataset=self.tr_ds,
-            batch_size=self.batch_size,
             num_workers=self.num_workers,
-            shuffle=self.shuffle_tr,
+            **self.get_batching_kwargs(self.tr_ds, self.shuffle_tr),
             worker_init_fn=DataModule.worker_init_fn,
-            pin_memory=self.trainer._device_type == DeviceType.GPU,
-            collate_fn=PaddingCollater(
-                {"img": (self.img_channels, None, None)}, sort_key=by_descending_width
-            ),
+            pin_memory=self.pin_memory,
+            collate_fn=self.get_collate_fn(),
         )
 
     def val_dataloader(self) -> DataLoader:
         assert self.va_ds is not None
         return DataLoader(
             dataset=self.va_ds,
-            batch_size=self.batch_size,
-            shuffle=False,
-            sampler=self.get_unpadded_distributed_sampler(self.va_ds),
-            num_workers=self.num_workers,
-            pin_memory=self.trainer._device_type == DeviceType.GPU,
-            collate_fn=PaddingCollater(
-                {"img": (self.img_channels, None, None)}, sort_key=by_descending_width
+            **self.get_batching_kwargs(
+                self.va_ds,
+                False,
+                sampler=self.get_unpadded_distributed_sampler(self.va_ds),
             ),
+            num_workers=self.num_workers,
+            pin_memory=self.pin_memory,
+            collate_fn=self.get_collate_fn(),
         )
 
+    def get_stream_batching_kwargs(self) -> Dict[str, Any]:
+        distributed_kwargs = (
+            self.trainer.distributed_sampler_kwargs if self.is_distributed else {}
+        )
+        sampler = ImageIdStreamSampler(
+            self.te_img_list,
+            img_dirs=self.img_dirs,
+            index_cache_dir=self.index_cache_dir,
+            **distributed_kwargs,
+        )
+        return {"batch_size": self.batch_size, "sampler": sampler}
+
     def test_dataloader(self) -> DataLoader:
         assert self.te_ds is not None
         return DataLoader(
             dataset=self.te_ds,
-            batch_size=self.batch_size,
-            sampler=self.get_unpadded_distributed_sampler(self.te_ds),
-            num_workers=self.num_workers,
-            pin_memory=self.trainer._device_type == DeviceType.GPU,
-            collate_fn=PaddingCollater(
-                {"img": (self.img_channels, None, None)}, sort_key=by_descending_width
+            **(
+                self.get_stream_batching_kwargs()
+                if self.streaming
+                else self.get_batching_kwargs(
+                    self.te_ds,
+                    False,
+                    sampler=self.get_unpadded_distributed_sampler(self.te_ds),
+                )
             ),
+            num_workers=self.num_workers,
+            pin_memory=self.pin_memory,
+            collate_fn=self.get_collate_fn(),
         )
 
     @staticmethod
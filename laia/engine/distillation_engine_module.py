@@ -0,0 +1,61 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import torch
+
+from laia.common.arguments import OptimizerArgs, SchedulerArgs
+from laia.engine.htr_engine_module import HTREngineModule
+from laia.losses.distillation_loss import DistillationLoss
+
+
+class DistillationEngineModule(HTREngineModule):
+    """
+    Train a (student) model on the CTC loss mixed with the KL divergence to
+    the frame posteriors of a teacher (see
+    :class:`~laia.losses.distillation_loss.DistillationLoss`).
+
+    The teacher is a callable returning its output for a batch, e.g. a
+    :class:`~laia.engine.teacher.ModelTeacher` or an
+    :class:`~laia.engine.teacher.ArchiveTeacher`, called with the batch and
+    the input of the student, after the batched augmentation. A teacher
+    model thus sees the same augmented images as the student, whereas the
+    outputs read from an archive were computed beforehand on the images
+    without augmentation. The teacher is only used in training: the
+    validation loss is the CTC loss of the student.
+    """
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        delimiters: Iterable,
+        teacher: Callable,
+        alpha: float = 0.5,
+        temperature: float = 1.0,
+        optimizer: OptimizerArgs = OptimizerArgs(),
+        scheduler: Optional[SchedulerArgs] = None,
+        batch_input_fn: Optional[Callable] = None,
+        batch_target_fn: Optional[Callable] = None,
+        batch_id_fn: Optional[Callable] = None,
+        batch_augmentation: Optional[Callable] = None,
+        compile_model: bool = False,
+    ):
+        super().__init__(
+            model,
+            delimiters,
+            criterion=DistillationLoss(alpha=alpha, temperature=temperature),
+            optimizer=optimizer,
+            scheduler=scheduler,
+            batch_input_fn=batch_input_fn,
+            batch_target_fn=batch_target_fn,
+            batch_id_fn=batch_id_fn,
+            batch_augmentation=batch_augmentation,
+            compile_model=compile_model,
+        )
+        self.teacher = teacher
+        # the teacher is not needed to load the student from its checkpoints
+        self.hparams.pop("teacher", None)
+
+    def get_loss_kwargs(self, batch: Any, batch_x: Any = None) -> Dict[str, Any]:
+        kwargs = super().get_loss_kwargs(batch, batch_x=batch_x)
+        if self.training:
+            kwargs["teacher"] = self.teacher(batch, batch_x)
+        return kwargs
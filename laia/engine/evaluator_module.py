@@ -4,19 +4,46 @@ import pytorch_lightning as pl
 import torch
 
 from laia.engine.engine_exception import exception_catcher
+from laia.engine.engine_module import compile_for_static_shapes, uint8_to_float
+from laia.engine.sliding_window import SlidingWindow
 
 
 class EvaluatorModule(pl.LightningModule):
+    """
+    Run a model on the test batches.
+
+    Args:
+        model: Model to evaluate.
+        batch_input_fn: Function returning the model input of a batch.
+        batch_id_fn: Function returning the ids of the samples of a batch.
+        chunk_width: If set, the images wider than this number of pixels are
+            split into overlapping windows, which are run as a batch, and the
+            frames of the windows are stitched back together. See
+            :class:`~laia.engine.sliding_window.SlidingWindow`.
+        chunk_context: Number of frames of context discarded at each border
+            of the windows.
+        compile_model: Whether to compile the model with `torch.compile`,
+            see :func:`~laia.engine.engine_module.compile_for_static_shapes`.
+    """
+
     def __init__(
         self,
         model: torch.nn.Module,
         batch_input_fn: Optional[Callable] = None,
         batch_id_fn: Optional[Callable] = None,
+        chunk_width: Optional[int] = None,
+        chunk_context: int = 32,
+        compile_model: bool = False,
     ):
         super().__init__()
-        self.model = model
+        self.model = compile_for_static_shapes(model) if compile_model else model
         self.batch_input_fn = batch_input_fn
         self.batch_id_fn = batch_id_fn
+        self.sliding_window = (
+            SlidingWindow(model, chunk_width, context=chunk_context)
+            if chunk_width
+            else None
+        )
 
     def test_step(self, batch: Any, *args, **kwargs) -> torch.Tensor:
         batch_x = self.batch_input_fn(batch)
@@ -25,6 +52,9 @@ class EvaluatorModule(pl.LightningModule):
             self.current_epoch,
             self.global_step,
         ):
+            batch_x = uint8_to_float(batch_x)
+            if self.sliding_window is not None:
+                return self.sliding_window(batch_x)
             return self.model(batch_x)
 
     def get_progress_bar_dict(self):
@@ -0,0 +1,94 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pytorch_lightning as pl
+import torch
+from torch.nn.utils.rnn import PackedSequence, pack_padded_sequence
+
+from laia.data import PaddedTensor
+from laia.engine.data_module import DataModule
+from laia.engine.engine_module import uint8_to_float
+from laia.models.htr.exportable_crnn import METADATA_FILENAME
+
+
+class ExportedModelRuntime:
+    """
+    Run a model exported to TorchScript (".pt") or ONNX (".onnx") by
+    `pylaia-htr-export` on the test batches of a `DataModule`, without the
+    PyTorch Lightning trainer.
+
+    The TorchScript graph is frozen and optimized for inference by
+    :func:`torch.jit.optimize_for_inference`, the ONNX graph is run by
+    ONNX Runtime, which applies its own graph optimizations. The outputs are
+    returned as a `PackedSequence`, like those of `LaiaCRNN`, so that they
+    can be given to the test callbacks of the `EvaluatorModule`.
+
+    Args:
+        filepath: Path of the exported model.
+        batch_input_fn: Function returning the images of a batch.
+        batch_id_fn: Function returning the ids of the images of a batch.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        batch_input_fn: Optional[Callable] = None,
+        batch_id_fn: Optional[Callable] = None,
+    ) -> None:
+        self.filepath = filepath
+        self.batch_input_fn = batch_input_fn
+        self.batch_id_fn = batch_id_fn
+        if filepath.endswith(".onnx"):
+            import onnxruntime
+
+            self._model = None
+            self._session = onnxruntime.InferenceSession(
+                filepath, providers=["CPUExecutionProvider"]
+            )
+            metadata = self._session.get_modelmeta().custom_metadata_map
+        else:
+            metadata = {METADATA_FILENAME: ""}
+            model = torch.jit.load(filepath, map_location="cpu", _extra_files=metadata)
+            self._model = torch.jit.optimize_for_inference(model.eval())
+            self._session = None
+        self.metadata: Dict[str, Any] = json.loads(metadata[METADATA_FILENAME])
+
+    def __call__(self, x: Union[torch.Tensor, PaddedTensor]) -> PackedSequence:
+        x, xs = (x.data, x.sizes) if isinstance(x, PaddedTensor) else (x, None)
+        widths = (
+            xs[:, 1].cpu()
+            if xs is not None
+            else torch.full((x.size(0),), x.size(-1), dtype=torch.long)
+        )
+        x = uint8_to_float(x.cpu()).contiguous()
+        if self._session is not None:
+            logits, lengths = self._session.run(
+                None, {"images": x.numpy(), "widths": widths.numpy()}
+            )
+            logits, lengths = torch.from_numpy(logits), torch.from_numpy(lengths)
+        else:
+            with torch.no_grad():
+                logits, lengths = self._model(x, widths)
+        return pack_padded_sequence(logits, lengths, enforce_sorted=False)
+
+    def get_min_valid_image_size(self, max_search_size: int) -> int:
+        """Same as `LaiaCRNN.get_min_valid_image_size`, stored when exporting"""
+        min_valid_size = self.metadata["min_valid_size"]
+        if min_valid_size > max_search_size:
+            raise ValueError(
+                f"Images of size {max_search_size} pixels would produce invalid "
+                "output sizes. Please review your model architecture."
+            )
+        return min_valid_size
+
+    def test_step(self, batch: Any) -> PackedSequence:
+        return self(self.batch_input_fn(batch))
+
+    def test(self, data_module: DataModule, callbacks: List[pl.Callback]) -> None:
+        """Run the model on the test batches of the data module and give the
+        outputs to the `on_test_batch_end` hook of the callbacks"""
+        data_module.setup(stage="test")
+        for batch_idx, batch in enumerate(data_module.test_dataloader()):
+            outputs = self.test_step(batch)
+            for callback in callbacks:
+                callback.on_test_batch_end(None, self, outputs, batch, batch_idx, 0)
@@ -5,7 +5,7 @@ import torch
 from laia.callbacks.meters import SequenceError, char_to_word_seq
 from laia.common.arguments import OptimizerArgs, SchedulerArgs
 from laia.decoders import CTCGreedyDecoder
-from laia.engine import EngineModule
+from laia.engine.engine_module import EngineModule
 from laia.losses import CTCLoss
 
 
@@ -20,6 +20,8 @@ class HTREngineModule(EngineModule):
         batch_input_fn: Optional[Callable] = None,
         batch_target_fn: Optional[Callable] = None,
         batch_id_fn: Optional[Callable] = None,
+        batch_augmentation: Optional[Callable] = None,
+        compile_model: bool = False,
     ):
         super().__init__(
             model,
@@ -29,6 +31,8 @@ class HTREngineModule(EngineModule):
             batch_input_fn=batch_input_fn,
             batch_target_fn=batch_target_fn,
             batch_id_fn=batch_id_fn,
+            batch_augmentation=batch_augmentation,
+            compile_model=compile_model,
         )
         self.delimiters = delimiters
         self.decoder = CTCGreedyDecoder()
@@ -0,0 +1,154 @@
+import math
+from typing import List, Tuple, Union
+
+import torch
+from torch.nn.utils.rnn import (
+    PackedSequence,
+    pack_padded_sequence,
+    pad_sequence,
+)
+
+from laia.data import PaddedTensor
+from laia.losses.ctc_loss import transform_batch
+from laia.models.htr.conv_block import ConvBlock
+
+
+class SlidingWindow:
+    """
+    Run a CRNN on overlapping windows of the images wider than `width`
+    pixels, and stitch the frames of the windows back into a sequence per
+    image.
+
+    The windows start at a multiple of the downsampling factor of the
+    convolutional blocks, so that their frames are aligned with those of the
+    full image. The frames at the borders of each window are discarded: those
+    whose receptive field crosses the border, which are computed from the
+    zero padding instead of the neighbouring pixels, and `context` more
+    frames, which give some context to the recurrent layers. The
+    convolutional features of the kept frames are the same as for the full
+    image, but the recurrent layers only see the frames of their window, so
+    the output only matches the full width inference up to a tolerance, which
+    decreases as `context` increases.
+
+    The windows of all the images of a batch are run as a single batch.
+
+    Args:
+        model: Model with a `conv` sequence of `ConvBlock`, for horizontal
+            text, e.g. a `LaiaCRNN`.
+        width: Width of the windows, in pixels.
+        context: Number of frames discarded at each border of a window, on
+            top of those affected by the borders of the window.
+    """
+
+    def __init__(self, model: torch.nn.Module, width: int, context: int = 32) -> None:
+        conv = getattr(model, "conv", None)
+        if conv is None or not all(isinstance(block, ConvBlock) for block in conv):
+            raise ValueError(
+                "Sliding window inference requires a model with convolutional blocks"
+            )
+        sequencer = getattr(model, "sequencer", None)
+        if sequencer is not None and not sequencer.columnwise:
+            raise ValueError(
+                "Sliding window inference is not supported for vertical text"
+            )
+        self.model = model
+        self.width = width
+        self.blocks = list(conv)
+        self.factor, receptive_field = SlidingWindow.get_width_geometry(self.blocks)
+        self.margin = math.ceil(receptive_field / (2 * self.factor)) + context
+        self.step = self.get_output_width(width) - 2 * self.margin
+        if self.step < 1:
+            raise ValueError(
+                f"Windows of {width} pixels are too narrow to discard "
+                f"{self.margin} frames at each border. Please increase the width "
+                "of the windows or decrease the context"
+            )
+
+    @staticmethod
+    def get_width_geometry(blocks: List[ConvBlock]) -> Tuple[int, int]:
+        """Downsampling factor and receptive field of the blocks, in pixels,
+        along the width"""
+        factor, receptive_field = 1, 1
+        for block in blocks:
+            receptive_field += (
+                (block.conv.kernel_size[1] - 1) * block.conv.dilation[1] * factor
+            )
+            factor *= block.conv.stride[1]
+            if block.poolsize:
+                receptive_field += (block.poolsize[1] - 1) * factor
+                factor *= block.poolsize[1]
+        return factor, receptive_field
+
+    def get_output_width(self, width: int) -> int:
+        for block in self.blocks:
+            width = ConvBlock.get_output_size(
+                width,
+                kernel_size=block.conv.kernel_size[1],
+                dilation=block.conv.dilation[1],
+                stride=block.conv.stride[1],
+                poolsize=block.poolsize[1] if block.poolsize else None,
+                padding=block.conv.padding[1],
+            )
+        return width
+
+    def get_windows(self, width: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Windows of an image of the given width: the start and end pixels of
+        each window, and the start and end of the frames kept from its output.
+        """
+        num_frames = self.get_output_width(width)
+        if width <= self.width:
+            return [(0, width, 0, num_frames)]
+        windows = []
+        for a in range(0, num_frames, self.step):
+            b = min(a + self.step, num_frames)
+            start, end = max(a - self.margin, 0), b + self.margin
+            windows.append(
+                (
+                    start * self.factor,
+                    end * self.factor if end < num_frames else width,
+                    a - start,
+                    b - start,
+                )
+            )
+        return windows
+
+    def __call__(
+        self, x: Union[torch.Tensor, PaddedTensor]
+    ) -> Union[torch.Tensor, PackedSequence]:
+        x, xs = (x.data, x.sizes) if isinstance(x, PaddedTensor) else (x, None)
+        if x.size(-1) <= self.width:
+            return self.model(x if xs is None else PaddedTensor.build(x, xs))
+        if xs is None:
+            xs = torch.tensor([x.size()[2:]] * x.size(0))
+
+        windows = [
+            (i, *window)
+            for i, width in enumerate(xs[:, -1].tolist())
+            for window in self.get_windows(width)
+        ]
+        # the model expects the samples sorted by decreasing width
+        order = sorted(range(len(windows)), key=lambda j: windows[j][1] - windows[j][2])
+        max_width = max(end - start for _, start, end, _, _ in windows)
+        batch = x.new_zeros(len(windows), *x.size()[1:3], max_width)
+        batch_sizes = xs.new_empty(len(windows), xs.size(1))
+        for k, j in enumerate(order):
+            i, start, end, _, _ = windows[j]
+            batch[k, ..., : end - start] = x[i, ..., start:end]
+            batch_sizes[k] = xs[i]
+            batch_sizes[k, -1] = end - start
+        y, _ = transform_batch(self.model(PaddedTensor.build(batch, batch_sizes)))
+
+        frames = [None] * len(windows)
+        for k, j in enumerate(order):
+            a, b = windows[j][3:]
+            frames[j] = y[a:b, k]
+        outputs = [[] for _ in range(x.size(0))]
+        for (i, *_), f in zip(windows, frames):
+            outputs[i].append(f)
+        outputs = [torch.cat(f) for f in outputs]
+        return pack_padded_sequence(
+            pad_sequence(outputs),
+            [len(f) for f in outputs],
+            enforce_sorted=False,
+        )
@@ -0,0 +1,90 @@
+from typing import Any, Callable, Optional
+
+import torch
+from torch.nn.utils.rnn import pad_sequence
+
+from laia.data import PaddedTensor
+from laia.engine.engine_module import uint8_to_float
+from laia.losses.ctc_loss import transform_batch
+from laia.nn import PaddedSequence
+from laia.utils import ArchiveMatrixReader
+
+
+class ModelTeacher:
+    """
+    Run a teacher model on the input images of each batch, without gradients.
+
+    The teacher is given the input of the student, i.e. after the batched
+    augmentation, so that their outputs are computed on the same images. If
+    it is not given, the input is taken from the batch with `batch_input_fn`.
+
+    The model is not a submodule of the engine, so it is neither trained nor
+    saved in the checkpoints of the student, and it is moved to the device of
+    the batches on the fly.
+    """
+
+    def __init__(self, model: torch.nn.Module, batch_input_fn: Callable) -> None:
+        self.model = model.eval()
+        for param in self.model.parameters():
+            param.requires_grad = False
+        self.batch_input_fn = batch_input_fn
+
+    def __call__(self, batch, batch_x: Optional[Any] = None) -> PaddedSequence:
+        if batch_x is None:
+            batch_x = uint8_to_float(self.batch_input_fn(batch))
+        x = batch_x.data if isinstance(batch_x, PaddedTensor) else batch_x
+        self.model.to(x.device)
+        with torch.no_grad():
+            y, ys = transform_batch(self.model(batch_x))
+        return PaddedSequence(y, torch.as_tensor(ys))
+
+
+class ArchiveTeacher:
+    """
+    Read the output of a teacher model for the images of each batch from a
+    Kaldi's archive of matrices, as written by `pylaia-htr-netout`.
+
+    The matrices can contain the logits, the log-probabilities or the
+    probabilities of each frame (see `netout.output_transform`). The
+    probabilities are detected and converted to log-probabilities. If
+    `num_labels` is given, the width of the matrices is checked against it.
+
+    The matrices are computed beforehand on the images without augmentation,
+    so the input of the student is ignored: with the batched augmentation,
+    the student and the teacher do not see exactly the same images.
+    """
+
+    def __init__(
+        self, filepath: str, batch_id_fn: Callable, num_labels: Optional[int] = None
+    ) -> None:
+        self.reader = ArchiveMatrixReader(filepath)
+        self.batch_id_fn = batch_id_fn
+        self.num_labels = num_labels
+        if num_labels is not None and len(self.reader):
+            width = self.reader[next(iter(self.reader))].size(1)
+            assert width == num_labels, (
+                f"The teacher archive has matrices of width {width}, "
+                f"but the student has {num_labels} output labels"
+            )
+
+    @staticmethod
+    def is_probability(matrix: torch.Tensor) -> bool:
+        return bool(
+            (matrix >= 0).all()
+            and torch.allclose(
+                matrix.sum(-1), matrix.new_ones(matrix.size(0)), atol=1e-3
+            )
+        )
+
+    def __call__(self, batch, batch_x: Optional[Any] = None) -> PaddedSequence:
+        matrices = []
+        for key in self.batch_id_fn(batch):
+            if key not in self.reader:
+                raise KeyError(f"The teacher output for {key} is not in the archive")
+            matrix = self.reader[key].float()
+            if self.is_probability(matrix):
+                matrix = matrix.clamp(min=torch.finfo(matrix.dtype).tiny).log()
+            matrices.append(matrix)
+        return PaddedSequence(
+            pad_sequence(matrices), torch.tensor([len(m) for m in matrices])
+        )
@@ -1 +1,2 @@
 from laia.losses.ctc_loss import CTCLoss
+from laia.losses.distillation_loss import DistillationLoss
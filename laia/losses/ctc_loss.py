@@ -13,6 +13,9 @@ def transform_batch(batch):
     # size: T x N x C
     if isinstance(batch, torch.nn.utils.rnn.PackedSequence):
         x, xs = torch.nn.utils.rnn.pad_packed_sequence(batch)
+    elif isinstance(batch, tuple) and len(batch) == 2:
+        # padded sequences and their lengths, e.g. a PaddedSequence
+        x, xs = batch[0], batch[1].cpu()
     elif isinstance(batch, torch.Tensor):
         x, xs = batch, [batch.size(0)] * batch.size(1)
     else:
@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import torch
+import torch.nn.functional as F
+
+from laia.losses.ctc_loss import CTCLoss, transform_batch
+from laia.losses.loss import Loss
+
+
+def resample_frames(
+    x: torch.Tensor,
+    xs: Union[torch.Tensor, Sequence[int]],
+    lengths: Union[torch.Tensor, Sequence[int]],
+) -> torch.Tensor:
+    """
+    Resample the frames of each sequence `x[: xs[n], n]` (T x N x D) to
+    `lengths[n]` frames, by averaging neighbouring frames when the sequence
+    is shortened and by linear interpolation when it is lengthened. Each
+    output frame is a convex combination of input frames, so the frame
+    posteriors of a model remain probability distributions.
+
+    The output is padded with zeros to the maximum length (T' x N x D).
+    """
+    xs, lengths = [int(n) for n in xs], [int(n) for n in lengths]
+    y = x.new_zeros(max(lengths), x.size(1), x.size(2))
+    for n, (src, dst) in enumerate(zip(xs, lengths)):
+        frames = x[:src, n].t().unsqueeze(0)  # 1 x D x src
+        if dst < src:
+            frames = F.adaptive_avg_pool1d(frames, dst)
+        elif dst > src:
+            frames = F.interpolate(frames, size=dst, mode="linear")
+        y[:dst, n] = frames[0].t()
+    return y
+
+
+class DistillationLoss(Loss):
+    """
+    CTC loss mixed with the Kullback-Leibler divergence from the frame
+    posteriors of a teacher model to those of the trained (student) model:
+    `(1 - alpha) * ctc + alpha * temperature^2 * kl`.
+
+    The KL divergence is summed over the frames of each sample and averaged
+    over the batch, like the CTC loss. The teacher frames are resampled to the
+    number of frames of the student, so the models can have different
+    downsampling factors. Without teacher output, e.g. in validation, only
+    the CTC loss is computed.
+
+    Attributes:
+      alpha (float): Weight of the KL divergence. Default: 0.5.
+      temperature (float): Temperature of the softmax of both models.
+        Default: 1.0.
+      ctc (CTCLoss): The CTC loss. Default: ``CTCLoss()``.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.5,
+        temperature: float = 1.0,
+        ctc: Optional[CTCLoss] = None,
+    ):
+        super().__init__()
+        assert 0.0 <= alpha <= 1.0, f"Alpha must be in [0, 1], got {alpha}"
+        assert temperature > 0, f"Temperature must be positive, got {temperature}"
+        self.alpha = alpha
+        self.temperature = temperature
+        self.ctc = ctc or CTCLoss()
+
+    def kl_divergence(self, x: Any, teacher: Any) -> torch.Tensor:
+        """KL divergence from the teacher's posteriors to the student's,
+        given the outputs of both models (logits or log-probabilities)"""
+        x, xs = transform_batch(x)
+        t, ts = transform_batch(teacher)
+        t = F.softmax(t.to(x) / self.temperature, dim=-1)
+        t = resample_frames(t, ts, xs)
+        log_p = F.log_softmax(x / self.temperature, dim=-1)
+        kl = F.kl_div(log_p[: t.size(0)], t, reduction="none").sum(-1)
+        mask = torch.arange(t.size(0), device=x.device).unsqueeze(1) < torch.as_tensor(
+            xs, device=x.device
+        )
+        return (kl * mask).sum() / x.size(1)
+
+    def forward(
+        self, x: Any, y: List[List[int]], teacher: Optional[Any] = None, **kwargs: Dict
+    ) -> Optional[torch.Tensor]:
+        ctc = self.ctc(x, y, **kwargs)
+        if teacher is None:
+            return ctc
+        kl = self.temperature**2 * self.kl_divergence(x, teacher)
+        if ctc is None:
+            return self.alpha * kl
+        return (1 - self.alpha) * ctc + self.alpha * kl
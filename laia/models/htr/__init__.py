@@ -1,3 +1,5 @@
 from laia.models.htr.conv_block import ConvBlock
+from laia.models.htr.exportable_crnn import ExportableCRNN
 from laia.models.htr.gated_crnn import GatedConv2d, GatedCRNN
+from laia.models.htr.inference import optimize_for_inference
 from laia.models.htr.laia_crnn import LaiaCRNN
@@ -0,0 +1,170 @@
+import json
+from typing import Tuple
+
+import torch
+import torch.nn.functional as F
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+
+from laia.models.htr.conv_block import ConvBlock
+from laia.models.htr.laia_crnn import LaiaCRNN
+from laia.nn import AdaptiveAvgPool2d, AdaptiveMaxPool2d
+
+# largest image size considered when looking for the valid image sizes
+MAX_SEARCH_SIZE = 4096
+# name of the metadata stored with the exported models
+METADATA_FILENAME = "metadata.json"
+
+
+def _adaptive_bins(
+    size: int, output_size: int, device: torch.device
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Start and end of the bins of :func:`torch.nn.functional.adaptive_avg_pool2d`
+    for an input of the given size, computed with tensor operations so that
+    the size stays dynamic in the traced graphs"""
+    i = torch.arange(output_size, device=device)
+    start = torch.div(i * size, output_size, rounding_mode="floor")
+    end = torch.div(
+        (i + 1) * size + output_size - 1, output_size, rounding_mode="floor"
+    )
+    return start, end
+
+
+def adaptive_avg_pool_height(x: torch.Tensor, output_size: int) -> torch.Tensor:
+    """Same as ``adaptive_avg_pool2d(x, (output_size, None))``, which cannot be
+    exported to ONNX when the height of `x` is dynamic"""
+    start, end = _adaptive_bins(x.size(2), output_size, x.device)
+    # sum of the rows of each bin, as differences of the cumulative sums
+    cs = F.pad(x.cumsum(dim=2), (0, 0, 1, 0))
+    count = (end - start).to(x.dtype).view(output_size, 1)
+    return (cs.index_select(2, end) - cs.index_select(2, start)) / count
+
+
+def adaptive_max_pool_height(x: torch.Tensor, output_size: int) -> torch.Tensor:
+    """Same as ``adaptive_max_pool2d(x, (output_size, None))``, which cannot be
+    exported to ONNX when the height of `x` is dynamic"""
+    start, end = _adaptive_bins(x.size(2), output_size, x.device)
+    # the largest bin has at most height // output_size + 2 rows, the shorter
+    # bins repeat their last row
+    k = x.size(2) // output_size + 2
+    index = start[:, None] + torch.arange(k, device=x.device)
+    index = torch.min(index, (end - 1)[:, None]).flatten()
+    n, c, _, w = x.size()
+    return x.index_select(2, index).view(n, c, output_size, -1, w).amax(dim=3)
+
+
+class ExportableCRNN(torch.nn.Module):
+    """
+    Run a horizontal text `LaiaCRNN` on plain tensors, so that it can be
+    traced and exported to TorchScript or ONNX.
+
+    The input is a batch of images (N x C x H x W), padded to the same size,
+    and the width of each image (N). The output is the logits of the model
+    (T x N x L) and the number of valid frames of each image (N).
+    """
+
+    def __init__(self, model: LaiaCRNN) -> None:
+        super().__init__()
+        if not model.sequencer.columnwise:
+            raise ValueError("Models for vertical text cannot be exported")
+        self.conv = model.conv
+        self.rnn = model.rnn
+        self.linear = model.linear
+        self._fix_size = model.sequencer.fix_size
+        pooling = model.sequencer.sequencer
+        self._pooling = (
+            adaptive_avg_pool_height
+            if isinstance(pooling, AdaptiveAvgPool2d)
+            else adaptive_max_pool_height
+            if isinstance(pooling, AdaptiveMaxPool2d)
+            else None
+        )
+        self.metadata = {
+            "num_input_channels": self.conv[0].in_channels,
+            "min_valid_size": model.get_min_valid_image_size(MAX_SEARCH_SIZE),
+            "input_height": (None if self._pooling else self.get_input_height(model)),
+        }
+
+    def get_output_lengths(self, widths: torch.Tensor) -> torch.Tensor:
+        for block in self.conv:
+            widths = ConvBlock.get_output_size(
+                size=widths,
+                kernel_size=block.conv.kernel_size[1],
+                dilation=block.conv.dilation[1],
+                stride=block.conv.stride[1],
+                poolsize=block.poolsize[1] if block.poolsize else None,
+                padding=block.conv.padding[1],
+            )
+        return widths
+
+    def forward(
+        self, images: torch.Tensor, widths: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        x = self.conv(images)
+        lengths = self.get_output_lengths(widths)
+        if self._pooling is not None:
+            x = self._pooling(x, self._fix_size)
+        n, c, h, w = x.size()
+        x = x.permute(3, 0, 1, 2).reshape(w, n, c * h)
+        x = pack_padded_sequence(x, lengths, enforce_sorted=False)
+        x, _ = self.rnn(x)
+        x, _ = pad_packed_sequence(x, total_length=w)
+        return self.linear(x), lengths
+
+    def get_input_height(self, model: LaiaCRNN) -> int:
+        """Height of the input images of a model without adaptive pooling"""
+        for height in range(1, MAX_SEARCH_SIZE):
+            xs = model.get_self_conv_output_size(torch.tensor([[height, 1]]))
+            if xs[0, 0] == self._fix_size:
+                return height
+        raise ValueError(
+            f"Could not find an input height producing a height of {self._fix_size}"
+        )
+
+    def get_example_inputs(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Batch of 2 images of valid sizes, used to trace the model"""
+        width = 2 * self.metadata["min_valid_size"]
+        height = self.metadata["input_height"] or width
+        channels = self.metadata["num_input_channels"]
+        return torch.rand(2, channels, height, width), torch.tensor([width, width // 2])
+
+
+def export_torchscript(model: LaiaCRNN, filepath: str) -> str:
+    """Trace a model and save it as a TorchScript file, which can be loaded
+    with :func:`torch.jit.load` without PyLaia"""
+    exportable = ExportableCRNN(model).eval()
+    with torch.no_grad():
+        traced = torch.jit.trace(exportable, exportable.get_example_inputs())
+    torch.jit.save(
+        traced,
+        filepath,
+        _extra_files={METADATA_FILENAME: json.dumps(exportable.metadata)},
+    )
+    return filepath
+
+
+def export_onnx(model: LaiaCRNN, filepath: str, opset_version: int = 17) -> str:
+    """Export a model to ONNX, with dynamic batch, height and width axes"""
+    import onnx
+
+    exportable = ExportableCRNN(model).eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            exportable,
+            exportable.get_example_inputs(),
+            filepath,
+            input_names=["images", "widths"],
+            output_names=["logits", "lengths"],
+            dynamic_axes={
+                "images": {0: "batch", 2: "height", 3: "width"},
+                "widths": {0: "batch"},
+                "logits": {0: "frames", 1: "batch"},
+                "lengths": {0: "batch"},
+            },
+            opset_version=opset_version,
+        )
+    graph = onnx.load(filepath)
+    onnx.helper.set_model_props(
+        graph, {METADATA_FILENAME: json.dumps(exportable.metadata)}
+    )
+    onnx.save(graph, filepath)
+    return filepath
@@ -0,0 +1,68 @@
+from typing import Any, Dict
+
+import torch
+from torch.nn.utils.fusion import fuse_conv_bn_eval
+
+from laia.models.htr.conv_block import ConvBlock
+
+
+def fold_batchnorm(block: ConvBlock) -> None:
+    """
+    Fold the batch normalization of a block into the weights and bias of its
+    convolution, using the running statistics of the normalization.
+    """
+    if block.batchnorm is None:
+        return
+    block.conv = fuse_conv_bn_eval(block.conv.eval(), block.batchnorm.eval())
+    block.batchnorm = None
+
+
+def optimize_for_inference(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Optimize a model in place for inference. The model is put in evaluation
+    mode and its parameters are frozen. Then:
+
+    * the batch normalizations of the convolutional blocks are folded into
+      their convolutions,
+    * the dropout of the convolutional blocks, the recurrent layers and the
+      final linear layer is removed,
+    * the activations of the convolutional blocks are applied in place, on
+      the output of the convolution (or of the pooling),
+    * the weights of the recurrent layers are compacted.
+
+    The outputs of the optimized model match those of the original model in
+    evaluation mode, up to floating point rounding errors.
+    """
+    model.eval()
+    model.requires_grad_(False)
+    for module in model.modules():
+        if isinstance(module, ConvBlock):
+            fold_batchnorm(module)
+            module.dropout = None
+            if module.activation is not None and hasattr(module.activation, "inplace"):
+                module.activation.inplace = True
+        elif isinstance(module, torch.nn.RNNBase):
+            module.dropout = 0.0
+            module.flatten_parameters()
+    if hasattr(model, "_rnn_dropout"):
+        model._rnn_dropout = 0.0
+    if hasattr(model, "_lin_dropout"):
+        model._lin_dropout = 0.0
+    return model
+
+
+def get_inference_model_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the arguments of a `LaiaCRNN` which has the structure of the given
+    `LaiaCRNN` after `optimize_for_inference`: without batch normalization and
+    dropout, and with inplace activations. The weights of the optimized model
+    can be loaded into it.
+    """
+    kwargs = dict(kwargs)
+    num_blocks = len(kwargs["cnn_num_features"])
+    kwargs["cnn_batchnorm"] = [False] * num_blocks
+    kwargs["cnn_dropout"] = [0.0] * num_blocks
+    kwargs["rnn_dropout"] = 0.0
+    kwargs["lin_dropout"] = 0.0
+    kwargs["inplace"] = True
+    return kwargs
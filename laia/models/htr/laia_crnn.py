@@ -5,12 +5,18 @@ from typing import List, Sequence, Tuple, Type, Union
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from torch.nn.utils.rnn import PackedSequence
+from torch.nn.utils.rnn import (
+    PackedSequence,
+    pack_padded_sequence,
+    pad_packed_sequence,
+)
 
 from laia.common.types import Param2d, ParamNd
 from laia.data import PaddedTensor
 from laia.models.htr import ConvBlock
-from laia.nn import ImagePoolingSequencer
+from laia.nn import ImagePoolingSequencer, PaddedSequence
+from laia.nn.activation_checkpoint import checkpoint_activations
+from laia.nn.padded_rnn import padded_rnn
 
 
 class LaiaCRNN(nn.Module):
@@ -34,10 +40,14 @@ class LaiaCRNN(nn.Module):
         rnn_type: Union[nn.LSTM, nn.GRU, nn.RNN] = nn.LSTM,
         inplace: bool = False,
         vertical_text: bool = False,
+        padded_rnn: bool = False,
     ) -> None:
         super().__init__()
         self._rnn_dropout = rnn_dropout
         self._lin_dropout = lin_dropout
+        self._padded_rnn = padded_rnn
+        self.checkpoint_conv_blocks = 0
+        self.checkpoint_rnn = False
 
         # Add convolutional blocks, in a VGG style.
         conv_blocks = []
@@ -71,7 +81,9 @@ class LaiaCRNN(nn.Module):
         self.conv = nn.Sequential(*conv_blocks)
         # Add sequencer module to convert an image into a sequence
         self.sequencer = ImagePoolingSequencer(
-            sequencer=image_sequencer, columnwise=not vertical_text
+            sequencer=image_sequencer,
+            columnwise=not vertical_text,
+            return_packed=not padded_rnn,
         )
         # Add bidirectional rnn
         self.rnn = rnn_type(
@@ -103,7 +115,7 @@ class LaiaCRNN(nn.Module):
 
     def forward(
         self, x: Union[torch.Tensor, PaddedTensor]
-    ) -> Union[torch.Tensor, PackedSequence]:
+    ) -> Union[torch.Tensor, PackedSequence, PaddedSequence]:
         if isinstance(x, PaddedTensor):
             xs = self.get_self_conv_output_size(x.sizes)
             err_indices = [i for i, x in enumerate((xs < 1).any(1)) if x]
@@ -113,10 +125,15 @@ class LaiaCRNN(nn.Module):
                     f"with sizes {x.sizes[err_indices].tolist()} "
                     f"would produce invalid output sizes {xs[err_indices].tolist()}"
                 )
-        x = self.conv(x)
+        x = self.forward_conv(x)
+        if self._padded_rnn and isinstance(x, PaddedTensor):
+            return self.forward_padded_rnn(x)
         x = self.sequencer(x)
         x = self.dropout(x, p=self._rnn_dropout)
-        x, _ = self.rnn(x)
+        if self._use_checkpointing(self.checkpoint_rnn):
+            x, _ = checkpoint_activations(self.rnn, x)
+        else:
+            x, _ = self.rnn(x)
         x = self.dropout(x, p=self._lin_dropout)
         return (
             PackedSequence(self.linear(x.data), x.batch_sizes)
@@ -124,6 +141,54 @@ class LaiaCRNN(nn.Module):
             else self.linear(x)
         )
 
+    def set_activation_checkpointing(
+        self, conv_blocks: int = 0, rnn: bool = False
+    ) -> None:
+        """
+        Recompute activations during the backward pass instead of saving them,
+        which trades some training time for memory.
+
+        Args:
+            conv_blocks: Number of consecutive convolutional blocks checkpointed
+                together. Only the input of each group is saved. If 0, the
+                activations of the convolutional blocks are saved.
+            rnn: Whether to checkpoint the recurrent layers.
+        """
+        self.checkpoint_conv_blocks = conv_blocks
+        self.checkpoint_rnn = rnn
+
+    def _use_checkpointing(self, enabled: Union[int, bool]) -> bool:
+        return bool(enabled) and self.training and torch.is_grad_enabled()
+
+    def forward_conv(
+        self, x: Union[torch.Tensor, PaddedTensor]
+    ) -> Union[torch.Tensor, PaddedTensor]:
+        n = self.checkpoint_conv_blocks
+        if not self._use_checkpointing(n):
+            return self.conv(x)
+        for i in range(0, len(self.conv), n):
+            x = checkpoint_activations(self.conv[i : i + n], x)
+        return x
+
+    def forward_padded_rnn(self, x: PaddedTensor) -> PaddedSequence:
+        """Run the sequencer, the recurrent layers and the linear layer on the
+        padded output of the convolutions, masking the frames after the
+        length of each sequence instead of packing them"""
+        xs = x.sizes[:, 1 if self.sequencer.columnwise else 0]
+        x, _ = self.sequencer(x)
+        x = self.dropout(x, p=self._rnn_dropout)
+        if self._use_checkpointing(self.checkpoint_rnn):
+            x = checkpoint_activations(padded_rnn, self.rnn, x, xs)
+        elif isinstance(self.rnn, nn.RNNBase):
+            x = padded_rnn(self.rnn, x, xs)
+        else:
+            # e.g. dynamically quantized layers, which can only be packed
+            total_length = x.size(0)
+            x = pack_padded_sequence(x, xs.cpu(), enforce_sorted=False)
+            x, _ = pad_packed_sequence(self.rnn(x)[0], total_length=total_length)
+        x = self.dropout(x, p=self._lin_dropout)
+        return PaddedSequence(self.linear(x), xs)
+
     @staticmethod
     def get_conv_output_size(
         size: Param2d,
@@ -0,0 +1,76 @@
+from typing import Any, Iterable, Optional, Tuple
+
+import torch
+from torch.ao.quantization import DeQuantStub, QuantStub
+
+from laia.data import PaddedTensor
+
+# layers quantized to int8 by quantize_dynamic
+DYNAMIC_QUANTIZED_LAYERS = {torch.nn.LSTM, torch.nn.GRU, torch.nn.Linear}
+
+
+def quantize_dynamic(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Quantize the LSTM, GRU and Linear layers of a model in place to int8.
+    Their weights are quantized once, their activations are quantized on the
+    fly, with ranges computed for each batch, so no calibration is needed.
+    The quantized layers only run on CPU.
+    """
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, DYNAMIC_QUANTIZED_LAYERS, dtype=torch.qint8, inplace=True
+    )
+
+
+def _apply(module: torch.nn.Module, x: Any) -> Any:
+    if isinstance(x, PaddedTensor):
+        return PaddedTensor.build(module(x.data), x.sizes)
+    return module(x)
+
+
+def _quantize_input(block: torch.nn.Module, args: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    return (_apply(block.quant, args[0]), *args[1:])
+
+
+def _dequantize_output(block: torch.nn.Module, _: Any, output: Any) -> Any:
+    return _apply(block.dequant, output)
+
+
+def quantize_conv_static(
+    model: torch.nn.Module,
+    calibration_data: Iterable[Any],
+    backend: Optional[str] = None,
+) -> torch.nn.Module:
+    """
+    Statically quantize the convolutional blocks (`model.conv`) of a model in
+    place to int8. The input of the first block is quantized and the output
+    of the last block is dequantized, so the rest of the model keeps running
+    in floating point.
+
+    The ranges of the activations are fixed, so they are calibrated by
+    running the model on `calibration_data`, an iterable of model inputs.
+    The batch normalizations should be folded into the convolutions
+    beforehand, see :func:`~laia.models.htr.inference.optimize_for_inference`.
+
+    Args:
+        model: Model with a `conv` sequence of convolutional blocks.
+        calibration_data: Inputs of the model used to calibrate the ranges of
+            the activations, e.g. a few batches of images.
+        backend: Quantized engine, defaults to the current
+            :data:`torch.backends.quantized.engine`.
+    """
+    backend = backend or torch.backends.quantized.engine
+    torch.backends.quantized.engine = backend
+    model.eval()
+    first, last = model.conv[0], model.conv[-1]
+    first.quant = QuantStub()
+    last.dequant = DeQuantStub()
+    first.register_forward_pre_hook(_quantize_input)
+    last.register_forward_hook(_dequantize_output)
+    qconfig = torch.ao.quantization.get_default_qconfig(backend)
+    model.conv.qconfig = qconfig
+    torch.ao.quantization.prepare(model, inplace=True)
+    with torch.no_grad():
+        for x in calibration_data:
+            model(x)
+    return torch.ao.quantization.convert(model, inplace=True)
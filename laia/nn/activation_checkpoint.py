@@ -0,0 +1,46 @@
+from typing import Any, Callable
+
+import torch
+from torch.utils.checkpoint import checkpoint
+
+
+def _batchnorm_buffers(function: Callable) -> list:
+    if not isinstance(function, torch.nn.Module):
+        return []
+    return [
+        buffer
+        for module in function.modules()
+        if isinstance(module, torch.nn.modules.batchnorm._BatchNorm)
+        for buffer in module.buffers()
+    ]
+
+
+def checkpoint_activations(function: Callable, *args: Any) -> Any:
+    """
+    Run `function` without saving its intermediate activations for the
+    backward pass, which recomputes them instead. The inputs and outputs can
+    be any structure of tensors, e.g. a `PaddedTensor` or a `PackedSequence`.
+
+    The recomputation replays the same dropout masks, and the running
+    statistics of the batch normalizations of `function`, if it is a module,
+    are only updated by the first forward pass.
+    """
+    buffers = _batchnorm_buffers(function)
+    calls = 0
+
+    def run(*args: Any) -> Any:
+        nonlocal calls
+        calls += 1
+        if calls == 1 or not buffers:
+            return function(*args)
+        # the recomputation may stop as soon as the activations needed by the
+        # backward pass are computed, so the buffers are restored in any case
+        values = [buffer.clone() for buffer in buffers]
+        try:
+            return function(*args)
+        finally:
+            with torch.no_grad():
+                for buffer, value in zip(buffers, values):
+                    buffer.copy_(value)
+
+    return checkpoint(run, *args, use_reentrant=False)
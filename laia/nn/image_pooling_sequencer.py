@@ -8,7 +8,7 @@ from laia.nn.image_to_sequence import image_to_sequence
 
 
 class ImagePoolingSequencer(torch.nn.Module):
-    def __init__(self, sequencer, columnwise=True):
+    def __init__(self, sequencer, columnwise=True, return_packed=True):
         super().__init__()
 
         m = re.match(r"^(avgpool|maxpool|none)-([1-9][0-9]*)$", sequencer)
@@ -16,6 +16,7 @@ class ImagePoolingSequencer(torch.nn.Module):
             raise ValueError("The value of the sequencer argument is not valid")
 
         self._columnwise = columnwise
+        self._return_packed = return_packed
         self._fix_size = int(m.group(2))
         if m.group(1) == "avgpool":
             self.sequencer = AdaptiveAvgPool2d(
@@ -73,5 +74,7 @@ class ImagePoolingSequencer(torch.nn.Module):
                         "Input images must have a fixed width of "
                         f"{self._fix_size} pixels, size is {x.size()}"
                     )
-        x = image_to_sequence(x, columnwise=self._columnwise, return_packed=True)
+        x = image_to_sequence(
+            x, columnwise=self._columnwise, return_packed=self._return_packed
+        )
         return x
@@ -0,0 +1,78 @@
+from typing import List, NamedTuple
+
+import torch
+import torch.nn.functional as F
+
+
+class PaddedSequence(NamedTuple):
+    """
+    Padded sequences (T x N x D) and their lengths (N), as returned by the
+    models running their recurrent layers on padded tensors. Like a
+    `PackedSequence`, the sequences are stored in `data`.
+    """
+
+    data: torch.Tensor
+    lengths: torch.Tensor
+
+
+def reverse_padded_sequence(x: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+    """Reverse the first `lengths[n]` frames of each sequence `x[:, n]` (T x N
+    x D), leaving the padding frames in place"""
+    t = torch.arange(x.size(0), device=x.device).unsqueeze(1)
+    lengths = lengths.to(x.device).unsqueeze(0)
+    index = torch.where(t < lengths, lengths - 1 - t, t)
+    return x.gather(0, index.unsqueeze(2).expand_as(x))
+
+
+def _run_direction(
+    rnn: torch.nn.RNNBase, x: torch.Tensor, weights: List[torch.Tensor]
+) -> torch.Tensor:
+    """Run a single layer and direction of the recurrent layers"""
+    h = x.new_zeros(1, x.size(1), rnn.hidden_size)
+    args = (rnn.bias, 1, 0.0, rnn.training, False, False)
+    if rnn.mode == "LSTM":
+        return torch.lstm(x, (h, h), weights, *args)[0]
+    if rnn.mode == "GRU":
+        return torch.gru(x, h, weights, *args)[0]
+    if rnn.mode == "RNN_TANH":
+        return torch.rnn_tanh(x, h, weights, *args)[0]
+    return torch.rnn_relu(x, h, weights, *args)[0]
+
+
+def padded_rnn(
+    rnn: torch.nn.RNNBase, x: torch.Tensor, lengths: torch.Tensor
+) -> torch.Tensor:
+    """
+    Run recurrent layers on padded sequences (T x N x D), without packing them.
+
+    The frames of each sequence after its length are ignored: the forward
+    direction reads them after the valid frames, and the reverse direction
+    runs on the sequences reversed within their lengths. The output of the
+    padding frames is undefined.
+
+    The weights of `rnn` are used as they are, so the same weights can be run
+    on packed or padded sequences. The layers are run one at a time, and
+    only the reverse direction needs the reversed sequences.
+    """
+    if rnn.batch_first or getattr(rnn, "proj_size", 0):
+        raise ValueError(
+            "Recurrent layers with batch_first or proj_size are not supported"
+        )
+    if not rnn.bidirectional:
+        # the valid frames do not depend on the padding frames
+        return rnn(x)[0]
+    all_weights = rnn.all_weights
+    for layer in range(rnn.num_layers):
+        if layer > 0 and rnn.dropout:
+            x = F.dropout(x, p=rnn.dropout, training=rnn.training)
+        forward = _run_direction(rnn, x, all_weights[2 * layer])
+        reverse = reverse_padded_sequence(
+            _run_direction(
+                rnn,
+                reverse_padded_sequence(x, lengths),
+                all_weights[2 * layer + 1],
+            ),
+            lengths,
+        )
+        x = torch.cat((forward, reverse), dim=2)
+    return x
@@ -5,11 +5,55 @@ import torch
 from laia.data import PaddedTensor
 
 
+def _adaptive_bins_index(sizes: torch.Tensor, output_size: int) -> torch.Tensor:
+    """Index of the elements of each adaptive pooling bin, for samples of the
+    given sizes, as a N x output_size x K tensor.
+
+    The bins are the same as those of :func:`torch.nn.functional.adaptive_max_pool2d`:
+    bin i covers [floor(i * size / output_size), ceil((i + 1) * size / output_size)).
+    K is the length of the largest bin, the shorter bins repeat their last
+    element, so the padding is never selected.
+    """
+    i = torch.arange(output_size, device=sizes.device)
+    start = torch.div(i * sizes[:, None], output_size, rounding_mode="floor")
+    end = torch.div(
+        (i + 1) * sizes[:, None] + output_size - 1, output_size, rounding_mode="floor"
+    )
+    k = int((end - start).max())
+    index = start[..., None] + torch.arange(k, device=sizes.device)
+    return torch.min(index, (end - 1).clamp(min=0)[..., None])
+
+
+def _masked_adaptive_max(
+    x: torch.Tensor, sizes: torch.Tensor, output_size: int
+) -> torch.Tensor:
+    """Adaptive max pooling of the last dimension of a N x ... x L tensor,
+    where only the first ``sizes[n]`` elements of each sample are valid"""
+    index = _adaptive_bins_index(sizes, output_size)
+    n, _, k = index.size()
+    index = index.view(n, *(1,) * (x.dim() - 2), output_size * k)
+    x = x.gather(-1, index.expand(*x.size()[:-1], output_size * k))
+    # max() returns the first maximum, like adaptive_max_pool2d
+    return x.view(*x.size()[:-1], output_size, k).max(dim=-1)[0]
+
+
 def _adaptive_maxpool_2d(batch_input, output_sizes, batch_sizes):
     if batch_sizes is None:
         return torch.nn.functional.adaptive_max_pool2d(
             input=batch_input, output_size=output_sizes
         )
+    # The bins of all the samples are gathered and reduced at once, first the
+    # columns and then the rows
+    batch_sizes = batch_sizes.to(device=batch_input.device, dtype=torch.long)
+    x = _masked_adaptive_max(batch_input, batch_sizes[:, 1], output_sizes[1])
+    # N x C x H x OW -> N x C x OW x H
+    x = _masked_adaptive_max(x.transpose(2, 3), batch_sizes[:, 0], output_sizes[0])
+    return x.transpose(2, 3).contiguous()
+
+
+def _adaptive_maxpool_2d_per_sample(batch_input, output_sizes, batch_sizes):
+    """Reference implementation of :func:`_adaptive_maxpool_2d`, which pools
+    each sample separately"""
     to_stack = []
     for n in range(batch_input.size(0)):
         nh, nw = int(batch_sizes[n, 0]), int(batch_sizes[n, 1])
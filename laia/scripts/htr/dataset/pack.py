@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+from typing import Any, Dict, List, Optional
+
+import jsonargparse
+from jsonargparse.typing import PositiveInt
+
+import laia.common.logging as log
+from laia.common.arguments import DataArgs
+from laia.data.image_from_list_dataset import _get_img_ids_and_filepaths
+from laia.data.packed_image_dataset import pack_dataset
+from laia.data.text_image_from_text_table_dataset import (
+    _get_images_and_texts_from_text_table,
+)
+
+
+def run(
+    img_dirs: List[str],
+    txt_table: str,
+    output_dir: str,
+    img_list: bool = False,
+    color_mode: DataArgs.ColorMode = DataArgs.ColorMode.L,
+    shard_size: PositiveInt = 1 << 30,
+    num_workers: Optional[int] = None,
+):
+    if img_list:
+        ids, filepaths = _get_img_ids_and_filepaths(txt_table, img_dirs)
+        txts = None
+    else:
+        ids, filepaths, txts = _get_images_and_texts_from_text_table(
+            txt_table, img_dirs
+        )
+    pack_dataset(
+        output_dir,
+        ids,
+        filepaths,
+        txts=txts,
+        color_mode=color_mode.value,
+        shard_size=shard_size,
+        num_workers=num_workers,
+    )
+
+
+def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = jsonargparse.ArgumentParser()
+    parser.add_argument(
+        "--config", action=jsonargparse.ActionConfigFile, help="Configuration file"
+    )
+    parser.add_argument(
+        "img_dirs",
+        type=List[str],
+        default=[],
+        help="Directories containing segmented line images",
+    )
+    parser.add_argument(
+        "txt_table",
+        type=str,
+        help="Character transcription of each image, or list of image ids",
+    )
+    parser.add_argument(
+        "output_dir",
+        type=str,
+        help="Directory where the packed dataset will be written",
+    )
+    parser.add_argument(
+        "--img_list",
+        type=bool,
+        default=False,
+        help="Whether `txt_table` is a list of image ids without transcriptions",
+    )
+    parser.add_argument(
+        "--color_mode",
+        type=DataArgs.ColorMode,
+        default=DataArgs.ColorMode.L,
+        help="L (grayscale): 1 channel, RGB: 3 channels, RGBA: 4 channels",
+    )
+    parser.add_argument(
+        "--shard_size",
+        type=PositiveInt,
+        default=1 << 30,
+        help="Approximate maximum size of each shard file, in bytes",
+    )
+    parser.add_argument(
+        "--num_workers",
+        type=Optional[int],
+        default=None,
+        help="Number of processes used to load the images",
+    )
+    parser.add_function_arguments(log.config, "logging")
+
+    args = parser.parse_args(argv, with_meta=False).as_dict()
+    return args
+
+
+def main() -> None:
+    args = get_args()
+    del args["config"]
+    log.config(**args.pop("logging"))
+    log.info(f"Arguments: {args}")
+    run(**args)
+
+
+if __name__ == "__main__":
+    main()
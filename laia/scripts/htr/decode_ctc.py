@@ -1,19 +1,33 @@
 #!/usr/bin/env python3
+from itertools import islice
 from typing import Any, Dict, List, Optional
 
 import jsonargparse
 import pytorch_lightning as pl
 
 import laia.common.logging as log
-from laia.callbacks import Decode, ProgressBar, Segmentation
+from laia.callbacks import CompiledModelReport, Decode, ProgressBar, Segmentation
 from laia.common.arguments import CommonArgs, DataArgs, DecodeArgs, TrainerArgs
 from laia.common.loader import ModelLoader
 from laia.decoders import CTCGreedyDecoder, CTCLanguageDecoder
-from laia.engine import Compose, DataModule, EvaluatorModule, ImageFeeder, ItemFeeder
+from laia.engine import (
+    Compose,
+    DataModule,
+    EvaluatorModule,
+    ExportedModelRuntime,
+    ImageFeeder,
+    ItemFeeder,
+)
+from laia.engine.engine_module import uint8_to_float
+from laia.models.htr import optimize_for_inference
+from laia.models.htr.quantization import quantize_conv_static
 from laia.scripts.htr import common_main
 from laia.utils import ImageLabelsStats, SymbolsTable
 from laia.utils.stats import Split
 
+# largest image width considered when looking for the minimum valid width
+STREAMING_MAX_SEARCH_SIZE = 4096
+
 
 def run(
     syms: str,
@@ -25,45 +39,108 @@ def run(
     trainer: TrainerArgs = TrainerArgs(),
     num_workers: Optional[int] = None,
 ):
-    loader = ModelLoader(
-        common.train_path, filename=common.model_filename, device="cpu"
+    batch_input_fn = Compose([ItemFeeder("img"), ImageFeeder()])
+    batch_id_fn = ItemFeeder("id")
+    assert not decode.compile_model or not (
+        decode.exported_model or decode.quantize
+    ), "decode.compile_model cannot be used with an exported or quantized model"
+    use_gpus = trainer.gpus not in (None, 0, "0", "", [])
+    assert not decode.exported_model or not (
+        decode.quantize or decode.chunk_width or use_gpus
+    ), (
+        "decode.exported_model cannot be used with decode.quantize, "
+        "decode.chunk_width or trainer.gpus: the exported model is run on CPU "
+        "on the full images"
     )
-    checkpoint = loader.prepare_checkpoint(
-        common.checkpoint,
-        common.experiment_dirpath,
-        common.monitor,
+    assert not (decode.quantize == DecodeArgs.Quantization.static and data.streaming), (
+        "decode.quantize static cannot be used with data.streaming: the "
+        "calibration batches would consume the streamed images"
     )
-    model = loader.load_by(checkpoint)
-    assert (
-        model is not None
-    ), "Could not find the model. Have you run pylaia-htr-create-model?"
-
-    # prepare the evaluator
-    evaluator_module = EvaluatorModule(
-        model,
-        batch_input_fn=Compose([ItemFeeder("img"), ImageFeeder()]),
-        batch_id_fn=ItemFeeder("id"),
+    assert not (decode.quantize and use_gpus), (
+        "decode.quantize cannot be used with trainer.gpus: the quantized "
+        "model only runs on CPU"
     )
+    if decode.exported_model:
+        # the exported model is run without the trainer
+        evaluator_module = ExportedModelRuntime(
+            decode.exported_model,
+            batch_input_fn=batch_input_fn,
+            batch_id_fn=batch_id_fn,
+        )
+        get_min_valid_image_size = evaluator_module.get_min_valid_image_size
+    else:
+        loader = ModelLoader(
+            common.train_path, filename=common.model_filename, device="cpu"
+        )
+        checkpoint = loader.prepare_checkpoint(
+            common.checkpoint,
+            common.experiment_dirpath,
+            common.monitor,
+        )
+        model = loader.load_by(checkpoint, quantize=bool(decode.quantize))
+        assert (
+            model is not None
+        ), "Could not find the model. Have you run pylaia-htr-create-model?"
+        if decode.optimize_model:
+            model = optimize_for_inference(model)
+
+        # prepare the evaluator
+        evaluator_module = EvaluatorModule(
+            model,
+            batch_input_fn=batch_input_fn,
+            batch_id_fn=batch_id_fn,
+            chunk_width=decode.chunk_width,
+            chunk_context=decode.chunk_context,
+            compile_model=decode.compile_model,
+        )
+        get_min_valid_image_size = getattr(model, "get_min_valid_image_size", None)
 
     # prepare the symbols
     syms: SymbolsTable = SymbolsTable(syms)
 
     # prepare the data
-    dataset_stats = ImageLabelsStats(
-        stage=Split.test, tables=[img_list], img_dirs=img_dirs
-    )
+    if data.streaming:
+        # the images are not known in advance: pad them to the minimum valid
+        # width of the model, whatever their height
+        dataset_stats = None
+        min_valid_size = (
+            get_min_valid_image_size(STREAMING_MAX_SEARCH_SIZE)
+            if get_min_valid_image_size is not None
+            else None
+        )
+    else:
+        dataset_stats = ImageLabelsStats(
+            stage=Split.test,
+            tables=[img_list],
+            img_dirs=img_dirs,
+            index_cache_dir=data.index_cache_dir,
+        )
+        min_valid_size = (
+            get_min_valid_image_size(dataset_stats.max_width)
+            if dataset_stats.is_fixed_height or data.fixed_height
+            else None
+        )
     data_module = DataModule(
         syms=syms,
         img_dirs=img_dirs,
         te_img_list=img_list,
         batch_size=data.batch_size,
-        min_valid_size=model.get_min_valid_image_size(dataset_stats.max_width)
-        if dataset_stats.is_fixed_height
-        else None,
+        min_valid_size=min_valid_size,
         color_mode=data.color_mode,
         stage="test",
         num_workers=num_workers,
         reading_order=data.reading_order,
+        bucketing=data.bucketing,
+        num_buckets=data.num_buckets,
+        img_sizes=dataset_stats.sizes if dataset_stats else None,
+        max_batch_pixels=data.max_batch_pixels,
+        index_cache_dir=data.index_cache_dir,
+        streaming=data.streaming,
+        uint8_pipeline=data.uint8_pipeline,
+        fixed_height=data.fixed_height,
+        fixed_width=data.fixed_width,
+        image_backend=data.image_backend,
+        width_buckets=data.width_buckets,
     )
 
     if decode.use_language_model:
@@ -87,7 +164,6 @@ def run(
 
     # prepare the testing callbacks
     callbacks = [
-        ProgressBar(refresh_rate=trainer.progress_bar_refresh_rate),
         Segmentation(
             syms,
             segmentation=decode.segmentation,
@@ -111,11 +187,35 @@ def run(
             reading_order=data.reading_order,
         ),
     ]
+    if decode.compile_model:
+        callbacks.append(CompiledModelReport())
+
+    if decode.exported_model:
+        evaluator_module.test(data_module, callbacks)
+        return
+
+    if decode.quantize == DecodeArgs.Quantization.static:
+        data_module.setup(stage="test")
+        quantize_conv_static(
+            model,
+            (
+                uint8_to_float(batch_input_fn(batch))
+                for batch in islice(
+                    data_module.test_dataloader(), decode.quantize_calibration_batches
+                )
+            ),
+        )
+        log.info("Statically quantized the convolutional blocks of the model to int8")
+
+    if data.bucketing or data.max_batch_pixels or data.streaming:
+        # the samplers already take care of distributing the data
+        trainer.replace_sampler_ddp = False
 
     # prepare the trainer
     trainer = pl.Trainer(
         default_root_dir=common.train_path,
-        callbacks=callbacks,
+        callbacks=[ProgressBar(refresh_rate=trainer.progress_bar_refresh_rate)]
+        + callbacks,
         logger=False,
         **vars(trainer),
     )
@@ -144,7 +244,8 @@ def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
             "File containing the images to decode. Each image is expected to be in one "
             'line. Lines starting with "#" will be ignored. Lines can be filepaths '
             '(e.g. "/tmp/img.jpg") or filenames of images present in --img_dirs (e.g. '
-            "img.jpg). The filename extension is optional and case insensitive"
+            "img.jpg). The filename extension is optional and case insensitive. "
+            'With --data.streaming, use "/dev/stdin" to read the list from stdin'
         ),
     )
     parser.add_argument(
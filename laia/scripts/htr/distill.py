@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+from typing import Any, Dict, List, Optional
+
+from laia.common.arguments import DistillArgs
+from laia.scripts.htr import common_main
+from laia.scripts.htr.train_ctc import get_parser, parse_args, run
+
+
+def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = get_parser()
+    parser.description = (
+        "Train a model, usually smaller and faster, on the CTC loss mixed with "
+        "the KL divergence to the frame posteriors of a trained teacher model, "
+        "either run on the fly or read from a pylaia-htr-netout matrix archive"
+    )
+    parser.add_class_arguments(DistillArgs, "distill")
+    args = parse_args(parser, argv)
+    args["distill"] = DistillArgs(**args["distill"])
+    return args
+
+
+def main():
+    args = get_args()
+    args = common_main(args)
+    run(**args)
+
+
+if __name__ == "__main__":
+    main()
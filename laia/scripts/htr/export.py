@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import os
+from typing import Any, Dict, List, Optional
+
+import jsonargparse
+
+import laia.common.logging as log
+from laia.common.arguments import CommonArgs, ExportArgs
+from laia.common.loader import BasicLoader, ModelLoader
+from laia.common.saver import BasicSaver, ModelSaver
+from laia.models.htr import LaiaCRNN, optimize_for_inference
+from laia.models.htr.exportable_crnn import export_onnx, export_torchscript
+from laia.models.htr.inference import get_inference_model_kwargs
+from laia.scripts.htr import common_main
+
+
+def run(
+    common: CommonArgs = CommonArgs(),
+    export: ExportArgs = ExportArgs(),
+) -> List[str]:
+    loader = ModelLoader(
+        common.train_path, filename=common.model_filename, device="cpu"
+    )
+    checkpoint = loader.prepare_checkpoint(
+        common.checkpoint, common.experiment_dirpath, common.monitor
+    )
+    model = loader.load_by(checkpoint)
+    assert (
+        model is not None
+    ), "Could not find the model. Have you run pylaia-htr-create-model?"
+    assert isinstance(
+        model, LaiaCRNN
+    ), f"Only LaiaCRNN models can be exported, found {type(model).__name__}"
+    model = optimize_for_inference(model)
+
+    filepath = os.path.join(common.train_path, export.model_filename)
+    filepaths = []
+    if ExportArgs.Format.pylaia in export.formats:
+        model_object = BasicLoader().load(
+            os.path.join(common.train_path, common.model_filename)
+        )
+        filepaths.append(
+            ModelSaver(common.train_path, export.model_filename).save(
+                LaiaCRNN,
+                *model_object.get("args", []),
+                **get_inference_model_kwargs(model_object["kwargs"]),
+            )
+        )
+        filepaths.append(BasicSaver().save(model.state_dict(), f"{filepath}.ckpt"))
+    if ExportArgs.Format.torchscript in export.formats:
+        filepaths.append(export_torchscript(model, f"{filepath}.pt"))
+    if ExportArgs.Format.onnx in export.formats:
+        filepaths.append(
+            export_onnx(model, f"{filepath}.onnx", opset_version=export.onnx_opset)
+        )
+    for f in filepaths:
+        log.info('Exported the model optimized for inference to "{}"', f)
+    return filepaths
+
+
+def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = jsonargparse.ArgumentParser(
+        description=(
+            "Export a trained model optimized for inference. The batch"
+            " normalizations are folded into the convolutions and the dropout is"
+            " removed. The model can be exported as a PyLaia model, a TorchScript"
+            " graph or an ONNX graph"
+        ),
+    )
+    parser.add_argument(
+        "--config", action=jsonargparse.ActionConfigFile, help="Configuration file"
+    )
+    parser.add_class_arguments(CommonArgs, "common")
+    parser.add_function_arguments(log.config, "logging")
+    parser.add_class_arguments(ExportArgs, "export")
+
+    args = parser.parse_args(argv, with_meta=False).as_dict()
+
+    args["common"] = CommonArgs(**args["common"])
+    args["export"] = ExportArgs(**args["export"])
+
+    return args
+
+
+def main():
+    args = get_args()
+    args = common_main(args)
+    run(**args)
+
+
+if __name__ == "__main__":
+    main()
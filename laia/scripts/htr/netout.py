@@ -6,10 +6,11 @@ import jsonargparse
 import pytorch_lightning as pl
 
 import laia.common.logging as log
-from laia.callbacks import Netout, ProgressBar
+from laia.callbacks import CompiledModelReport, Netout, ProgressBar
 from laia.common.arguments import CommonArgs, DataArgs, NetoutArgs, TrainerArgs
 from laia.common.loader import ModelLoader
 from laia.engine import Compose, DataModule, EvaluatorModule, ImageFeeder, ItemFeeder
+from laia.models.htr import optimize_for_inference
 from laia.scripts.htr import common_main
 from laia.utils.kaldi import ArchiveLatticeWriter, ArchiveMatrixWriter
 
@@ -33,12 +34,15 @@ def run(
     assert (
         model is not None
     ), "Could not find the model. Have you run pylaia-htr-create-model?"
+    if netout.optimize_model:
+        model = optimize_for_inference(model)
 
     # prepare the evaluator
     evaluator_module = EvaluatorModule(
         model,
         batch_input_fn=Compose([ItemFeeder("img"), ImageFeeder()]),
         batch_id_fn=ItemFeeder("id"),
+        compile_model=netout.compile_model,
     )
 
     # prepare the data
@@ -49,6 +53,16 @@ def run(
         color_mode=data.color_mode,
         stage="test",
         num_workers=num_workers,
+        bucketing=data.bucketing,
+        num_buckets=data.num_buckets,
+        max_batch_pixels=data.max_batch_pixels,
+        index_cache_dir=data.index_cache_dir,
+        streaming=data.streaming,
+        uint8_pipeline=data.uint8_pipeline,
+        fixed_height=data.fixed_height,
+        fixed_width=data.fixed_width,
+        image_backend=data.image_backend,
+        width_buckets=data.width_buckets,
     )
 
     # prepare the kaldi writers
@@ -74,6 +88,12 @@ def run(
         Netout(writers, output_transform=netout.output_transform),
         ProgressBar(refresh_rate=trainer.progress_bar_refresh_rate),
     ]
+    if netout.compile_model:
+        callbacks.append(CompiledModelReport())
+
+    if data.bucketing or data.max_batch_pixels or data.streaming:
+        # the samplers already take care of distributing the data
+        trainer.replace_sampler_ddp = False
 
     # prepare the trainer
     trainer = pl.Trainer(
@@ -99,7 +119,8 @@ def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
             "File containing the images to decode. Each image is expected to be in one "
             'line. Lines starting with "#" will be ignored. Lines can be filepaths '
             '(e.g. "/tmp/img.jpg") or filenames of images present in --img_dirs (e.g. '
-            "img.jpg). The filename extension is optional and case insensitive"
+            "img.jpg). The filename extension is optional and case insensitive. "
+            'With --data.streaming, use "/dev/stdin" to read the list from stdin'
         ),
     )
     parser.add_argument(
@@ -1,29 +1,90 @@
 #!/usr/bin/env python3
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import jsonargparse
 import pytorch_lightning as pl
 import torch
 
 import laia.common.logging as log
-from laia.callbacks import LearningRate, ProgressBar, ProgressBarGPUStats
+from laia.callbacks import (
+    ActivationCheckpointingReport,
+    CompiledModelReport,
+    LearningRate,
+    ProgressBar,
+    ProgressBarGPUStats,
+)
 from laia.common.arguments import (
     CommonArgs,
     DataArgs,
     DecodeArgs,
+    DistillArgs,
     OptimizerArgs,
     SchedulerArgs,
     TrainArgs,
     TrainerArgs,
 )
 from laia.common.loader import ModelLoader
-from laia.engine import Compose, DataModule, HTREngineModule, ImageFeeder, ItemFeeder
+from laia.data import transforms
+from laia.engine import (
+    ArchiveTeacher,
+    Compose,
+    DataModule,
+    DistillationEngineModule,
+    HTREngineModule,
+    ImageFeeder,
+    ItemFeeder,
+    ModelTeacher,
+)
 from laia.loggers import EpochCSVLogger
+from laia.models.htr import LaiaCRNN, optimize_for_inference
 from laia.scripts.htr import common_main
 from laia.utils import ImageLabelsStats, SymbolsTable
 
 
+def get_num_output_labels(model: torch.nn.Module) -> Optional[int]:
+    """Number of output labels of a model, i.e. of its last linear layer"""
+    linears = [m for m in model.modules() if isinstance(m, torch.nn.Linear)]
+    return linears[-1].out_features if linears else None
+
+
+def get_teacher(
+    distill: DistillArgs,
+    monitor: str,
+    batch_input_fn: Callable,
+    num_labels: Optional[int] = None,
+) -> Union[ArchiveTeacher, ModelTeacher]:
+    if distill.teacher_matrix:
+        log.info(f'Reading the teacher output from "{distill.teacher_matrix}"')
+        return ArchiveTeacher(
+            distill.teacher_matrix,
+            batch_id_fn=ItemFeeder("id"),
+            num_labels=num_labels,
+        )
+    loader = ModelLoader(
+        distill.teacher_train_path,
+        filename=distill.teacher_model_filename,
+        device="cpu",
+    )
+    checkpoint = loader.prepare_checkpoint(
+        distill.teacher_checkpoint,
+        os.path.join(distill.teacher_train_path, distill.teacher_experiment_dirname),
+        monitor,
+    )
+    teacher = loader.load_by(checkpoint)
+    assert teacher is not None, "Could not find the teacher model"
+    teacher_labels = get_num_output_labels(teacher)
+    assert num_labels is None or teacher_labels in (None, num_labels), (
+        f"The teacher has {teacher_labels} output labels, "
+        f"but the student has {num_labels}"
+    )
+    log.info(
+        "Teacher model has {} parameters",
+        sum(param.numel() for param in teacher.parameters()),
+    )
+    return ModelTeacher(optimize_for_inference(teacher), batch_input_fn)
+
+
 def run(
     syms: str,
     img_dirs: List[str],
@@ -36,6 +97,7 @@ def run(
     data: DataArgs = DataArgs(),
     trainer: TrainerArgs = TrainerArgs(),
     decode: DecodeArgs = DecodeArgs(),
+    distill: Optional[DistillArgs] = None,
 ):
     pl.seed_everything(common.seed)
 
@@ -92,22 +154,72 @@ def run(
     if train.freeze_layers:
         loader.freeze_layers(model, train.freeze_layers)
 
+    if data.bucketing or data.max_batch_pixels:
+        # the batch samplers already take care of distributing the data
+        trainer.replace_sampler_ddp = False
+    if train.pixels_per_step:
+        assert (
+            data.max_batch_pixels
+        ), "train.pixels_per_step requires data.max_batch_pixels to be set"
+        assert trainer.accumulate_grad_batches == 1, (
+            "train.pixels_per_step sets trainer.accumulate_grad_batches, "
+            "they cannot be used together"
+        )
+        trainer.accumulate_grad_batches = max(
+            1, round(train.pixels_per_step / data.max_batch_pixels)
+        )
+        log.info(
+            f"Accumulating gradients over {trainer.accumulate_grad_batches} batches"
+        )
+    activation_checkpointing = (
+        train.activation_checkpointing or train.activation_checkpointing_rnn
+    )
+    if activation_checkpointing:
+        assert isinstance(
+            model, LaiaCRNN
+        ), "train.activation_checkpointing requires a LaiaCRNN model"
+        model.set_activation_checkpointing(
+            train.activation_checkpointing, rnn=train.activation_checkpointing_rnn
+        )
+
     # prepare the engine
-    engine_module = HTREngineModule(
-        model,
-        [syms[d] for d in train.delimiters],
+    batch_input_fn = Compose([ItemFeeder("img"), ImageFeeder()])
+    engine_kwargs = dict(
         optimizer=optimizer,
         scheduler=scheduler,
-        batch_input_fn=Compose([ItemFeeder("img"), ImageFeeder()]),
+        batch_input_fn=batch_input_fn,
         batch_target_fn=ItemFeeder("txt"),
         batch_id_fn=ItemFeeder("id"),  # Used to print image ids on exception
+        batch_augmentation=transforms.vision.BatchRandomBetaAffine()
+        if train.augment_training and train.batched_augmentation
+        else None,
+        compile_model=train.compile_model,
     )
+    if distill is None:
+        engine_module = HTREngineModule(
+            model, [syms[d] for d in train.delimiters], **engine_kwargs
+        )
+    else:
+        engine_module = DistillationEngineModule(
+            model,
+            [syms[d] for d in train.delimiters],
+            teacher=get_teacher(
+                distill,
+                common.monitor,
+                batch_input_fn,
+                num_labels=get_num_output_labels(model),
+            ),
+            alpha=distill.alpha,
+            temperature=distill.temperature,
+            **engine_kwargs,
+        )
 
     # prepare the data
     dataset_stats = ImageLabelsStats(
         stage="fit",
         tables=[tr_txt_table, va_txt_table],
         img_dirs=img_dirs,
+        index_cache_dir=data.index_cache_dir,
     )
     data_module = DataModule(
         syms=syms,
@@ -116,16 +228,28 @@ def run(
         va_txt_table=va_txt_table,
         batch_size=data.batch_size,
         min_valid_size=model.get_min_valid_image_size(dataset_stats.max_width)
-        if dataset_stats.is_fixed_height
+        if dataset_stats.is_fixed_height or data.fixed_height
         else None,
         color_mode=data.color_mode,
         shuffle_tr=not bool(trainer.limit_train_batches),
-        augment_tr=train.augment_training,
+        augment_tr=train.augment_training and not train.batched_augmentation,
         stage="fit",
         num_workers=data.num_workers,
         reading_order=data.reading_order,
         space_token=decode.input_space,
         space_display=decode.output_space,
+        bucketing=data.bucketing,
+        num_buckets=data.num_buckets,
+        img_sizes=dataset_stats.sizes,
+        max_batch_pixels=data.max_batch_pixels,
+        index_cache_dir=data.index_cache_dir,
+        img_cache_size=data.img_cache_size,
+        img_cache_dir=data.img_cache_dir,
+        uint8_pipeline=data.uint8_pipeline,
+        fixed_height=data.fixed_height,
+        fixed_width=data.fixed_width,
+        image_backend=data.image_backend,
+        width_buckets=data.width_buckets,
     )
 
     # prepare the training callbacks
@@ -157,6 +281,10 @@ def run(
         callbacks.append(ProgressBarGPUStats())
     if scheduler.active:
         callbacks.append(LearningRate(logging_interval="epoch"))
+    if activation_checkpointing:
+        callbacks.append(ActivationCheckpointingReport())
+    if train.compile_model:
+        callbacks.append(CompiledModelReport())
 
     # prepare the logger
     loggers = [EpochCSVLogger(common.experiment_dirpath)]
@@ -196,7 +324,7 @@ def run(
     )
 
 
-def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+def get_parser() -> jsonargparse.ArgumentParser:
     parser = jsonargparse.ArgumentParser()
     parser.add_argument(
         "--config", action=jsonargparse.ActionConfigFile, help="Configuration file"
@@ -233,7 +361,12 @@ def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
     parser.add_class_arguments(SchedulerArgs, "scheduler")
     parser.add_class_arguments(TrainerArgs, "trainer")
     parser.add_class_arguments(DecodeArgs, "decode")
+    return parser
+
 
+def parse_args(
+    parser: jsonargparse.ArgumentParser, argv: Optional[List[str]] = None
+) -> Dict[str, Any]:
     args = parser.parse_args(argv, with_meta=False).as_dict()
 
     args["common"] = CommonArgs(**args["common"])
@@ -247,6 +380,10 @@ def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
     return args
 
 
+def get_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    return parse_args(get_parser(), argv)
+
+
 def main():
     args = get_args()
     args = common_main(args)
@@ -1,5 +1,9 @@
 from laia.utils.checks import check_tensor
-from laia.utils.kaldi import ArchiveLatticeWriter, ArchiveMatrixWriter
+from laia.utils.kaldi import (
+    ArchiveLatticeWriter,
+    ArchiveMatrixReader,
+    ArchiveMatrixWriter,
+)
 from laia.utils.mdutils import Statistics, create_table
 from laia.utils.stats import ImageLabelsStats, Split
 from laia.utils.symbols_table import SymbolsTable
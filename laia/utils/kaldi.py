@@ -1,6 +1,7 @@
+import os
 import sys
 from pathlib import Path
-from typing import BinaryIO, Iterable, TextIO, Tuple, Union
+from typing import BinaryIO, Dict, Iterable, Iterator, TextIO, Tuple, Union
 
 import numpy as np
 import torch
@@ -35,6 +36,23 @@ def write_binary_matrix(f: BinaryIO, mat: Union[torch.Tensor, np.ndarray]) -> No
     f.write(mat.tobytes())
 
 
+def read_binary_matrix(f: BinaryIO) -> np.ndarray:
+    """Read a matrix in Kaldi's binary format from a file-like object."""
+    dtype = f.read(3)
+    if dtype == b"FM ":
+        dtype = np.float32
+    elif dtype == b"DM ":
+        dtype = np.float64
+    else:
+        raise ValueError(f"Matrix type is not supported {dtype!r}")
+    header = f.read(10)
+    rows = int.from_bytes(header[1:5], byteorder=sys.byteorder)
+    cols = int.from_bytes(header[6:10], byteorder=sys.byteorder)
+    count = rows * cols
+    mat = np.frombuffer(f.read(count * np.dtype(dtype).itemsize), dtype=dtype)
+    return mat.reshape(rows, cols)
+
+
 def write_text_lattice(
     f: TextIO, mat: Union[torch.Tensor, np.ndarray], digits: int = 8
 ) -> None:
@@ -133,3 +151,63 @@ class ArchiveLatticeWriter:
         """
         for key, mat in iterable:
             self.write(key, mat)
+
+
+class ArchiveMatrixReader:
+    """
+    Class to read a Kaldi's archive file containing binary matrices, such as
+    those written by :class:`ArchiveMatrixWriter`.
+
+    The archive is indexed when the reader is created, and each matrix is
+    read from the file when it is accessed by its key.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        self._filepath = filepath
+        self._offsets: Dict[str, int] = {}
+        with open(filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            data = f.read(1)
+            while data:
+                key = bytearray(data)
+                while not key.endswith(b" "):
+                    data = f.read(1)
+                    if not data:
+                        raise ValueError(
+                            f"Truncated archive {filepath}: no matrix after key "
+                            f"{key.decode('utf-8', errors='replace')}"
+                        )
+                    key += data
+                key = key[:-1].decode("utf-8")
+                binary = f.read(2)
+                if len(binary) < 2:
+                    raise ValueError(f"Truncated archive {filepath} in matrix {key}")
+                if binary != b"\x00B":
+                    raise ValueError(f"Matrix {key} is not in binary format")
+                self._offsets[key] = f.tell()
+                dtype = f.read(3)
+                header = f.read(10)
+                if len(dtype) < 3 or len(header) < 10:
+                    raise ValueError(f"Truncated archive {filepath} in matrix {key}")
+                rows = int.from_bytes(header[1:5], byteorder=sys.byteorder)
+                cols = int.from_bytes(header[6:10], byteorder=sys.byteorder)
+                itemsize = 4 if dtype == b"FM " else 8
+                f.seek(rows * cols * itemsize, 1)
+                if f.tell() > size:
+                    raise ValueError(f"Truncated archive {filepath} in matrix {key}")
+                data = f.read(1)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __getitem__(self, key: str) -> torch.Tensor:
+        """Read the matrix with the given key from the archive."""
+        with open(self._filepath, "rb") as f:
+            f.seek(self._offsets[key])
+            return torch.from_numpy(read_binary_matrix(f).copy())
@@ -1,11 +1,11 @@
 from enum import Enum
 from functools import cached_property
 from pathlib import Path
-from typing import List, Optional, TextIO, Union
-
-import imagesize
+from typing import Dict, List, Optional, TextIO, Tuple, Union
 
 from laia.data.image_from_list_dataset import _get_img_ids_and_filepaths
+from laia.data.image_size_index import get_image_sizes, get_size_index_filepath
+from laia.data.packed_image_dataset import PackedImageDataset, is_packed_dataset
 from laia.data.text_image_from_text_table_dataset import (
     _get_images_and_texts_from_text_table,
 )
@@ -29,10 +29,14 @@ class ImageLabelsStats:
     """
     Compute statistics on the dataset
 
+    The image sizes are read in parallel and saved in a size index next to
+    each table, so that later runs only read the new or modified images.
+
     Args:
         stage: String indicating the stage of the processing, either "test" or "fit"
         tables: List of ids (test mode) with tokenized text (train and val mode)
         img_dirs: Path to images
+        index_cache_dir: Directory where the listing of `img_dirs` is cached
     """
 
     def __init__(
@@ -40,22 +44,43 @@ class ImageLabelsStats:
         stage: Union[str, Split],
         tables: List[Union[TextIO, str, List[str]]],
         img_dirs: Optional[Union[List[str], str, List[Path], Path]] = None,
+        index_cache_dir: Optional[str] = None,
     ):
         self.filenames = []
         self.labels = []
+        sizes = []
+        # Test split has no labels
+        is_test = isinstance(stage, Split) and stage == Split.test
         for table in tables:
-            # Test split has no labels
-            if isinstance(stage, Split) and stage == Split.test:
-                self.filenames.extend(_get_img_ids_and_filepaths(table, img_dirs)[1])
+            if is_packed_dataset(table):
+                # the sizes are read from the index of the packed dataset
+                ds = PackedImageDataset(table)
+                self.filenames.extend(ds._ids)
+                if ds.has_transcripts and not is_test:
+                    self.labels.extend(x.split() for x in ds._txts)
+                sizes.extend((w, h) for h, w in ds.sizes)
                 continue
-
-            _, filenames, labels = _get_images_and_texts_from_text_table(
-                table, img_dirs
-            )
+            if is_test:
+                ids, filenames = _get_img_ids_and_filepaths(
+                    table, img_dirs, index_cache_dir=index_cache_dir
+                )
+            else:
+                ids, filenames, labels = _get_images_and_texts_from_text_table(
+                    table, img_dirs, index_cache_dir=index_cache_dir
+                )
+                self.labels.extend(x.split() for x in labels)
             self.filenames.extend(filenames)
-            self.labels.extend(x.split() for x in labels)
+            # the sizes are saved next to the table, to be reused by later runs
+            sizes.extend(
+                get_image_sizes(
+                    filenames,
+                    ids=ids,
+                    index_filepath=get_size_index_filepath(table)
+                    if isinstance(table, (str, Path))
+                    else None,
+                )
+            )
 
-        sizes = list(map(imagesize.get, self.filenames))
         self.widths, self.heights = zip(*sizes)
 
     def validate(self, model, syms: SymbolsTable, fixed_input_height: int) -> list[str]:
@@ -125,6 +150,18 @@ class ImageLabelsStats:
         """
         return max(self.heights)
 
+    @cached_property
+    def sizes(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Map each image filename to its size (height, width)
+        """
+        return {
+            filename: (height, width)
+            for filename, width, height in zip(
+                self.filenames, self.widths, self.heights
+            )
+        }
+
     @cached_property
     def is_fixed_height(self) -> bool:
         """
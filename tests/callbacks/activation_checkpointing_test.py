@@ -0,0 +1,60 @@
+import torch
+
+from laia.callbacks import ActivationCheckpointingReport
+from laia.callbacks.activation_checkpointing import measure_forward_backward
+from laia.data import PaddedTensor
+from laia.engine import EngineModule
+from laia.models.htr import LaiaCRNN
+
+
+def crnn():
+    torch.manual_seed(0)
+    return LaiaCRNN(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16, 16, 16],
+        cnn_kernel_size=[3] * 4,
+        cnn_stride=[1] * 4,
+        cnn_dilation=[1] * 4,
+        cnn_activation=[torch.nn.LeakyReLU] * 4,
+        cnn_poolsize=[2, 2, 0, 0],
+        cnn_dropout=[0.0] * 4,
+        cnn_batchnorm=[True] * 4,
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.0,
+        lin_dropout=0.0,
+    ).train()
+
+
+def batch():
+    return PaddedTensor(torch.rand(2, 1, 32, 200), torch.tensor([[32, 200], [32, 150]]))
+
+
+def test_measure_forward_backward():
+    model, x = crnn(), batch()
+    saved, elapsed, peak = measure_forward_backward(model, x)
+    assert elapsed > 0 and peak == 0
+    model.set_activation_checkpointing(2, rnn=True)
+    ckpt_saved, _, _ = measure_forward_backward(model, x)
+    assert 0 < ckpt_saved < saved / 2
+
+
+def test_activation_checkpointing_report(caplog):
+    caplog.set_level("INFO")
+    model = crnn()
+    model.set_activation_checkpointing(2)
+    state = {k: v.clone() for k, v in model.state_dict().items()}
+    callback = ActivationCheckpointingReport()
+    engine_module = EngineModule(model, criterion=None)
+    for _ in range(2):
+        callback.on_train_batch_start(None, engine_module, (batch(), None), 0, 0)
+    messages = [m for m in caplog.messages if m.startswith("Activation checkpointing")]
+    assert len(messages) == 1
+    assert "saved activations" in messages[0]
+    assert "forward + backward time" in messages[0]
+    # the model is left as it was
+    assert model.checkpoint_conv_blocks == 2 and not model.checkpoint_rnn
+    assert all(p.grad is None for p in model.parameters())
+    torch.testing.assert_close(model.state_dict(), state)
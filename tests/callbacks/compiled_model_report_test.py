@@ -0,0 +1,60 @@
+import torch
+
+from laia.callbacks import CompiledModelReport
+from laia.data import PaddedTensor
+from laia.dummies import DummyModel
+from laia.engine import EngineModule, EvaluatorModule
+
+
+def batch(width, batch_size=2):
+    return PaddedTensor(
+        torch.rand(batch_size, 1, 8, width),
+        torch.tensor([[8, width]] * batch_size),
+    )
+
+
+def test_compiled_model_report(caplog):
+    caplog.set_level("INFO")
+    callback = CompiledModelReport()
+    engine_module = EngineModule(DummyModel((3, 3), 10), criterion=None)
+    for width in (16, 32, 16, 16, 32):
+        callback.on_train_batch_start(None, engine_module, (batch(width), None), 0, 0)
+        callback.on_train_batch_end(None, engine_module, None, None, 0, 0)
+    # the last batch of an epoch may be smaller
+    callback.on_train_batch_start(None, engine_module, (batch(16, 1), None), 0, 0)
+    callback.on_train_batch_end(None, engine_module, None, None, 0, 0)
+    callback.on_validation_batch_start(None, engine_module, (batch(16), None), 0, 0)
+    callback.on_validation_batch_end(None, engine_module, None, None, 0, 0)
+    callback.on_train_end(None, engine_module)
+
+    stats = callback.stats["training"]
+    assert len(stats.shapes) == 3
+    assert len(stats.first) == 3 and len(stats.other) == 3
+    assert caplog.messages[-2].startswith(
+        "Compiled model, training batches: 3 distinct input shapes, "
+        "compilation time "
+    )
+    assert "steady-state time" in caplog.messages[-2]
+    assert caplog.messages[-1] == (
+        "Compiled model, validation batches: 1 distinct input shapes, "
+        f"{callback.stats['validation'].first[0]:.1f}s in the first batch "
+        "of each shape"
+    )
+
+
+def test_compiled_model_report_test(caplog):
+    caplog.set_level("INFO")
+    callback = CompiledModelReport()
+    evaluator_module = EvaluatorModule(
+        DummyModel((3, 3), 10), batch_input_fn=lambda b: b["img"]
+    )
+    for width in (16, 16, 24):
+        callback.on_test_batch_start(
+            None, evaluator_module, {"img": batch(width)}, 0, 0
+        )
+        callback.on_test_batch_end(None, evaluator_module, None, None, 0, 0)
+    callback.on_test_end(None, evaluator_module)
+    assert list(callback.stats) == ["test"]
+    assert caplog.messages[-1].startswith(
+        "Compiled model, test batches: 2 distinct input shapes"
+    )
@@ -129,3 +129,30 @@ def test_decode(tmpdir, num_processes, kwargs, img_id, hyp, prob):
         num_processes=num_processes,
     )
     trainer.test(module, datamodule=data_module)
+
+
+def test_decode_rtl_multicharacter_symbols():
+    syms = {0: "<ctc>", 1: "<space>", 2: "ab", 3: "א", 4: "ב"}
+
+    class Decoder:
+        def __call__(self, _):
+            return {"hyp": [[3, 4, 1, 2]]}
+
+    class Module:
+        @staticmethod
+        def batch_id_fn(_):
+            return ["id"]
+
+    decode = Decode(
+        decoder=Decoder(),
+        syms=syms,
+        use_symbols=True,
+        convert_spaces=True,
+        join_string="|",
+        reading_order="RTL",
+    )
+    outputs = []
+    decode.write = outputs.append
+    decode.on_test_batch_end(None, Module(), None, None, 0, 0)
+    # the multi-character symbol is not split into characters
+    assert outputs == ["id ab| |ב|א"]
@@ -8,7 +8,8 @@ import pytorch_lightning as pl
 import torch
 
 from laia.common.loader import ModelLoader, ObjectLoader
-from laia.dummies import DummyEngine, DummyMNIST, DummyTrainer
+from laia.common.saver import ModelSaver
+from laia.dummies import DummyEngine, DummyMNIST, DummyModel, DummyTrainer
 
 
 class Foo:
@@ -248,3 +249,19 @@ def test_model_loader_prepare_checkpoint(tmpdir):
         ModelLoader.prepare_checkpoint("", tmpdir, monitor)
     with pytest.raises(AssertionError, match="Could not find the checkpoint"):
         ModelLoader.prepare_checkpoint("?", exp_dirpath, monitor)
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_model_loader_load_by_quantize(tmpdir, quantize):
+    torch.manual_seed(0)
+    model_args = [(3, 3), 12]
+    ModelSaver(tmpdir).save(DummyModel, *model_args)
+    model = DummyModel(*model_args)
+    ckpt = tmpdir / "model.ckpt"
+    torch.save(model.state_dict(), str(ckpt))
+    loaded = ModelLoader(tmpdir).load_by(str(ckpt), quantize=quantize)
+    assert isinstance(loaded._linear, torch.ao.nn.quantized.dynamic.Linear) == quantize
+    x = torch.randn(2, 1, 5, 5)
+    torch.testing.assert_close(
+        loaded(x).data, model(x).data, rtol=0, atol=0.05 if quantize else 0
+    )
@@ -0,0 +1,126 @@
+import pytest
+from torch.utils.data import SequentialSampler
+
+from laia.data import BucketingBatchSampler, PixelBudgetBatchSampler
+
+# (height, width) of each image
+SIZES = [(128, w) for w in (10, 500, 20, 490, 30, 480, 40, 470, 50, 460)]
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("drop_last", [False, True])
+def test_batches_cover_all_samples(shuffle, drop_last):
+    sampler = BucketingBatchSampler(
+        SequentialSampler(SIZES),
+        SIZES,
+        batch_size=3,
+        num_buckets=2,
+        shuffle=shuffle,
+        drop_last=drop_last,
+        seed=0,
+    )
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    indices = [i for b in batches for i in b]
+    assert len(indices) == len(set(indices))
+    if drop_last:
+        assert all(len(b) == 3 for b in batches)
+        assert len(indices) == 6
+    else:
+        assert sorted(indices) == list(range(len(SIZES)))
+
+
+def test_batches_group_similar_sizes():
+    sampler = BucketingBatchSampler(
+        SequentialSampler(SIZES), SIZES, batch_size=5, num_buckets=2, shuffle=False
+    )
+    batches = list(sampler)
+    assert sorted(map(sorted, batches)) == [[0, 2, 4, 6, 8], [1, 3, 5, 7, 9]]
+    assert sampler.padding_ratio < sampler.compute_padding_ratio(
+        [list(range(5)), list(range(5, 10))]
+    )
+
+
+def test_shuffle_is_deterministic_per_epoch():
+    def make():
+        return BucketingBatchSampler(
+            SequentialSampler(SIZES), SIZES, batch_size=2, num_buckets=2, seed=1
+        )
+
+    a, b = make(), make()
+    assert list(a) == list(b)
+    assert a.epoch == b.epoch == 1
+    assert list(a) == list(b)
+
+
+def test_padding_ratio():
+    sizes = [(1, 1), (1, 3), (2, 2)]
+    sampler = BucketingBatchSampler(SequentialSampler(sizes), sizes)
+    assert sampler.compute_padding_ratio([]) == 0
+    assert sampler.compute_padding_ratio([[0], [1], [2]]) == 0
+    # 8 real pixels in a 3x2x3 padded batch
+    assert sampler.compute_padding_ratio([[0, 1, 2]]) == pytest.approx(1 - 8 / 18)
+
+
+def test_pixel_budget_batches():
+    sizes = [(10, 10)] * 8 + [(10, 100)] * 4 + [(10, 1000)]
+    sampler = PixelBudgetBatchSampler(
+        SequentialSampler(sizes), sizes, 400, num_buckets=1, shuffle=False
+    )
+    assert len(sampler) == 7
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sorted(map(len, batches)) == [1, 1, 1, 1, 1, 4, 4]
+    assert sampler.padding_ratio == 0
+
+
+def test_pixel_budget_shuffled_batches():
+    sampler = PixelBudgetBatchSampler(
+        SequentialSampler(SIZES), SIZES, 128 * 1000, num_buckets=2, seed=0
+    )
+    for _ in range(2):
+        num_batches = len(sampler)
+        batches = list(sampler)
+        assert len(batches) == num_batches
+        assert sorted(i for b in batches for i in b) == list(range(len(SIZES)))
+        for b in batches:
+            assert len(b) * max(SIZES[i][1] for i in b) * 128 <= 128 * 1000
+
+
+def test_pixel_budget_max_batch_size():
+    sizes = [(1, 1)] * 10
+    sampler = PixelBudgetBatchSampler(
+        SequentialSampler(sizes), sizes, 100, batch_size=4, num_buckets=1
+    )
+    assert sorted(map(len, sampler)) == [2, 4, 4]
+
+
+@pytest.mark.parametrize("drop_last", [False, True])
+def test_pixel_budget_distributed_batches(drop_last):
+    # a few wide images and many narrow ones: packing the shard of each
+    # process would give them a different number of batches
+    sizes = [(10, 1000)] * 3 + [(10, 10)] * 40 + [(10, 500)] * 3
+    samplers = [
+        PixelBudgetBatchSampler(
+            SequentialSampler(sizes),
+            sizes,
+            1000,
+            num_buckets=3,
+            drop_last=drop_last,
+            seed=0,
+            num_replicas=2,
+            rank=rank,
+        )
+        for rank in range(2)
+    ]
+    for _ in range(2):
+        assert len(samplers[0]) == len(samplers[1])
+        batches = [list(s) for s in samplers]
+        assert len(batches[0]) == len(batches[1]) == len(samplers[0])
+        indices = [i for b in batches[0] + batches[1] for i in b]
+        if not drop_last:
+            assert set(indices) == set(range(len(sizes)))
+        # the processes do not share batches, except the padding ones
+        shared = {tuple(b) for b in batches[0]} & {tuple(b) for b in batches[1]}
+        assert drop_last or len(shared) <= 1
+        assert not drop_last or not shared
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from laia.data import BucketingBatchSampler
+from laia.data.cost_balanced_distributed_sampler import CostBalancedDistributedSampler
+from laia.data.unpadded_distributed_sampler import UnpaddedDistributedSampler
+
+
+def _get_shards(size, num_replicas, cls=CostBalancedDistributedSampler, **kwargs):
+    dataset = list(range(size))
+    return [
+        list(cls(dataset, num_replicas=num_replicas, rank=rank, **kwargs))
+        for rank in range(num_replicas)
+    ]
+
+
+@pytest.mark.parametrize("num_replicas", [1, 2, 3, 8])
+def test_no_duplicates(num_replicas):
+    costs = np.random.default_rng(0).integers(1, 1000, size=101)
+    shards = _get_shards(len(costs), num_replicas, costs=costs)
+    assert sorted(i for shard in shards for i in shard) == list(range(len(costs)))
+    assert all(shard == sorted(shard) for shard in shards)
+    assert all(len(shard) >= 1 for shard in shards)
+
+
+def test_balanced():
+    # a few wide images, all in the positions of the first rank
+    costs = [100 * (10000 if i % 4 == 0 and i < 16 else 500) for i in range(400)]
+    shards = _get_shards(len(costs), 4, costs=costs)
+    totals = [sum(costs[i] for i in shard) for shard in shards]
+    assert max(totals) - min(totals) <= max(costs[4:])
+    # round-robin gives all the wide images to the first rank
+    unpadded = _get_shards(len(costs), 4, cls=UnpaddedDistributedSampler, shuffle=False)
+    unpadded_totals = [sum(costs[i] for i in shard) for shard in unpadded]
+    assert max(unpadded_totals) - min(unpadded_totals) > max(totals) - min(totals)
+
+
+def test_deterministic():
+    costs = [5, 3, 5, 1, 3, 5, 2]
+    assert _get_shards(len(costs), 3, costs=costs) == _get_shards(
+        len(costs), 3, costs=costs
+    )
+    assert _get_shards(len(costs), 3, costs=costs) == [[0, 1], [2, 4], [3, 5, 6]]
+
+
+def test_zero_costs():
+    shards = _get_shards(5, 2, costs=[0] * 5)
+    assert [len(shard) for shard in shards] == [3, 2]
+
+
+def test_len():
+    sampler = CostBalancedDistributedSampler(
+        list(range(5)), [4, 1, 1, 1, 1], num_replicas=2, rank=0
+    )
+    assert list(sampler) == [0]
+    assert len(sampler) == 1
+
+
+def test_not_enough_samples():
+    with pytest.raises(AssertionError):
+        CostBalancedDistributedSampler([0], [1], num_replicas=2, rank=1)
+
+
+def test_bucketing():
+    sizes = [(10, w) for w in range(1, 41)]
+    costs = [h * w for h, w in sizes]
+    for rank in range(2):
+        sampler = CostBalancedDistributedSampler(
+            list(range(40)), costs, num_replicas=2, rank=rank
+        )
+        batch_sampler = BucketingBatchSampler(
+            sampler, sizes, batch_size=4, num_buckets=2, shuffle=False
+        )
+        batches = list(batch_sampler)
+        assert sorted(i for batch in batches for i in batch) == list(sampler)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from laia.data.encoded_texts import EncodedTexts, get_encoded_texts
+from laia.data.transforms.text import ToTensor
+from laia.utils import SymbolsTable
+
+
+def test_encode():
+    encoded = EncodedTexts.encode(["a b", "", "b x a"], ToTensor({"a": 0, "b": 1}))
+    assert len(encoded) == 3
+    assert encoded.values.dtype == np.int32
+    np.testing.assert_array_equal(encoded.values, [0, 1, 1, -1, 0])
+    np.testing.assert_array_equal(encoded.offsets, [0, 2, 2, 5])
+    assert encoded.unknown == {2}
+    assert encoded[0] == [0, 1]
+    assert encoded[1] == []
+    assert encoded[2] == [1, None, 0]
+
+
+def test_encode_empty():
+    encoded = EncodedTexts.encode([], ToTensor({"a": 0}))
+    assert len(encoded) == 0
+
+
+def test_save_load(tmpdir):
+    encoded = EncodedTexts.encode(["a b", "b a"], ToTensor({"a": 0, "b": 1}))
+    encoded.save(tmpdir / "encoded.npz")
+    loaded = EncodedTexts.load(tmpdir / "encoded.npz")
+    assert [loaded[i] for i in range(2)] == [[0, 1], [1, 0]]
+
+
+def test_get_encoded_texts(tmpdir):
+    txts = ["a b", "b a"]
+    transform = ToTensor({"a": 0, "b": 1})
+    encoded = get_encoded_texts(txts, transform, cache_dir=tmpdir / "cache")
+    assert [encoded[i] for i in range(2)] == [[0, 1], [1, 0]]
+    assert len((tmpdir / "cache").listdir()) == 1
+    # the same transcripts and transform reuse the cache
+    get_encoded_texts(txts, transform, cache_dir=tmpdir / "cache")
+    assert len((tmpdir / "cache").listdir()) == 1
+    # different transcripts or symbols are cached separately
+    get_encoded_texts(txts[:1], transform, cache_dir=tmpdir / "cache")
+    encoded = get_encoded_texts(
+        txts, ToTensor({"a": 1, "b": 0}), cache_dir=tmpdir / "cache"
+    )
+    assert len((tmpdir / "cache").listdir()) == 3
+    assert [encoded[i] for i in range(2)] == [[1, 0], [0, 1]]
+
+
+@pytest.mark.parametrize("cache_dir", [None, "cache"])
+def test_get_encoded_texts_rtl(tmpdir, cache_dir):
+    syms = SymbolsTable(from_dict={0: "a", 1: "b", 2: "<space>"})
+    transform = ToTensor(syms, reading_order="RTL")
+    encoded = get_encoded_texts(
+        ["a <space> b"],
+        transform,
+        cache_dir=tmpdir / cache_dir if cache_dir else None,
+    )
+    assert encoded[0] == transform("a <space> b")
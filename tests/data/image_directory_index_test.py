@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+from laia.data.image_directory_index import (
+    ImageDirectoryIndex,
+    find_image_filepath,
+    find_image_filepath_from_id,
+    get_image_directory_index,
+)
+
+
+def test_find_image_filepath_from_id_not_found(tmpdir):
+    filepath = find_image_filepath_from_id(
+        "bar", tmpdir, img_extensions=[".jpg", ".png"]
+    )
+    assert filepath is None
+
+
+@pytest.mark.parametrize("id_has_ext", [False, True])
+def test_find_image_filepath_from_id(tmpdir, id_has_ext):
+    img_id = "foo.PNG" if id_has_ext else "foo"
+    img_dir = tmpdir.mkdir("dir")
+    expected = img_dir / "foo.PNG"
+    expected.write(None)
+    filepath = find_image_filepath_from_id(
+        img_id, img_dir, img_extensions=[".jpg", ".png"]
+    )
+    assert filepath == expected
+
+
+@pytest.mark.parametrize(
+    ["img_id", "expected"],
+    [
+        ("foo", "foo.PNG"),
+        ("foo.PNG", "foo.PNG"),
+        ("bar", "bar.jpg"),
+        ("bar.jpg", "bar.jpg"),
+        ("baz", None),
+        ("qux", None),
+        ("foo.png", None),
+        ("sub/foo", "sub/foo.png"),
+    ],
+)
+def test_image_directory_index(tmpdir, img_id, expected):
+    for filename in ("foo.PNG", "bar.jpg", "baz.txt", "qux.Jpg"):
+        tmpdir.join(filename).write(None)
+    tmpdir.mkdir("sub").join("foo.png").write(None)
+    index = ImageDirectoryIndex(tmpdir, img_extensions=[".jpg", ".png"])
+    assert index.filenames == {"foo.PNG", "bar.jpg"}
+    assert index.find(img_id) == (None if expected is None else tmpdir / expected)
+    # same result as checking the files one by one
+    assert index.find(img_id) == find_image_filepath_from_id(
+        img_id, tmpdir, img_extensions=[".jpg", ".png"]
+    )
+
+
+def test_image_directory_index_not_found(tmpdir):
+    index = ImageDirectoryIndex(tmpdir / "foo")
+    assert len(index) == 0
+    assert index.find("bar") is None
+
+
+def test_image_directory_index_cache(tmpdir):
+    img_dir = tmpdir.mkdir("images")
+    img_dir.join("foo.png").write(None)
+    cache_dir = tmpdir / "cache"
+    index = ImageDirectoryIndex(img_dir, cache_dir=cache_dir)
+    (cache_filepath,) = cache_dir.listdir()
+    assert json.loads(cache_filepath.read())["filenames"] == ["foo.png"]
+
+    # the cached listing is used while the directory is not modified
+    cache = json.loads(cache_filepath.read())
+    cache["filenames"] = ["bar.png"]
+    cache_filepath.write(json.dumps(cache))
+    assert ImageDirectoryIndex(img_dir, cache_dir=cache_dir).filenames == {"bar.png"}
+
+    img_dir.join("baz.png").write(None)
+    os.utime(img_dir, ns=(index.mtime + 10**9, index.mtime + 10**9))
+    index = ImageDirectoryIndex(img_dir, cache_dir=cache_dir)
+    assert index.filenames == {"foo.png", "baz.png"}
+
+
+def test_get_image_directory_index(tmpdir):
+    tmpdir.join("foo.png").write(None)
+    index = get_image_directory_index(tmpdir)
+    assert get_image_directory_index(tmpdir) is index
+    tmpdir.join("bar.png").write(None)
+    os.utime(tmpdir, ns=(index.mtime + 10**9, index.mtime + 10**9))
+    new_index = get_image_directory_index(tmpdir)
+    assert new_index is not index
+    assert new_index.find("bar") == tmpdir / "bar.png"
+
+
+def test_find_image_filepath(tmpdir):
+    dir1, dir2 = tmpdir.mkdir("dir1"), tmpdir.mkdir("dir2")
+    dir1.join("foo.png").write(None)
+    dir2.join("foo.jpg").write(None)
+    dir2.join("bar.jpg").write(None)
+    indexes = [ImageDirectoryIndex(dir1), ImageDirectoryIndex(dir2)]
+    assert find_image_filepath("foo", indexes) == dir1 / "foo.png"
+    assert find_image_filepath("bar", indexes) == dir2 / "bar.jpg"
+    assert find_image_filepath(str(dir2 / "foo.jpg"), indexes) == dir2 / "foo.jpg"
+    assert find_image_filepath("baz", indexes) is None
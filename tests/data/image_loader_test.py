@@ -0,0 +1,122 @@
+import pickle
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from laia.data import ImageDataset, ImageLoader, image_loader
+from laia.data.image_directory_index import IMAGE_EXTENSIONS
+
+
+def _save_image(tmpdir, ext, size=(31, 17)):
+    x = np.random.default_rng(0).integers(0, 256, size=size[::-1] + (3,))
+    filepath = str(tmpdir / f"img{ext}")
+    Image.fromarray(x.astype(np.uint8)).save(filepath)
+    return filepath
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB"])
+def test_torchvision_backend_png(tmpdir, mode):
+    filepath = _save_image(tmpdir, ".png")
+    img = ImageLoader("torchvision", mode=mode)(filepath)
+    expected = Image.open(filepath).convert(mode)
+    assert img.mode == mode
+    # the grayscale conversions only differ in the rounding
+    np.testing.assert_allclose(np.asarray(img), np.asarray(expected), atol=1)
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB"])
+def test_torchvision_backend_jpeg(tmpdir, mode):
+    filepath = _save_image(tmpdir, ".jpg")
+    img = ImageLoader("torchvision", mode=mode)(filepath)
+    expected = Image.open(filepath).convert(mode)
+    assert img.mode == mode and img.size == expected.size
+    diff = np.abs(np.asarray(img, dtype=int) - np.asarray(expected, dtype=int))
+    # libjpeg decodes the luma directly, without the chroma subsampling
+    assert diff.mean() <= 2
+
+
+def _save_png(tmpdir, img_mode):
+    x = np.random.default_rng(0).integers(0, 256, size=(17, 31, 4)).astype(np.uint8)
+    img = Image.fromarray(x)
+    if img_mode == "P":
+        img = img.convert("RGB").quantize(16)
+    elif img_mode == "I;16":
+        img = Image.fromarray(x[..., 0].astype(np.uint16) * 257)
+    else:
+        img = img.convert(img_mode)
+    filepath = str(tmpdir / "img.png")
+    img.save(filepath)
+    return filepath
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB", "RGBA"])
+@pytest.mark.parametrize("img_mode", ["P", "1", "I;16", "LA", "RGBA"])
+def test_torchvision_backend_png_fallback(tmpdir, mode, img_mode):
+    filepath = _save_png(tmpdir, img_mode)
+    img = ImageLoader("torchvision", mode=mode)(filepath).convert(mode)
+    expected = Image.open(filepath).convert(mode)
+    assert img.mode == mode
+    np.testing.assert_array_equal(np.asarray(img), np.asarray(expected))
+
+
+def test_torchvision_backend_jpeg_rgba(tmpdir):
+    filepath = _save_image(tmpdir, ".jpg")
+    img = ImageLoader("torchvision", mode="RGBA")(filepath).convert("RGBA")
+    expected = Image.open(filepath).convert("RGBA")
+    np.testing.assert_array_equal(np.asarray(img), np.asarray(expected))
+
+
+def test_torchvision_backend_decode_error(tmpdir, monkeypatch):
+    filepath = _save_image(tmpdir, ".jpg")
+
+    def decode_image(*_, **__):
+        raise RuntimeError("Unsupported image")
+
+    monkeypatch.setattr(image_loader, "decode_image", decode_image)
+    img = ImageLoader("torchvision", mode="RGB")(filepath)
+    # the image is decoded by PIL instead
+    assert img.format == "JPEG"
+
+
+@pytest.mark.parametrize("ext", IMAGE_EXTENSIONS)
+def test_all_extensions(tmpdir, ext):
+    # formats other than JPEG and PNG fall back to PIL
+    if ext == ".pbm":
+        filepath = str(tmpdir / "img.pbm")
+        Image.new("1", (31, 17)).save(filepath)
+    else:
+        filepath = _save_image(tmpdir, ext)
+    img = ImageLoader("torchvision", mode="L")(filepath)
+    assert img.convert("L").size == (31, 17)
+
+
+def test_pil_backend(tmpdir):
+    filepath = _save_image(tmpdir, ".jpg")
+    img = ImageLoader()(filepath)
+    # the image is opened lazily
+    assert img.format == "JPEG"
+
+
+def test_buffer_reused(tmpdir):
+    small = _save_image(tmpdir.mkdir("small"), ".png", size=(5, 3))
+    large = _save_image(tmpdir.mkdir("large"), ".png", size=(50, 30))
+    loader = ImageLoader("torchvision", mode="RGB")
+    assert loader(large).size == (50, 30)
+    buffer = loader._buffer
+    assert loader(small).size == (5, 3)
+    assert loader._buffer is buffer
+    assert len(pickle.loads(pickle.dumps(loader))._buffer) == 0
+
+
+def test_invalid_backend():
+    with pytest.raises(AssertionError):
+        ImageLoader("foo")
+    with pytest.raises(AssertionError):
+        ImageLoader("torchvision")
+
+
+def test_image_dataset(tmpdir):
+    filepath = _save_image(tmpdir, ".png")
+    dataset = ImageDataset([filepath], img_loader=ImageLoader("torchvision", "L"))
+    assert dataset[0]["img"].mode == "L"
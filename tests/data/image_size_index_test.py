@@ -0,0 +1,57 @@
+import logging
+import os
+
+from PIL import Image
+
+from laia.data.image_size_index import (
+    get_image_sizes,
+    get_size_index_filepath,
+    load_size_index,
+)
+
+
+def prepare_images(tmpdir, sizes):
+    filepaths = []
+    for i, size in enumerate(sizes):
+        filepath = str(tmpdir / f"img-{i}.png")
+        Image.new(mode="L", size=size).save(filepath)
+        filepaths.append(filepath)
+    return filepaths
+
+
+def test_get_image_sizes(tmpdir):
+    sizes = [(10, 5), (20, 6), (30, 7)]
+    filepaths = prepare_images(tmpdir, sizes)
+    assert get_image_sizes(filepaths, num_workers=2) == sizes
+    assert not tmpdir.join("table.txt.sizes").exists()
+
+
+def test_get_image_sizes_with_index(tmpdir, caplog):
+    caplog.set_level(logging.INFO)
+    sizes = [(10, 5), (20, 6), (30, 7)]
+    filepaths = prepare_images(tmpdir, sizes)
+    index_filepath = get_size_index_filepath(tmpdir / "table.txt")
+    assert index_filepath == str(tmpdir / "table.txt.sizes")
+
+    ids = ["a", "b", "c"]
+    assert get_image_sizes(filepaths, ids=ids, index_filepath=index_filepath) == sizes
+    assert caplog.messages[-1].startswith("Read the size of 3 images, 0 reused")
+    index = load_size_index(index_filepath)
+    assert [index[f][:2] for f in filepaths] == sizes
+    assert [line.split("\t")[0] for line in open(index_filepath)] == ids
+
+    # the sizes of the images which were not modified are reused
+    mtime = os.stat(index_filepath).st_mtime_ns
+    assert get_image_sizes(filepaths, ids=ids, index_filepath=index_filepath) == sizes
+    assert caplog.messages[-1].startswith("Read the size of 3 images, 3 reused")
+    assert os.stat(index_filepath).st_mtime_ns == mtime
+
+    Image.new(mode="L", size=(40, 8)).save(filepaths[1])
+    os.utime(filepaths[1], ns=(index[filepaths[1]][2] + 10**9,) * 2)
+    new_sizes = [(10, 5), (40, 8), (30, 7)]
+    assert (
+        get_image_sizes(filepaths, ids=ids, index_filepath=index_filepath) == new_sizes
+    )
+    assert caplog.messages[-1].startswith("Read the size of 3 images, 2 reused")
+    index = load_size_index(index_filepath)
+    assert [index[f][:2] for f in filepaths] == new_sizes
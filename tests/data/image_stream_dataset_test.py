@@ -0,0 +1,95 @@
+import io
+
+import pytest
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader
+
+from laia.data.image_stream_dataset import ImageIdStreamSampler, ImageStreamDataset
+from laia.data.transforms.vision import ToImageTensor
+
+
+@pytest.fixture
+def img_dir(tmpdir):
+    img_dir = tmpdir.mkdir("imgs")
+    for i in range(10):
+        Image.new(mode="L", size=(i + 1, 2)).save(str(img_dir / f"img-{i}.png"))
+    return img_dir
+
+
+def test_image_id_stream_sampler(tmpdir, img_dir, caplog):
+    img_list = tmpdir / "img_list"
+    img_list.write_text("img-0\n# img-1\n\nimg-2.png\n missing \nimg-3\n", "utf-8")
+    sampler = ImageIdStreamSampler(str(img_list), img_dirs=[str(img_dir)])
+    assert list(sampler) == [
+        ("img-0", str(img_dir / "img-0.png")),
+        ("img-2.png", str(img_dir / "img-2.png")),
+        ("img-3", str(img_dir / "img-3.png")),
+    ]
+    assert caplog.messages.count(
+        "No image file found for image ID 'missing', ignoring it..."
+    )
+    with pytest.raises(TypeError):
+        len(sampler)
+
+
+def test_image_id_stream_sampler_filepaths(tmpdir, img_dir):
+    filepath = str(img_dir / "img-4.png")
+    img_list = tmpdir / "img_list"
+    img_list.write_text(filepath, "utf-8")
+    assert list(ImageIdStreamSampler(str(img_list))) == [(filepath, filepath)]
+
+
+def test_image_id_stream_sampler_stdin(monkeypatch, img_dir):
+    monkeypatch.setattr("sys.stdin", io.StringIO("img-5\nimg-6\n"))
+    sampler = ImageIdStreamSampler("-", img_dirs=[str(img_dir)])
+    assert [img_id for img_id, _ in sampler] == ["img-5", "img-6"]
+    with pytest.raises(AssertionError, match="stdin"):
+        ImageIdStreamSampler("-", num_replicas=2, rank=0)
+
+
+def test_image_id_stream_sampler_distributed(tmpdir, img_dir):
+    img_list = tmpdir / "img_list"
+    img_list.write_text("\n".join(f"img-{i}" for i in range(10)), "utf-8")
+    shards = [
+        [
+            img_id
+            for img_id, _ in ImageIdStreamSampler(
+                str(img_list), img_dirs=[str(img_dir)], num_replicas=3, rank=rank
+            )
+        ]
+        for rank in range(3)
+    ]
+    assert shards == [
+        ["img-0", "img-3", "img-6", "img-9"],
+        ["img-1", "img-4", "img-7"],
+        ["img-2", "img-5", "img-8"],
+    ]
+
+
+def test_image_stream_dataset(img_dir):
+    ds = ImageStreamDataset(img_transform=ToImageTensor())
+    out = ds[("foo", str(img_dir / "img-2.png"))]
+    assert out["id"] == "foo"
+    assert out["img"].size() == (1, 2, 3)
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_image_stream_dataloader(tmpdir, img_dir, num_workers):
+    img_list = tmpdir / "img_list"
+    img_list.write_text("\n".join(f"img-{i}" for i in range(10)), "utf-8")
+    dl = DataLoader(
+        ImageStreamDataset(img_transform=ToImageTensor()),
+        sampler=ImageIdStreamSampler(str(img_list), img_dirs=[str(img_dir)]),
+        batch_size=3,
+        num_workers=num_workers,
+        collate_fn=lambda batch: batch,
+    )
+    batches = list(dl)
+    assert [len(b) for b in batches] == [3, 3, 3, 1]
+    items = [x for b in batches for x in b]
+    # the workers decode each image once, in order
+    assert [x["id"] for x in items] == [f"img-{i}" for i in range(10)]
+    assert all(
+        torch.equal(x["img"], torch.ones(1, 2, i + 1)) for i, x in enumerate(items)
+    )
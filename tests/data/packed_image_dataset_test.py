@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from laia.data import PackedImageDataset, TextImageFromTextTableDataset
+from laia.data.packed_image_dataset import is_packed_dataset, pack_dataset
+from laia.data.transforms.vision import ToImageTensor
+
+
+def prepare_images(tmpdir, mode="L", n=5):
+    rng = np.random.default_rng(0)
+    ids, filepaths, txts = [], [], []
+    for i in range(n):
+        shape = (10 + i, 20 + 3 * i) + ((3,) if mode == "RGB" else ())
+        img = Image.fromarray(rng.integers(256, size=shape, dtype=np.uint8), mode)
+        filepath = str(tmpdir / f"img-{i}.png")
+        img.save(filepath)
+        ids.append(f"img-{i}")
+        filepaths.append(filepath)
+        txts.append(f"a b {i}")
+    return ids, filepaths, txts
+
+
+def test_is_packed_dataset(tmpdir):
+    assert not is_packed_dataset(str(tmpdir))
+    assert not is_packed_dataset(["foo bar"])
+    pack_dataset(tmpdir / "packed", [], [], num_workers=1)
+    assert is_packed_dataset(tmpdir / "packed")
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB"])
+@pytest.mark.parametrize("shard_size", [1, 1 << 30])
+def test_packed_image_dataset(tmpdir, mode, shard_size):
+    ids, filepaths, txts = prepare_images(tmpdir, mode=mode)
+    pack_dataset(
+        tmpdir / "packed",
+        ids,
+        filepaths,
+        txts=txts,
+        color_mode=mode,
+        shard_size=shard_size,
+        num_workers=1,
+    )
+    dataset = PackedImageDataset(
+        tmpdir / "packed", img_transform=ToImageTensor(mode=mode, invert=False)
+    )
+    expected = TextImageFromTextTableDataset(
+        [f"{i} {t}" for i, t in zip(ids, txts)],
+        img_dirs=[tmpdir],
+        img_transform=ToImageTensor(mode=mode, invert=True),
+    )
+    assert dataset.num_shards == (len(ids) if shard_size == 1 else 1)
+    assert len(dataset) == len(expected)
+    assert dataset.sizes == [[10 + i, 20 + 3 * i] for i in range(len(ids))]
+    for i in range(len(ids)):
+        out = dataset[i]
+        assert out.keys() == {"id", "img", "txt"}
+        assert out["id"] == ids[i]
+        assert out["txt"] == txts[i]
+        torch.testing.assert_close(out["img"], expected[i]["img"])
+
+
+def test_packed_image_dataset_without_transcripts(tmpdir):
+    ids, filepaths, _ = prepare_images(tmpdir)
+    pack_dataset(tmpdir / "packed", ids, filepaths, num_workers=1)
+    dataset = PackedImageDataset(tmpdir / "packed")
+    assert not dataset.has_transcripts
+    out = dataset[2]
+    assert out.keys() == {"id", "img"}
+    assert out["id"] == "img-2"
+    assert out["img"].size == (26, 12)
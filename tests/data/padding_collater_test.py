@@ -5,6 +5,7 @@ import pytest
 import torch
 
 from laia.data import PaddedTensor, PaddingCollater
+from laia.data.padding_collater import bucket_size
 
 
 @pytest.mark.parametrize(
@@ -144,6 +145,83 @@ class TestPaddingCollater(unittest.TestCase):
             self.assertEqual(list(b["img"].size()), xs[i].tolist())
         self.check_collated([b["img"] for b in batch], (3, 3, 25, 40), x)
 
+    def test_collate_tensors_into_buffer(self):
+        batch = [torch.rand(1, 2, 3), torch.rand(1, 3, 2)]
+        out = torch.full((2, 1, 3, 3), 5.0)
+        x = PaddingCollater.collate_tensors(batch, (2, 1, 3, 3), out=out)
+        self.assertIs(x, out)
+        torch.testing.assert_close(x[0, :, :2, :3], batch[0])
+        torch.testing.assert_close(x[1, :, :3, :2], batch[1])
+        self.assertEqual(x[0, :, 2:].sum(), 0)
+        self.assertEqual(x[1, :, :, 2:].sum(), 0)
+
+    def test_get_sizes(self):
+        batch = [torch.empty(1, 2, 3), torch.empty(1, 4, 1)]
+        xs = PaddingCollater.get_sizes(batch)
+        torch.testing.assert_close(xs, torch.tensor([[1, 2, 3], [1, 4, 1]]))
+        self.assertEqual(
+            PaddingCollater.get_max_sizes(batch, batch_sizes=xs), (2, 1, 4, 3)
+        )
+
+    def test_collate_pin_memory(self):
+        collate_fn = PaddingCollater((1, None, None), pin_memory=True)
+        batch = [torch.rand(1, 2, 3), torch.rand(1, 3, 2)]
+        x, _ = collate_fn(batch)
+        self.assertEqual(x.is_pinned(), torch.cuda.is_available())
+
+    def test_collate_in_dataloader_worker(self):
+        dataset = [torch.rand(1, 2, 2) for _ in range(4)]
+        for shared_memory in (False, True):
+            for sizes in ((1, None, None), (1, 2, 2)):
+                collater = PaddingCollater(sizes, shared_memory=shared_memory)
+
+                def collate_fn(batch):
+                    x = collater(batch)
+                    x = x.data if isinstance(x, PaddedTensor) else x
+                    # whether the batch was collated in shared memory
+                    return x, x.is_shared()
+
+                with self.subTest(shared_memory=shared_memory, sizes=sizes):
+                    dl = torch.utils.data.DataLoader(
+                        dataset, batch_size=2, num_workers=1, collate_fn=collate_fn
+                    )
+                    for i, (x, is_shared) in enumerate(dl):
+                        self.assertEqual(is_shared, shared_memory)
+                        torch.testing.assert_close(
+                            x, torch.stack(dataset[2 * i : 2 * i + 2])
+                        )
+
+    def test_collate_width_buckets(self):
+        collate_fn = PaddingCollater({"img": (1, None, None)}, width_buckets=[16, 32])
+        batch = [{"img": torch.rand(1, 5, 17)}, {"img": torch.rand(1, 7, 10)}]
+        x, xs = collate_fn(batch)["img"]
+        # only the width is bucketed, and the sizes are those of the images
+        self.assertEqual(list(x.size()), [2, 1, 7, 32])
+        torch.testing.assert_close(xs, torch.tensor([[1, 5, 17], [1, 7, 10]]))
+        torch.testing.assert_close(x[0, :, :5, :17], batch[0]["img"])
+        torch.testing.assert_close(x[1, :, :7, :10], batch[1]["img"])
+        self.assertEqual(x[0, :, :, 17:].sum(), 0)
+        self.assertEqual(x[1, :, :, 10:].sum(), 0)
+        # the batches with a fixed width are not padded
+        collate_fn = PaddingCollater((1, 5, 17), width_buckets=[16, 32])
+        self.assertEqual(list(collate_fn([batch[0]["img"]]).size()), [1, 1, 5, 17])
+
+
+@pytest.mark.parametrize(
+    ["size", "expected"],
+    [
+        (1, 128),
+        (128, 128),
+        (129, 256),
+        (300, 512),
+        (512, 512),
+        (513, 1024),
+        (1200, 1536),
+    ],
+)
+def test_bucket_size(size, expected):
+    assert bucket_size(size, [512, 128, 256]) == expected
+
 
 if __name__ == "__main__":
     unittest.main()
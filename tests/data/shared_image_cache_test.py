@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from laia.data import ImageDataset, SharedImageCache
+from laia.data.transforms.vision import ToImageTensor
+
+
+def test_shared_image_cache(tmpdir):
+    cache = SharedImageCache(tmpdir, max_bytes=1000)
+    assert cache.get("foo") is None
+    img = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    cache.put("foo", img)
+    cached = cache.get("foo")
+    np.testing.assert_array_equal(cached, img)
+    assert cached.dtype == np.uint8
+    assert cache.usage == os.path.getsize(cache.get_filepath("foo"))
+    assert cache.get("bar") is None
+
+
+def test_shared_image_cache_put_twice(tmpdir):
+    # e.g. two workers decoding the same image before any of them stored it
+    cache = SharedImageCache(tmpdir, max_bytes=1000)
+    img = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    cache.put("foo", img)
+    cache.put("foo", img)
+    assert cache.usage == os.path.getsize(cache.get_filepath("foo"))
+    assert not [f for f in os.listdir(tmpdir) if f.endswith(".tmp")]
+
+
+def test_shared_image_cache_too_large(tmpdir):
+    cache = SharedImageCache(tmpdir, max_bytes=100)
+    cache.put("foo", np.zeros((10, 10), dtype=np.uint8))
+    assert cache.get("foo") is None
+    assert cache.usage == 0
+    assert not [f for f in os.listdir(tmpdir) if f.endswith((".npy", ".tmp"))]
+
+
+def test_shared_image_cache_lru_eviction(tmpdir):
+    img = np.zeros((10, 10), dtype=np.uint8)
+    # 228 bytes per image: the budget allows 4 images and, after evicting,
+    # 90% of it has to fit the new image
+    cache = SharedImageCache(tmpdir, max_bytes=1100)
+    size = 0
+    for i in range(3):
+        cache.put(str(i), img)
+        # make sure the modification times differ
+        os.utime(cache.get_filepath(str(i)), ns=(i, i))
+        size = os.path.getsize(cache.get_filepath(str(i)))
+    assert cache.usage == 3 * size
+    # use the first image, so the second one is the least recently used
+    assert cache.get("0") is not None
+    cache.put("3", img)
+    cache.put("4", img)
+    assert cache.get("1") is None
+    assert all(cache.get(k) is not None for k in ("0", "2", "3", "4"))
+    assert cache.usage == 4 * size <= cache.max_bytes
+
+
+def test_shared_image_cache_clear(tmpdir):
+    cache = SharedImageCache(tmpdir, max_bytes=1000)
+    cache.put("foo", np.zeros((2, 2), dtype=np.uint8))
+    cache.clear()
+    assert cache.get("foo") is None
+    assert cache.usage == 0
+
+
+def _put_and_get(cache, key):
+    img = np.full((5, 5), int(key), dtype=np.uint8)
+    cache.put(key, img)
+    return int(cache.get(key)[0, 0])
+
+
+def test_shared_image_cache_multiprocess(tmpdir):
+    cache = SharedImageCache(tmpdir, max_bytes=1 << 20)
+    keys = [str(i % 8) for i in range(32)]
+    with multiprocessing.Pool(4) as pool:
+        assert pool.starmap(_put_and_get, [(cache, k) for k in keys]) == list(
+            map(int, keys)
+        )
+    # all the processes share the same images
+    assert len([f for f in os.listdir(tmpdir) if f.endswith(".npy")]) == 8
+    assert not [f for f in os.listdir(tmpdir) if f.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB"])
+def test_image_dataset_with_cache(tmpdir, monkeypatch, mode):
+    filepath = str(tmpdir / "img.png")
+    Image.new(mode="RGB", size=(4, 3), color=(10, 20, 30)).save(filepath)
+    transform = ToImageTensor(mode=mode)
+    cache = SharedImageCache(tmpdir / "cache", max_bytes=1000)
+    expected = ImageDataset([filepath], transform=transform)[0]["img"]
+
+    dataset = ImageDataset([filepath], transform=transform, img_cache=cache)
+    torch.testing.assert_close(dataset[0]["img"], expected)
+    # the image is not decoded again
+    monkeypatch.setattr(Image, "open", None)
+    torch.testing.assert_close(dataset[0]["img"], expected)
+
+
+def test_image_dataset_with_cache_augmentation(tmpdir):
+    filepath = str(tmpdir / "img.png")
+    Image.new(mode="L", size=(4, 3)).save(filepath)
+    calls = []
+
+    def random_transform(img):
+        calls.append(img.size)
+        return img
+
+    transform = ToImageTensor(random_transform=random_transform)
+    cache = SharedImageCache(tmpdir / "cache", max_bytes=1000)
+    dataset = ImageDataset([filepath], transform=transform, img_cache=cache)
+    dataset[0], dataset[0]
+    # the augmentation is applied after the cache lookup
+    assert calls == [(4, 3), (4, 3)]
+
+
+def test_image_dataset_with_cache_requires_split_transform(tmpdir):
+    cache = SharedImageCache(tmpdir, max_bytes=1000)
+    with pytest.raises(AssertionError, match="decode"):
+        ImageDataset(["foo.jpg"], transform=lambda x: x, img_cache=cache)
+
+
+def test_image_dataset_cache_key(tmpdir):
+    filepath = str(tmpdir / "img.png")
+    Image.new(mode="L", size=(40, 30), color=10).save(filepath)
+    cache = SharedImageCache(tmpdir / "cache", max_bytes=100_000)
+
+    def load(**kwargs):
+        return ImageDataset(
+            [filepath], transform=ToImageTensor(**kwargs), img_cache=cache
+        )[0]["img"]
+
+    def expected(**kwargs):
+        return ImageDataset([filepath], transform=ToImageTensor(**kwargs))[0]["img"]
+
+    # images decoded differently are cached separately
+    for kwargs in ({}, {"invert": False}, {"mode": "RGB"}, {"fixed_height": 15}):
+        torch.testing.assert_close(load(**kwargs), expected(**kwargs))
+    # modified images are decoded again
+    Image.new(mode="L", size=(20, 30), color=200).save(filepath)
+    os.utime(filepath, ns=(0, 0))
+    torch.testing.assert_close(load(), expected())
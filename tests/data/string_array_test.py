@@ -0,0 +1,50 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from laia.data import StringArray
+
+
+def test_empty():
+    array = StringArray()
+    assert len(array) == 0
+    assert list(array) == []
+    with pytest.raises(IndexError):
+        array[0]
+
+
+def test_getitem():
+    strings = ["foo", "", "bär", "ñ/ü.jpg"]
+    array = StringArray(strings)
+    assert len(array) == 4
+    assert [array[i] for i in range(4)] == strings
+    assert array[-1] == "ñ/ü.jpg"
+    assert array[1:3] == ["", "bär"]
+    with pytest.raises(IndexError):
+        array[4]
+    with pytest.raises(IndexError):
+        array[-5]
+
+
+def test_storage():
+    array = StringArray(["ab", "c", "dé"])
+    assert array.data.dtype == np.uint8
+    np.testing.assert_array_equal(array.offsets, [0, 2, 3, 6])
+
+
+def test_sequence():
+    array = StringArray(x for x in ["a", "b", "a"])
+    assert list(array) == ["a", "b", "a"]
+    assert "b" in array and "c" not in array
+    assert array.index("b") == 1
+    assert array.count("a") == 2
+    assert array == ["a", "b", "a"]
+    assert array == StringArray(["a", "b", "a"])
+    assert array != ["a", "b"]
+    assert array.tolist() == ["a", "b", "a"]
+
+
+def test_pickle():
+    array = StringArray(["foo", "bar"])
+    assert pickle.loads(pickle.dumps(array)) == array
@@ -1,6 +1,7 @@
 import pytest
 
 from laia.data import ImageDataset, TextImageDataset
+from laia.data.transforms.text import ToTensor
 
 
 def test_text_image_dataset_empty():
@@ -20,3 +21,25 @@ def test_image_dataset(transform, monkeypatch):
     assert len(dataset) == 1
     assert list(dataset[0].keys()) == ["img", "txt"]
     assert dataset[0]["txt"] == "bar" if transform is None else 1
+
+
+def test_image_dataset_encoded_txts(tmpdir, monkeypatch, caplog):
+    monkeypatch.setattr(ImageDataset, "__getitem__", lambda *_: {"img": None})
+    transform = ToTensor({"a": 0, "b": 1, "<space>": 2})
+    txts = ["a b", "b <space> a", "c a", ""]
+    expected = [[0, 1], [1, 2, 0], [None, 0], []]
+    dataset = TextImageDataset(
+        ["foo.jpg"] * len(txts), txts, txt_transform=transform, txt_cache_dir=tmpdir
+    )
+    assert [dataset[i]["txt"] for i in range(len(txts))] == expected
+    assert len(tmpdir.listdir()) == 1
+    # the cached encoding is reused
+    monkeypatch.setattr(ToTensor, "__call__", lambda *_: pytest.fail("Not cached"))
+    dataset = TextImageDataset(
+        ["foo.jpg"] * len(txts), txts, txt_transform=transform, txt_cache_dir=tmpdir
+    )
+    assert [dataset[i]["txt"] for i in range(len(txts))] == expected
+    assert (
+        "1 transcripts contain symbols missing from the symbols table"
+        in caplog.messages
+    )
@@ -6,7 +6,6 @@ from laia.data import ImageDataset, TextImageFromTextTableDataset
 from laia.data.text_image_from_text_table_dataset import (
     _get_images_and_texts_from_text_table,
     _load_text_table_from_file,
-    find_image_filepath_from_id,
 )
 
 
@@ -27,25 +26,6 @@ def test_text_image_from_text_table_dataset(tmpdir, monkeypatch):
     assert dataset[0]["txt"] == txt
 
 
-def test_find_image_filepath_from_id_not_found(tmpdir):
-    filepath = find_image_filepath_from_id(
-        "bar", tmpdir, img_extensions=[".jpg", ".png"]
-    )
-    assert filepath is None
-
-
-@pytest.mark.parametrize("id_has_ext", [False, True])
-def test_find_image_filepath_from_id(tmpdir, id_has_ext):
-    img_id = "foo.PNG" if id_has_ext else "foo"
-    img_dir = tmpdir.mkdir("dir")
-    expected = img_dir / "foo.PNG"
-    expected.write(None)
-    filepath = find_image_filepath_from_id(
-        img_id, img_dir, img_extensions=[".jpg", ".png"]
-    )
-    assert filepath == expected
-
-
 def test_load_text_table_from_file(tmpdir, caplog):
     data = [" 1  2 3 4 ", " ", " # this is a test", "foo bar", "baz  "]
     f = tmpdir / "test.txt"
@@ -125,3 +125,16 @@ def test_call_with_symbols_table(caplog):
     y = t(x)
     assert y == [0, 3, 1, 2, 0, None]
     assert caplog.messages.count('Could not find "ö" in the symbols table') == 1
+
+
+def test_cache_key():
+    syms = {"a": 0, "b": 1, "<space>": 2}
+    key = ToTensor(syms).cache_key
+    assert (
+        key
+        == ToTensor(SymbolsTable(from_dict={0: "a", 1: "b", 2: "<space>"})).cache_key
+    )
+    assert key == ToTensor(dict(reversed(syms.items())), reading_order="LTR").cache_key
+    assert key != ToTensor({**syms, "c": 3}).cache_key
+    assert key != ToTensor(syms, reading_order="RTL").cache_key
+    assert key != ToTensor(syms, space_token="<sp>").cache_key
@@ -0,0 +1,57 @@
+import pytest
+
+from laia.data.transforms.text import Tokenizer, tokenize
+from laia.utils import SymbolsTable
+
+
+def test_tokenize_longest_match():
+    tokenizer = Tokenizer(["<", "<loc>", "<location>", "a", "<space>"])
+    assert tokenizer.tokenize("a<location>a") == "a <location> a"
+    assert tokenizer.tokenize("a<loc>a") == "a <loc> a"
+    assert tokenizer.tokenize("<locat") == "< loc a t"
+    assert tokenizer.tokenize("a a") == "a <space> a"
+
+
+def test_tokenize_unknown_text():
+    tokenizer = Tokenizer(["a", "b"])
+    # the text between the symbols is kept as a single token
+    assert tokenizer.split("axyb c") == ["a", "xy", "b", " c"]
+    assert tokenizer.tokenize("xy") == "xy"
+    assert tokenizer.tokenize("") == ""
+
+
+def test_tokenize_without_symbols():
+    tokenizer = Tokenizer()
+    assert tokenizer.tokenize("ab c") == "a b <space> c"
+
+
+@pytest.mark.parametrize(
+    "symbols",
+    [
+        ["a", "b", "<space>"],
+        {"a": 0, "b": 1, "<space>": 2},
+        SymbolsTable(from_dict={0: "a", 1: "b", 2: "<space>"}),
+    ],
+)
+def test_symbols(symbols):
+    assert Tokenizer(symbols).tokenize("ab ba") == "a b <space> b a"
+
+
+def test_space_tokens():
+    tokenizer = Tokenizer(["a", "<dash>"], space_token="<dash>", space_display="-")
+    assert tokenizer.tokenize("a-a") == "a <dash> a"
+    assert tokenizer.untokenize("a <dash> a") == "a-a"
+
+
+def test_batch():
+    tokenizer = Tokenizer(["a", "b", "<space>"])
+    sentences = ["ab", "b a", ""]
+    tokenized = tokenizer.tokenize_batch(sentences)
+    assert tokenized == ["a b", "b <space> a", ""]
+    assert tokenizer.untokenize_batch(tokenized) == sentences
+
+
+def test_same_as_tokenize():
+    symbols = {"I", "l", "o", "v", "e", "P", "a", "r", "i", "s", "<space>"}
+    sentence = "I love <location>Paris"
+    assert Tokenizer(symbols).tokenize(sentence) == tokenize(sentence, symbols=symbols)
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+import torch
+from PIL import Image, ImageFilter
+
+from laia.data import PaddedTensor
+from laia.data.transforms.vision import (
+    BatchDilate,
+    BatchErode,
+    BatchRandomBetaAffine,
+    BatchRandomBetaPerspective,
+)
+from laia.data.transforms.vision.batch_random_beta import get_mask, warp
+
+
+def _random_batch(sizes, seed=0):
+    rng = np.random.default_rng(seed)
+    h, w = max(s[0] for s in sizes), max(s[1] for s in sizes)
+    imgs = [rng.integers(0, 256, size=s, dtype=np.uint8) for s in sizes]
+    data = torch.zeros(len(sizes), 1, h, w)
+    for i, img in enumerate(imgs):
+        data[i, 0, : img.shape[0], : img.shape[1]] = torch.from_numpy(img)
+    return imgs, PaddedTensor(data, torch.tensor(sizes))
+
+
+def test_get_mask():
+    mask = get_mask(torch.tensor([[1, 2], [2, 1]]), 2, 3)
+    assert mask.size() == (2, 1, 2, 3)
+    torch.testing.assert_close(
+        mask.squeeze(1),
+        torch.tensor(
+            [[[1, 1, 0], [0, 0, 0]], [[1, 0, 0], [1, 0, 0]]], dtype=torch.bool
+        ),
+    )
+
+
+def test_warp_identity():
+    imgs, x = _random_batch([(5, 7), (3, 4)])
+    out = warp(x.data, x.sizes, np.tile(np.eye(3), (2, 1, 1)))
+    torch.testing.assert_close(out, x.data)
+
+
+@pytest.mark.parametrize(
+    ["cls", "method"],
+    [
+        (BatchRandomBetaAffine, Image.AFFINE),
+        (BatchRandomBetaPerspective, Image.PERSPECTIVE),
+    ],
+)
+def test_geometric_transform_matches_pil(cls, method):
+    imgs, x = _random_batch([(40, 60), (30, 50)])
+    transform = cls(seed=1)
+    src, dst = transform.sample_points(x.sizes.numpy())
+    matrix = transform.get_matrix(src, dst)
+    out = warp(x.data, x.sizes, matrix)
+    for i, img in enumerate(imgs):
+        h, w = img.shape
+        expected = Image.fromarray(img).transform(
+            (w, h), method, matrix[i].flatten()[:-1], Image.BILINEAR
+        )
+        diff = (out[i, 0, :h, :w] - torch.tensor(np.asarray(expected))).abs()
+        # only the rounding of PIL and the borders of the images differ
+        assert diff.median() < 1
+        # the padding of the batch is kept empty
+        assert not out[i, 0, h:].any() and not out[i, 0, :, w:].any()
+
+
+@pytest.mark.parametrize(
+    ["cls", "pil_filter"],
+    [(BatchDilate, ImageFilter.MaxFilter), (BatchErode, ImageFilter.MinFilter)],
+)
+def test_morphology_matches_pil(cls, pil_filter):
+    imgs, x = _random_batch([(20, 30), (12, 17), (20, 9)])
+    transform = cls(seed=2)
+    filter_sizes = transform.rng.choice(
+        transform.filter_sizes, p=transform.filter_probs, size=len(imgs)
+    )
+    mask = get_mask(x.sizes, x.data.size(2), x.data.size(3))
+    out = transform.apply(x.data, mask, filter_sizes)
+    for i, (img, filter_size) in enumerate(zip(imgs, filter_sizes)):
+        h, w = img.shape
+        expected = Image.fromarray(img).filter(pil_filter(filter_size))
+        torch.testing.assert_close(
+            out[i, 0, :h, :w], torch.tensor(np.asarray(expected)).float()
+        )
+        assert not out[i, 0, h:].any() and not out[i, 0, :, w:].any()
+
+
+@pytest.mark.parametrize(
+    "cls", [BatchRandomBetaAffine, BatchRandomBetaPerspective, BatchDilate, BatchErode]
+)
+def test_reproducible(cls):
+    _, x = _random_batch([(20, 30), (12, 17)])
+    a, b = cls(seed=3)(x), cls(seed=3)(x)
+    assert isinstance(a, PaddedTensor)
+    assert a.sizes is x.sizes
+    torch.testing.assert_close(a.data, b.data)
+    assert not torch.equal(a.data, cls(seed=4)(x).data)
+
+
+def test_tensor_input():
+    x = torch.rand(2, 3, 10, 20, dtype=torch.float64)
+    out = BatchRandomBetaAffine(seed=0)(x)
+    assert isinstance(out, torch.Tensor)
+    assert out.size() == x.size()
+    assert out.dtype == x.dtype
+
+
+def test_repr():
+    assert (
+        repr(BatchRandomBetaAffine(seed=1))
+        == "vision.BatchRandomBetaAffine(max_offset_ratio=0.2, alpha=2, beta=2, seed=1)"
+    )
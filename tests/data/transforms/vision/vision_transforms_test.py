@@ -3,7 +3,7 @@ import math
 import numpy as np
 import pytest
 import torch
-from PIL import Image
+from PIL import Image, ImageOps
 
 from laia.data.transforms.vision import Convert, Invert, ToImageTensor
 
@@ -19,6 +19,20 @@ def test_invert():
     assert y.min() == 255
 
 
+@pytest.mark.parametrize("mode", ["L", "RGB", "RGBA"])
+def test_invert_modes(mode):
+    x = np.random.randint(0, 256, size=(4, 5, len(mode)), dtype=np.uint8)
+    x = Image.fromarray(x.squeeze(-1) if mode == "L" else x)
+    y = np.asarray(Invert()(x))
+    assert y.shape == np.asarray(x).shape
+    if mode == "RGBA":
+        # the alpha channel is kept
+        np.testing.assert_array_equal(y[..., 3], np.asarray(x)[..., 3])
+        y = y[..., :3]
+        x = x.convert("RGB")
+    np.testing.assert_array_equal(y, np.asarray(ImageOps.invert(x)))
+
+
 def test_convert_greyscale():
     t = Convert(mode="L")
     x = Image.new("RGB", (30, 40), color=(127, 127, 127))
@@ -77,6 +91,51 @@ def test_resize_transform(w, h, fw, fh):
     assert out.size == (fw, fh)
 
 
+@pytest.mark.parametrize("w", [5, 6, 11, 12])
+@pytest.mark.parametrize("h", [5, 6, 11, 12])
+@pytest.mark.parametrize("fh", [None, 2, 3, 10, 11])
+@pytest.mark.parametrize("fw", [None, 2, 3, 10, 11])
+def test_get_resized_size(w, h, fw, fh):
+    if fw is None and fh is None:
+        return
+    img = Image.new("L", size=(w, h))
+    nw, nh = ToImageTensor.get_resized_size((w, h), fw=fw, fh=fh)
+    ew, eh = ToImageTensor.resize_transform(img, fw=fw, fh=fh).size
+    assert abs(nw - ew) <= 1 and abs(nh - eh) <= 1
+
+
+@pytest.mark.parametrize(
+    ["fw", "fh", "expected_size"],
+    [(None, 16, (200, 25)), (None, 60, (400, 50)), (100, 12, (100, 13))],
+)
+def test_draft(tmpdir, fw, fh, expected_size):
+    Image.new("L", size=(400, 50), color=128).save(tmpdir / "img.jpg")
+    img = Image.open(tmpdir / "img.jpg")
+    ToImageTensor.draft(img, fw=fw, fh=fh)
+    img.load()
+    # the image is decoded at the smallest scale larger than its resized size
+    assert img.size == expected_size
+
+
+def test_draft_not_jpeg(tmpdir):
+    Image.new("L", size=(400, 50)).save(tmpdir / "img.png")
+    img = Image.open(tmpdir / "img.png")
+    ToImageTensor.draft(img, fh=10)
+    assert img.size == (400, 50)
+
+
+def test_to_image_tensor_draft(tmpdir):
+    x = np.random.default_rng(0).integers(0, 256, size=(5, 40), dtype=np.uint8)
+    img = Image.fromarray(x).resize((1600, 200), resample=Image.Resampling.BILINEAR)
+    img.save(tmpdir / "img.jpg")
+    transform = ToImageTensor(fixed_height=20)
+    out = transform(Image.open(tmpdir / "img.jpg"))
+    assert out.size() == (1, 20, 160)
+    full = transform.finalize(transform.decode(Image.open(tmpdir / "img.jpg").copy()))
+    assert out.size() == full.size()
+    assert (out - full).abs().mean() < 0.01
+
+
 @pytest.mark.parametrize("w", [5, 6, 11, 12])
 @pytest.mark.parametrize("h", [5, 6, 11, 12])
 @pytest.mark.parametrize("mw", [2, 3, 10, 11])
@@ -137,3 +196,14 @@ def test_to_image_tensor():
         "  ToTensor()\n"
         ")"
     )
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB"])
+def test_to_image_tensor_as_uint8(mode):
+    img = Image.fromarray(np.random.randint(0, 256, size=(10, 20, 3), dtype=np.uint8))
+    kwargs = {"mode": mode, "min_width": 30, "min_height": 12}
+    x = ToImageTensor(**kwargs)(img)
+    y = ToImageTensor(as_uint8=True, **kwargs)(img)
+    assert y.dtype == torch.uint8
+    assert y.size() == x.size() == (len(mode), 12, 30)
+    torch.testing.assert_close(y.float() / 255, x)
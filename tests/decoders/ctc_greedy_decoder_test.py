@@ -3,6 +3,7 @@ import unittest
 import torch
 
 from laia.decoders import CTCGreedyDecoder
+from laia.nn import PaddedSequence
 
 
 class CTCGreedyDecoderTest(unittest.TestCase):
@@ -121,6 +122,14 @@ class CTCGreedyDecoderTest(unittest.TestCase):
         r = torch.tensor([p.mean() for p in r["prob-segmentation"]])
         torch.testing.assert_close(r, e)
 
+    def test_padded_sequence(self):
+        x = torch.tensor(
+            [[[1.0, 3.0, -1.0]], [[1.0, 2.0, 3.0]], [[1.0, -2.0, 3.0]]]
+        ).expand(3, 2, 3)
+        decoder = CTCGreedyDecoder()
+        r = decoder(PaddedSequence(x, torch.tensor([3, 1])))
+        self.assertEqual([[1, 2], [1]], r["hyp"])
+
     def test_segmentation_empty(self):
         s = CTCGreedyDecoder.compute_segmentation([])
         e = []
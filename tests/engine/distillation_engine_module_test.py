@@ -0,0 +1,60 @@
+from unittest import mock
+
+import torch
+
+from laia.dummies import DummyModel
+from laia.engine import DistillationEngineModule
+from laia.engine.feeder import ItemFeeder
+from laia.losses import DistillationLoss
+from laia.nn import PaddedSequence
+
+
+def test_get_loss_kwargs():
+    calls = []
+
+    def teacher(batch, batch_x):
+        calls.append((batch, batch_x))
+        return PaddedSequence(torch.randn(4, 2, 3), torch.tensor([4, 3]))
+
+    module = DistillationEngineModule(
+        DummyModel((3, 3), 3),
+        [],
+        teacher=teacher,
+        alpha=0.3,
+        temperature=2.0,
+        batch_id_fn=ItemFeeder("id"),
+    )
+    assert isinstance(module.criterion, DistillationLoss)
+    assert module.criterion.alpha == 0.3 and module.criterion.temperature == 2.0
+    assert "teacher" not in module.hparams
+    batch = {"id": ["a", "b"]}
+    kwargs = module.get_loss_kwargs(batch, batch_x="x")
+    assert kwargs["batch_ids"] == ["a", "b"]
+    assert kwargs["teacher"].lengths.tolist() == [4, 3]
+    assert calls == [(batch, "x")]
+    # the teacher is not used in validation
+    module.eval()
+    assert module.get_loss_kwargs(batch) == {"batch_ids": ["a", "b"]}
+    assert len(calls) == 1
+
+
+def test_teacher_sees_augmented_input():
+    calls = []
+
+    def teacher(batch, batch_x):
+        calls.append(batch_x)
+        return PaddedSequence(torch.randn(3, 2, 3), torch.tensor([3, 3]))
+
+    module = DistillationEngineModule(
+        DummyModel((3, 3), 3),
+        [],
+        teacher=teacher,
+        batch_input_fn=ItemFeeder("img"),
+        batch_target_fn=ItemFeeder("txt"),
+        batch_augmentation=lambda x: x + 1,
+    )
+    batch = {"img": torch.zeros(2, 1, 3, 3), "txt": [[1], [2]]}
+    with mock.patch.object(module, "log"):
+        module.training_step(batch)
+    assert len(calls) == 1
+    torch.testing.assert_close(calls[0], torch.ones(2, 1, 3, 3))
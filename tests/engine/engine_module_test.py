@@ -4,9 +4,11 @@ import pytest
 import torch
 
 from laia.common.arguments import OptimizerArgs, SchedulerArgs
+from laia.data import PaddedTensor
 from laia.dummies import DummyMNIST, DummyModel, DummyTrainer
 from laia.engine import EngineModule
 from laia.engine.engine_exception import EngineException
+from laia.engine.engine_module import uint8_to_float
 from laia.losses import CTCLoss
 
 
@@ -77,3 +79,46 @@ def test_can_train(tmpdir):
     module = EngineModule(model, CTCLoss())
     trainer = DummyTrainer(default_root_dir=tmpdir)
     trainer.fit(module, datamodule=DummyMNIST())
+
+
+@pytest.mark.parametrize("padded", [False, True])
+def test_uint8_to_float(padded):
+    x = torch.tensor([[0, 51], [255, 102]], dtype=torch.uint8)
+    xs = torch.tensor([[2, 2]])
+    out = uint8_to_float(PaddedTensor(x, xs) if padded else x)
+    if padded:
+        assert out.sizes is xs
+        out = out.data
+    torch.testing.assert_close(out, torch.tensor([[0.0, 0.2], [1.0, 0.4]]))
+    # float inputs are not modified
+    y = torch.rand(2, 2)
+    assert uint8_to_float(y) is y
+
+
+def test_model_receives_float_images(monkeypatch):
+    model = DummyModel((3, 3), 10)
+    module = EngineModule(
+        model,
+        CTCLoss(),
+        batch_input_fn=lambda b: b["img"],
+        batch_target_fn=lambda b: b["txt"],
+    )
+    monkeypatch.setattr(module, "log", lambda *_, **__: None)
+    inputs = []
+    model.register_forward_hook(lambda m, i, o: inputs.append(i[0]))
+    img = torch.full((1, 1, 3, 3), 255, dtype=torch.uint8)
+    with torch.no_grad():
+        module.validation_step({"img": img, "txt": [[1]]})
+    assert inputs[-1].dtype == torch.float32
+    torch.testing.assert_close(inputs[-1], torch.ones(1, 1, 3, 3))
+
+
+def test_compile_model():
+    model = DummyModel((3, 3), 10)
+    state = model.state_dict()
+    module = EngineModule(model, CTCLoss(), compile_model=True)
+    assert module.model is model
+    # the model is compiled in place, so its parameter names are unchanged
+    assert list(module.state_dict()) == [f"model.{k}" for k in state]
+    # the compilation itself happens in the first call
+    assert model._compiled_call_impl is not None
@@ -0,0 +1,113 @@
+import pytest
+import pytorch_lightning as pl
+import torch
+from PIL import Image
+from torch.nn.utils.rnn import pad_packed_sequence
+
+from laia.data import PaddedTensor
+from laia.engine import (
+    Compose,
+    DataModule,
+    EvaluatorModule,
+    ExportedModelRuntime,
+    ImageFeeder,
+    ItemFeeder,
+)
+from laia.engine.engine_module import uint8_to_float
+from laia.models.htr import LaiaCRNN, optimize_for_inference
+from laia.models.htr.exportable_crnn import export_onnx, export_torchscript
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    model = LaiaCRNN(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=[2, 2],
+        cnn_dropout=[0, 0],
+        cnn_batchnorm=[True, True],
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.5,
+        lin_dropout=0.5,
+    )
+    return optimize_for_inference(model)
+
+
+@pytest.fixture(params=["pt", "onnx"])
+def exported_model(request, tmpdir, model):
+    if request.param == "onnx":
+        pytest.importorskip("onnxruntime")
+        return export_onnx(model, str(tmpdir / "model.onnx"))
+    return export_torchscript(model, str(tmpdir / "model.pt"))
+
+
+def test_call(model, exported_model):
+    runtime = ExportedModelRuntime(exported_model)
+    assert runtime.metadata["min_valid_size"] == 4
+    assert runtime.get_min_valid_image_size(100) == 4
+    x = torch.randint(256, size=(3, 1, 20, 40), dtype=torch.uint8)
+    xs = torch.tensor([[20, 40], [18, 30], [20, 9]])
+    expected, expected_lengths = pad_packed_sequence(
+        model(uint8_to_float(PaddedTensor(x, xs)))
+    )
+    y, ys = pad_packed_sequence(runtime(PaddedTensor(x, xs)))
+    torch.testing.assert_close(ys, expected_lengths)
+    torch.testing.assert_close(y, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_get_min_valid_image_size_raises(exported_model):
+    runtime = ExportedModelRuntime(exported_model)
+    with pytest.raises(ValueError, match="Images of size 3 pixels"):
+        runtime.get_min_valid_image_size(3)
+
+
+class OutputsRecorder(pl.Callback):
+    def __init__(self):
+        self.ids, self.outputs = [], []
+
+    def on_test_batch_end(self, trainer, pl_module, outputs, batch, *args):
+        self.ids.extend(pl_module.batch_id_fn(batch))
+        x, xs = pad_packed_sequence(outputs)
+        self.outputs.extend(x[: xs[i], i] for i in range(len(xs)))
+
+
+def test_test(tmpdir, model, exported_model):
+    for i, width in enumerate((30, 50, 40, 60, 20)):
+        Image.new(mode="L", size=(width, 16), color=i * 50).save(
+            str(tmpdir / f"img-{i}.png")
+        )
+    img_list = tmpdir / "img_list"
+    img_list.write_text("\n".join(f"img-{i}" for i in range(5)), "utf-8")
+    data_module = DataModule(
+        img_dirs=[str(tmpdir)],
+        te_img_list=str(img_list),
+        batch_size=2,
+        stage="test",
+        num_workers=1,
+        uint8_pipeline=True,
+    )
+    batch_input_fn = Compose([ItemFeeder("img"), ImageFeeder()])
+    runtime = ExportedModelRuntime(
+        exported_model, batch_input_fn=batch_input_fn, batch_id_fn=ItemFeeder("id")
+    )
+    recorder = OutputsRecorder()
+    runtime.test(data_module, [recorder])
+    assert sorted(recorder.ids) == [f"img-{i}" for i in range(5)]
+
+    # same outputs as the evaluator module
+    evaluator_module = EvaluatorModule(model, batch_input_fn=batch_input_fn)
+    data_module.setup(stage="test")
+    expected = {}
+    for batch in data_module.test_dataloader():
+        x, xs = pad_packed_sequence(evaluator_module.test_step(batch))
+        expected.update((id, x[: xs[i], i]) for i, id in enumerate(batch["id"]))
+    for id, output in zip(recorder.ids, recorder.outputs):
+        torch.testing.assert_close(output, expected[id], rtol=1e-4, atol=1e-5)
@@ -0,0 +1,137 @@
+import pytest
+import torch
+from torch.nn.utils.rnn import pad_packed_sequence
+
+from laia.data import PaddedTensor
+from laia.dummies import DummyModel
+from laia.engine import EvaluatorModule, SlidingWindow
+from laia.models.htr import LaiaCRNN, optimize_for_inference
+
+
+def crnn(**kwargs):
+    torch.manual_seed(0)
+    default = dict(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16, 16],
+        cnn_kernel_size=[3, 3, 3],
+        cnn_stride=[1, 1, 1],
+        cnn_dilation=[1, 1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 3,
+        cnn_poolsize=[2, 2, 0],
+        cnn_dropout=[0.0] * 3,
+        cnn_batchnorm=[True] * 3,
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.0,
+        lin_dropout=0.0,
+    )
+    default.update(kwargs)
+    return optimize_for_inference(LaiaCRNN(**default))
+
+
+def padded_batch(sizes):
+    torch.manual_seed(1)
+    height, width = map(max, zip(*sizes))
+    x = torch.zeros(len(sizes), 1, height, width)
+    for i, (h, w) in enumerate(sizes):
+        x[i, :, :h, :w] = torch.rand(1, h, w)
+    return PaddedTensor(x, torch.tensor(sizes))
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "expected"],
+    [
+        ({}, (4, 1 + 2 + 1 + 2 * 2 + 2 + 2 * 4)),
+        (
+            {"cnn_stride": [2, 1, 1], "cnn_poolsize": [0, 2, 0]},
+            (4, 1 + 2 + 2 * 2 + 2 + 2 * 4),
+        ),
+        ({"cnn_dilation": [1, 2, 1]}, (4, 1 + 2 + 1 + 2 * 2 * 2 + 2 + 2 * 4)),
+    ],
+)
+def test_get_width_geometry(kwargs, expected):
+    model = crnn(**kwargs)
+    assert SlidingWindow.get_width_geometry(list(model.conv)) == expected
+
+
+@pytest.mark.parametrize("width", [100, 257, 400, 1001])
+def test_get_windows(width):
+    sliding_window = SlidingWindow(crnn(), 120, context=4)
+    windows = sliding_window.get_windows(width)
+    num_frames = sliding_window.get_output_width(width)
+    frames = []
+    for start, end, a, b in windows:
+        assert start % sliding_window.factor == 0
+        assert end - start <= 120 + sliding_window.factor
+        assert 0 <= a < b <= sliding_window.get_output_width(end - start)
+        offset = start // sliding_window.factor
+        frames.extend(range(offset + a, offset + b))
+    # the kept frames cover each frame of the image once
+    assert frames == list(range(num_frames))
+
+
+def test_call_narrow_images():
+    model = crnn()
+    x = padded_batch([[16, 80], [12, 60]])
+    sliding_window = SlidingWindow(model, 120, context=4)
+    torch.testing.assert_close(
+        pad_packed_sequence(sliding_window(x)), pad_packed_sequence(model(x))
+    )
+    torch.testing.assert_close(sliding_window(x.data), model(x.data))
+
+
+def test_call():
+    model = crnn()
+    x = padded_batch([[16, 1000], [12, 700], [16, 90]])
+    sliding_window = SlidingWindow(model, 400, context=16)
+    with torch.no_grad():
+        expected, expected_lengths = pad_packed_sequence(model(x))
+        y, lengths = pad_packed_sequence(sliding_window(x))
+    torch.testing.assert_close(lengths, expected_lengths)
+    y, expected = y.log_softmax(-1), expected.log_softmax(-1)
+    # the convolutional features are the same, only the context of the
+    # recurrent layers is shorter
+    margin = sliding_window.margin
+    torch.testing.assert_close(y[:-margin], expected[:-margin], rtol=0, atol=1e-4)
+    torch.testing.assert_close(y[:, 1:], expected[:, 1:], rtol=0, atol=1e-4)
+    # the last frames of the widest image are computed from the zero padding
+    # of the windows batch instead of the zero padding of the convolutions
+    torch.testing.assert_close(y, expected, rtol=0, atol=1e-2)
+
+
+def test_call_unpadded():
+    model = crnn()
+    x = torch.rand(2, 1, 16, 500)
+    with torch.no_grad():
+        expected = model(x)
+        y, lengths = pad_packed_sequence(SlidingWindow(model, 200, context=4)(x))
+    assert lengths.tolist() == [expected.size(0)] * 2
+    torch.testing.assert_close(
+        y.log_softmax(-1), expected.log_softmax(-1), rtol=0, atol=1e-2
+    )
+
+
+def test_raises():
+    with pytest.raises(ValueError, match="requires a model with convolutional"):
+        SlidingWindow(DummyModel((3, 3), 12), 100)
+    with pytest.raises(ValueError, match="not supported for vertical text"):
+        SlidingWindow(crnn(vertical_text=True), 100)
+    with pytest.raises(ValueError, match="Windows of 100 pixels are too narrow"):
+        SlidingWindow(crnn(), 100, context=10)
+
+
+def test_evaluator_module():
+    model = crnn()
+    x = padded_batch([[16, 1000], [12, 700]])
+    evaluator_module = EvaluatorModule(
+        model, batch_input_fn=lambda batch: batch, chunk_width=200, chunk_context=4
+    )
+    assert evaluator_module.sliding_window.width == 200
+    with torch.no_grad():
+        y = evaluator_module.test_step(x)
+    torch.testing.assert_close(
+        pad_packed_sequence(y), pad_packed_sequence(evaluator_module.sliding_window(x))
+    )
+    assert EvaluatorModule(model).sliding_window is None
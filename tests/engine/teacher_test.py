@@ -0,0 +1,71 @@
+import pytest
+import torch
+from torch.nn.utils.rnn import pad_packed_sequence
+
+from laia.data import PaddedTensor
+from laia.engine import ArchiveTeacher, ModelTeacher
+from laia.engine.feeder import ItemFeeder
+from laia.models.htr import LaiaCRNN
+from laia.utils import ArchiveMatrixWriter
+
+
+def crnn():
+    torch.manual_seed(0)
+    return LaiaCRNN(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=[2, 2],
+        cnn_dropout=[0.5, 0.5],
+        cnn_batchnorm=[False, False],
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=1,
+        rnn_dropout=0.0,
+        lin_dropout=0.5,
+    )
+
+
+def test_model_teacher():
+    model = crnn()
+    x = torch.randint(256, (2, 1, 16, 40), dtype=torch.uint8)
+    batch = {"img": PaddedTensor(x, torch.tensor([[16, 40], [16, 24]]))}
+    teacher = ModelTeacher(model, batch_input_fn=ItemFeeder("img"))
+    y, ys = teacher(batch)
+    assert not model.training
+    assert not any(p.requires_grad for p in model.parameters())
+    expected, expected_lengths = pad_packed_sequence(
+        model(PaddedTensor(x.float() / 255, batch["img"].sizes))
+    )
+    torch.testing.assert_close(ys, expected_lengths)
+    torch.testing.assert_close(y, expected)
+    assert not y.requires_grad
+    # the input of the student, e.g. augmented, is used if given
+    batch_x = PaddedTensor(torch.rand(2, 1, 16, 40), batch["img"].sizes)
+    y, _ = teacher(batch, batch_x)
+    torch.testing.assert_close(y, pad_packed_sequence(model(batch_x))[0])
+
+
+def test_archive_teacher(tmpdir):
+    matrices = {
+        "a": torch.randn(5, 4),
+        "b": torch.randn(3, 4).log_softmax(-1),
+        "c": torch.randn(7, 4).softmax(-1),
+    }
+    ArchiveMatrixWriter(tmpdir / "matrix").write_iterable(matrices.items())
+    teacher = ArchiveTeacher(tmpdir / "matrix", batch_id_fn=ItemFeeder("id"))
+    y, ys = teacher({"id": ["c", "a", "b"]})
+    assert ys.tolist() == [7, 5, 3]
+    assert y.size() == (7, 3, 4)
+    torch.testing.assert_close(y[:, 0], matrices["c"].log())
+    torch.testing.assert_close(y[:5, 1], matrices["a"])
+    torch.testing.assert_close(y[:3, 2], matrices["b"])
+    with pytest.raises(KeyError, match="The teacher output for d is not in"):
+        teacher({"id": ["d"]})
+    ArchiveTeacher(tmpdir / "matrix", batch_id_fn=ItemFeeder("id"), num_labels=4)
+    with pytest.raises(AssertionError, match="matrices of width 4, but the"):
+        ArchiveTeacher(tmpdir / "matrix", batch_id_fn=ItemFeeder("id"), num_labels=5)
@@ -3,6 +3,7 @@ import torch
 from torch.nn.functional import log_softmax
 
 from laia.losses.ctc_loss import CTCLoss, get_valids_and_errors, transform_batch
+from laia.nn import PaddedSequence
 
 
 def test_transform_batch():
@@ -23,6 +24,10 @@ def test_transform_batch():
     torch.testing.assert_close(x_out, x)
     assert xs_out.tolist() == xs
 
+    x_out, xs_out = transform_batch(PaddedSequence(x, torch.tensor([2, 3, 1])))
+    torch.testing.assert_close(x_out, x)
+    assert xs_out.tolist() == [2, 3, 1]
+
 
 def test_get_valids_and_errors():
     xs = [4, 4, 4, 5]
@@ -117,6 +122,10 @@ def test_forward(caplog, dtype, device, average_frames, reduction):
         )
         == 1
     )
+    # padded sequences and their lengths, e.g. from LaiaCRNN(padded_rnn=True)
+    lengths = torch.tensor([4, 4, 4], device=device)
+    loss = ctc(PaddedSequence(x, lengths), y, batch_ids=["ID1", "ID2", "ID3"])
+    torch.testing.assert_close(expected.cpu(), loss.cpu())
 
 
 @pytest.mark.parametrize(
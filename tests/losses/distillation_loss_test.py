@@ -0,0 +1,72 @@
+import pytest
+import torch
+
+from laia.losses import CTCLoss, DistillationLoss
+from laia.losses.distillation_loss import resample_frames
+from laia.nn import PaddedSequence
+
+
+def test_resample_frames():
+    x = torch.tensor([[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 0.0]]).t().unsqueeze(2)
+    y = resample_frames(x, [4, 3], [2, 3])
+    assert y.size() == (3, 2, 1)
+    torch.testing.assert_close(y[:, 0, 0], torch.tensor([1.5, 3.5, 0.0]))
+    torch.testing.assert_close(y[:, 1, 0], torch.tensor([5.0, 6.0, 7.0]))
+    y = resample_frames(x, torch.tensor([4, 3]), torch.tensor([8, 1]))
+    torch.testing.assert_close(
+        y[:, 0, 0], torch.tensor([1.0, 1.25, 1.75, 2.25, 2.75, 3.25, 3.75, 4.0])
+    )
+    torch.testing.assert_close(y[:1, 1, 0], torch.tensor([6.0]))
+
+
+def test_resample_frames_posteriors():
+    x = torch.randn(10, 3, 6).softmax(-1)
+    for lengths in ([5, 7, 3], [20, 13, 11]):
+        y = resample_frames(x, [10, 9, 4], lengths)
+        for n, length in enumerate(lengths):
+            torch.testing.assert_close(y[:length, n].sum(-1), torch.ones(length))
+            assert not y[length:, n].any()
+
+
+def test_forward_without_teacher():
+    x = torch.randn(8, 2, 5, requires_grad=True)
+    y = [[1, 2], [3]]
+    torch.testing.assert_close(DistillationLoss()(x, y), CTCLoss()(x, y))
+
+
+@pytest.mark.parametrize("temperature", [1.0, 2.0])
+def test_forward(temperature):
+    torch.manual_seed(0)
+    x = torch.randn(8, 2, 5, requires_grad=True)
+    y = [[1, 2], [3]]
+    xs = torch.tensor([8, 6])
+    student = PaddedSequence(x, xs)
+    loss = DistillationLoss(alpha=0.25, temperature=temperature)
+    # the KL divergence to the student itself is zero
+    teacher = PaddedSequence(x.detach().log_softmax(-1), xs)
+    torch.testing.assert_close(
+        loss(student, y, teacher=teacher), 0.75 * CTCLoss()(student, y)
+    )
+    # the teacher frames are resampled to the student lengths
+    teacher = PaddedSequence(torch.randn(16, 2, 5), torch.tensor([16, 12]))
+    kl = loss.kl_divergence(student, teacher)
+    assert kl > 0
+    expected = torch.stack(
+        [
+            torch.nn.functional.kl_div(
+                (x[: xs[n], n] / temperature).log_softmax(-1),
+                resample_frames(
+                    (teacher.data / temperature).softmax(-1), teacher.lengths, xs
+                )[: xs[n], n],
+                reduction="sum",
+            )
+            for n in range(2)
+        ]
+    ).mean()
+    torch.testing.assert_close(kl, expected)
+    value = loss(student, y, teacher=teacher)
+    torch.testing.assert_close(
+        value, 0.75 * CTCLoss()(student, y) + 0.25 * temperature**2 * expected
+    )
+    (dx,) = torch.autograd.grad([value], [x])
+    assert dx[:6, 1].any() and not dx[6:, 1].any()
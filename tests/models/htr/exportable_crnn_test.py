@@ -0,0 +1,138 @@
+import json
+
+import pytest
+import torch
+from torch.nn.utils.rnn import pad_packed_sequence
+
+from laia.data import PaddedTensor
+from laia.models.htr import ExportableCRNN, LaiaCRNN
+from laia.models.htr.exportable_crnn import (
+    METADATA_FILENAME,
+    adaptive_avg_pool_height,
+    adaptive_max_pool_height,
+    export_onnx,
+    export_torchscript,
+)
+
+
+def get_model(image_sequencer, **kwargs):
+    torch.manual_seed(0)
+    model = LaiaCRNN(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=[2, 2],
+        cnn_dropout=[0, 0],
+        cnn_batchnorm=[False, False],
+        image_sequencer=image_sequencer,
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.5,
+        lin_dropout=0.5,
+        **kwargs,
+    )
+    return model.eval()
+
+
+def get_batch(n, h, w):
+    x = torch.rand(n, 1, h, w)
+    widths = torch.randint(8, w + 1, (n,))
+    widths[0] = w
+    # the padded batches of LaiaCRNN are sorted by decreasing width
+    widths = widths.sort(descending=True)[0]
+    return x, widths
+
+
+def get_expected(model, x, widths):
+    sizes = torch.stack([torch.full_like(widths, x.size(2)), widths], dim=1)
+    with torch.no_grad():
+        return pad_packed_sequence(model(PaddedTensor(x, sizes)))
+
+
+def assert_close_to_expected(y, ys, expected, expected_lengths):
+    torch.testing.assert_close(ys, expected_lengths)
+    for i, length in enumerate(expected_lengths):
+        torch.testing.assert_close(
+            y[:length, i], expected[:length, i], rtol=1e-4, atol=1e-5
+        )
+
+
+@pytest.mark.parametrize("height", [1, 4, 7, 16, 23, 64])
+@pytest.mark.parametrize("output_size", [1, 3, 4, 16])
+def test_adaptive_pool_height(height, output_size):
+    x = torch.randn(2, 3, height, 5)
+    torch.testing.assert_close(
+        adaptive_avg_pool_height(x, output_size),
+        torch.nn.functional.adaptive_avg_pool2d(x, (output_size, 5)),
+    )
+    torch.testing.assert_close(
+        adaptive_max_pool_height(x, output_size),
+        torch.nn.functional.adaptive_max_pool2d(x, (output_size, 5)),
+    )
+
+
+def test_exportable_crnn_raises_on_vertical_text():
+    with pytest.raises(ValueError, match="vertical text cannot be exported"):
+        ExportableCRNN(get_model("avgpool-4", vertical_text=True))
+
+
+@pytest.mark.parametrize(
+    ["image_sequencer", "metadata"],
+    [
+        ("avgpool-4", {"input_height": None}),
+        ("maxpool-3", {"input_height": None}),
+        ("none-5", {"input_height": 20}),
+    ],
+)
+def test_exportable_crnn(image_sequencer, metadata):
+    model = get_model(image_sequencer)
+    exportable = ExportableCRNN(model)
+    assert exportable.metadata == {
+        "num_input_channels": 1,
+        "min_valid_size": 4,
+        **metadata,
+    }
+    x, widths = get_batch(3, metadata["input_height"] or 37, 50)
+    with torch.no_grad():
+        y, ys = exportable(x, widths)
+    assert_close_to_expected(y, ys, *get_expected(model, x, widths))
+
+
+@pytest.mark.parametrize("image_sequencer", ["avgpool-4", "maxpool-3", "none-5"])
+def test_export_torchscript(tmpdir, image_sequencer):
+    model = get_model(image_sequencer)
+    filepath = export_torchscript(model, str(tmpdir / "model.pt"))
+    extra_files = {METADATA_FILENAME: ""}
+    traced = torch.jit.load(filepath, _extra_files=extra_files)
+    metadata = json.loads(extra_files[METADATA_FILENAME])
+    assert metadata == ExportableCRNN(model).metadata
+    # the batch size, the height and the width are dynamic
+    for n, h, w in (3, 37, 50), (1, 13, 90), (4, 64, 17):
+        x, widths = get_batch(n, metadata["input_height"] or h, w)
+        with torch.no_grad():
+            y, ys = traced(x, widths)
+        assert_close_to_expected(y, ys, *get_expected(model, x, widths))
+
+
+@pytest.mark.parametrize("image_sequencer", ["avgpool-4", "maxpool-3", "none-5"])
+def test_export_onnx(tmpdir, image_sequencer):
+    onnx = pytest.importorskip("onnx")
+    onnxruntime = pytest.importorskip("onnxruntime")
+    model = get_model(image_sequencer)
+    filepath = export_onnx(model, str(tmpdir / "model.onnx"))
+    props = {p.key: p.value for p in onnx.load(filepath).metadata_props}
+    metadata = json.loads(props[METADATA_FILENAME])
+    assert metadata == ExportableCRNN(model).metadata
+    session = onnxruntime.InferenceSession(filepath)
+    for n, h, w in (3, 37, 50), (1, 13, 90), (4, 64, 17):
+        x, widths = get_batch(n, metadata["input_height"] or h, w)
+        y, ys = session.run(None, {"images": x.numpy(), "widths": widths.numpy()})
+        assert_close_to_expected(
+            torch.from_numpy(y),
+            torch.from_numpy(ys),
+            *get_expected(model, x, widths),
+        )
@@ -0,0 +1,106 @@
+import copy
+
+import pytest
+import torch
+from torch.nn.utils.rnn import pad_packed_sequence
+
+from laia.data import PaddedTensor
+from laia.models.htr import ConvBlock, LaiaCRNN, optimize_for_inference
+from laia.models.htr.inference import fold_batchnorm, get_inference_model_kwargs
+
+
+def randomize_batchnorm(model):
+    # fresh batch normalizations are the identity, use non-trivial statistics
+    for module in model.modules():
+        if isinstance(module, torch.nn.BatchNorm2d):
+            module.running_mean.uniform_(-1, 1)
+            module.running_var.uniform_(0.5, 2)
+            torch.nn.init.uniform_(module.weight, 0.5, 2)
+            torch.nn.init.uniform_(module.bias, -1, 1)
+
+
+def crnn_kwargs(**kwargs):
+    default = dict(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16, 16],
+        cnn_kernel_size=[3, 3, 3],
+        cnn_stride=[1, 1, 1],
+        cnn_dilation=[1, 1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 3,
+        cnn_poolsize=[2, 2, 0],
+        cnn_dropout=[0.1, 0.2, 0.3],
+        cnn_batchnorm=[True, False, True],
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.5,
+        lin_dropout=0.5,
+    )
+    default.update(kwargs)
+    return default
+
+
+def test_fold_batchnorm():
+    torch.manual_seed(0)
+    block = ConvBlock(3, 5, batchnorm=True)
+    randomize_batchnorm(block)
+    block.eval()
+    x = torch.randn(2, 3, 9, 11)
+    expected = block(x)
+    fold_batchnorm(block)
+    assert block.batchnorm is None
+    assert block.conv.bias is not None
+    torch.testing.assert_close(block(x), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_fold_batchnorm_without_batchnorm():
+    block = ConvBlock(3, 5)
+    conv = block.conv
+    fold_batchnorm(block)
+    assert block.conv is conv
+
+
+@pytest.mark.parametrize("rnn_type", [torch.nn.LSTM, torch.nn.GRU])
+def test_optimize_for_inference(rnn_type):
+    torch.manual_seed(0)
+    model = LaiaCRNN(**crnn_kwargs(rnn_type=rnn_type))
+    randomize_batchnorm(model)
+    model.eval()
+    x = torch.randn(3, 1, 20, 40)
+    xs = torch.tensor([[20, 40], [15, 35], [18, 20]])
+    with torch.no_grad():
+        expected, expected_lengths = pad_packed_sequence(model(PaddedTensor(x, xs)))
+
+    optimized = optimize_for_inference(copy.deepcopy(model))
+    assert not optimized.training
+    assert not any(p.requires_grad for p in optimized.parameters())
+    assert all(block.batchnorm is None for block in optimized.conv)
+    assert all(block.dropout is None for block in optimized.conv)
+    assert all(block.activation.inplace for block in optimized.conv)
+    assert optimized.rnn.dropout == 0
+    y, lengths = pad_packed_sequence(optimized(PaddedTensor(x, xs)))
+    torch.testing.assert_close(lengths, expected_lengths)
+    torch.testing.assert_close(y, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_optimize_for_inference_is_idempotent():
+    torch.manual_seed(0)
+    model = optimize_for_inference(LaiaCRNN(**crnn_kwargs()))
+    x = torch.randn(1, 1, 20, 40)
+    expected = model(x)
+    torch.testing.assert_close(optimize_for_inference(model)(x), expected)
+
+
+def test_inference_model_kwargs_load_the_optimized_weights():
+    torch.manual_seed(0)
+    kwargs = crnn_kwargs()
+    model = LaiaCRNN(**kwargs)
+    randomize_batchnorm(model)
+    optimized = optimize_for_inference(model)
+    inference_model = LaiaCRNN(**get_inference_model_kwargs(kwargs))
+    inference_model.load_state_dict(optimized.state_dict())
+    inference_model.eval()
+    x = torch.randn(2, 1, 20, 40)
+    with torch.no_grad():
+        torch.testing.assert_close(inference_model(x), optimized(x))
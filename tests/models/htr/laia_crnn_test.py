@@ -288,5 +288,88 @@ def test_backprop(dtype, device, batch_data, batch_sizes, kwargs):
         ), f"Gradients for parameter {n} are close to 0 ({sp:g})"
 
 
+@pytest.mark.parametrize("vertical_text", [False, True])
+def test_padded_rnn(vertical_text):
+    kwargs = dict(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=[2, 2],
+        cnn_dropout=[0.0] * 2,
+        cnn_batchnorm=[False] * 2,
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.0,
+        lin_dropout=0.0,
+        vertical_text=vertical_text,
+    )
+    torch.manual_seed(0)
+    packed = LaiaCRNN(**kwargs)
+    padded = LaiaCRNN(padded_rnn=True, **kwargs)
+    padded.load_state_dict(packed.state_dict())
+    sizes = torch.tensor([[40, 40], [30, 25], [17, 17]])
+    x = torch.zeros(3, 1, 40, 40)
+    for i, (h, w) in enumerate(sizes.tolist()):
+        x[i, :, :h, :w] = torch.rand(1, h, w)
+    expected, expected_lengths = pad_packed_sequence(packed(PaddedTensor(x, sizes)))
+    y, lengths = padded(PaddedTensor(x, sizes))
+    torch.testing.assert_close(lengths, expected_lengths)
+    for i, n in enumerate(lengths.tolist()):
+        torch.testing.assert_close(y[:n, i], expected[:n, i])
+    # the padded sizes do not need to be sorted
+    y, lengths = padded(PaddedTensor(x.flip(0), sizes.flip(0)))
+    torch.testing.assert_close(lengths, expected_lengths.flip(0))
+    # unpadded tensors are not affected
+    torch.testing.assert_close(padded(x), packed(x))
+
+
+@pytest.mark.parametrize("padded_rnn", [False, True])
+@pytest.mark.parametrize(["conv_blocks", "rnn"], [(1, False), (2, True), (0, True)])
+def test_activation_checkpointing(padded_rnn, conv_blocks, rnn):
+    torch.manual_seed(0)
+    model = LaiaCRNN(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16, 16],
+        cnn_kernel_size=[3] * 3,
+        cnn_stride=[1] * 3,
+        cnn_dilation=[1] * 3,
+        cnn_activation=[torch.nn.LeakyReLU] * 3,
+        cnn_poolsize=[2, 2, 0],
+        cnn_dropout=[0.2] * 3,
+        cnn_batchnorm=[True] * 3,
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.5,
+        lin_dropout=0.5,
+        padded_rnn=padded_rnn,
+    ).train()
+    state = {k: v.clone() for k, v in model.state_dict().items()}
+    x = PaddedTensor(
+        torch.rand(3, 1, 16, 40), torch.tensor([[16, 40], [12, 30], [16, 17]])
+    )
+    outputs, grads = [], []
+    for settings in ((0, False), (conv_blocks, rnn)):
+        model.load_state_dict(state)
+        model.zero_grad()
+        model.set_activation_checkpointing(*settings)
+        torch.manual_seed(1)
+        y = model(x)
+        y.data.sum().backward()
+        outputs.append(y)
+        grads.append([p.grad for p in model.parameters()])
+    torch.testing.assert_close(outputs[1], outputs[0])
+    torch.testing.assert_close(grads[1], grads[0])
+    # nothing is recomputed without gradients
+    with torch.no_grad():
+        model(x)
+
+
 if __name__ == "__main__":
     unittest.main()
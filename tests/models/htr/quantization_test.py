@@ -0,0 +1,90 @@
+import copy
+
+import pytest
+import torch
+from torch.nn.utils.rnn import pad_packed_sequence
+
+from laia.data import PaddedTensor
+from laia.models.htr import LaiaCRNN, optimize_for_inference
+from laia.models.htr.quantization import quantize_conv_static, quantize_dynamic
+
+
+def crnn(**kwargs):
+    torch.manual_seed(0)
+    default = dict(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=[2, 2],
+        cnn_dropout=[0.0, 0.0],
+        cnn_batchnorm=[True, True],
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.0,
+        lin_dropout=0.0,
+    )
+    default.update(kwargs)
+    return optimize_for_inference(LaiaCRNN(**default))
+
+
+def padded_batch():
+    torch.manual_seed(1)
+    x = torch.rand(3, 1, 16, 40)
+    xs = torch.tensor([[16, 40], [16, 32], [16, 20]])
+    return PaddedTensor(x, xs)
+
+
+@pytest.mark.parametrize("rnn_type", [torch.nn.LSTM, torch.nn.GRU])
+def test_quantize_dynamic(rnn_type):
+    model = crnn(rnn_type=rnn_type)
+    x = padded_batch()
+    expected, expected_lengths = pad_packed_sequence(model(x))
+    quantized = quantize_dynamic(copy.deepcopy(model))
+    assert isinstance(
+        quantized.rnn,
+        (torch.ao.nn.quantized.dynamic.LSTM, torch.ao.nn.quantized.dynamic.GRU),
+    )
+    assert isinstance(quantized.linear, torch.ao.nn.quantized.dynamic.Linear)
+    # the convolutions are not quantized
+    assert type(quantized.conv[0].conv) is torch.nn.Conv2d
+    y, lengths = pad_packed_sequence(quantized(x))
+    torch.testing.assert_close(lengths, expected_lengths)
+    torch.testing.assert_close(y, expected, rtol=0, atol=0.05)
+
+
+@pytest.mark.parametrize("activation", [torch.nn.LeakyReLU, torch.nn.ReLU])
+def test_quantize_conv_static(activation):
+    model = crnn(cnn_activation=[activation] * 2)
+    x = padded_batch()
+    expected, expected_lengths = pad_packed_sequence(model(x))
+    quantized = quantize_conv_static(copy.deepcopy(model), [x])
+    assert all(
+        isinstance(block.conv, torch.ao.nn.quantized.Conv2d) for block in quantized.conv
+    )
+    # the rest of the model runs in floating point
+    assert type(quantized.rnn) is torch.nn.LSTM
+    y, lengths = pad_packed_sequence(quantized(x))
+    torch.testing.assert_close(lengths, expected_lengths)
+    torch.testing.assert_close(y, expected, rtol=0, atol=0.05)
+    # unpadded inputs
+    torch.testing.assert_close(quantized(x.data), model(x.data), rtol=0, atol=0.05)
+    # the sizes of the blocks are unchanged
+    assert quantized.get_min_valid_image_size(100) == model.get_min_valid_image_size(
+        100
+    )
+
+
+def test_quantize_conv_static_and_dynamic():
+    model = crnn()
+    x = padded_batch()
+    expected, _ = pad_packed_sequence(model(x))
+    quantized = quantize_conv_static(quantize_dynamic(copy.deepcopy(model)), [x])
+    assert isinstance(quantized.conv[0].conv, torch.ao.nn.quantized.Conv2d)
+    assert isinstance(quantized.linear, torch.ao.nn.quantized.dynamic.Linear)
+    y, _ = pad_packed_sequence(quantized(x))
+    torch.testing.assert_close(y, expected, rtol=0, atol=0.05)
@@ -0,0 +1,38 @@
+import torch
+
+from laia.data import PaddedTensor
+from laia.models.htr import ConvBlock
+from laia.nn.activation_checkpoint import checkpoint_activations
+
+
+def test_checkpoint_activations():
+    torch.manual_seed(0)
+    blocks = torch.nn.Sequential(
+        ConvBlock(1, 4, dropout=0.5, batchnorm=True, poolsize=2),
+        ConvBlock(4, 8, dropout=0.5, batchnorm=True),
+    ).train()
+    state = {k: v.clone() for k, v in blocks.state_dict().items()}
+    x = PaddedTensor(torch.rand(2, 1, 10, 12), torch.tensor([[10, 12], [7, 9]]))
+    outputs, grads, buffers = [], [], []
+    for f in (lambda x: blocks(x), lambda x: checkpoint_activations(blocks, x)):
+        blocks.load_state_dict(state)
+        blocks.zero_grad()
+        torch.manual_seed(1)
+        y = f(x)
+        y.data.sum().backward()
+        outputs.append(y)
+        grads.append([p.grad for p in blocks.parameters()])
+        buffers.append([b.clone() for b in blocks.buffers()])
+    assert isinstance(outputs[1], PaddedTensor)
+    torch.testing.assert_close(outputs[1].data, outputs[0].data)
+    torch.testing.assert_close(outputs[1].sizes, torch.tensor([[5, 6], [3, 4]]))
+    # same dropout masks, and the running statistics are only updated once
+    torch.testing.assert_close(grads[1], grads[0])
+    torch.testing.assert_close(buffers[1], buffers[0])
+
+
+def test_checkpoint_activations_function():
+    x = torch.rand(5, 3, requires_grad=True)
+    y = checkpoint_activations(torch.nn.functional.softplus, x)
+    (dx,) = torch.autograd.grad([y.sum()], [x])
+    torch.testing.assert_close(dx, torch.sigmoid(x))
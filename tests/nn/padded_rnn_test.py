@@ -0,0 +1,44 @@
+import pytest
+import torch
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+
+from laia.nn.padded_rnn import padded_rnn, reverse_padded_sequence
+
+
+def test_reverse_padded_sequence():
+    x = torch.tensor([[1, 2, 3, 4], [5, 6, 7, 0], [8, 0, 0, 0]]).t().unsqueeze(2)
+    y = reverse_padded_sequence(x, torch.tensor([4, 3, 1]))
+    expected = torch.tensor([[4, 3, 2, 1], [7, 6, 5, 0], [8, 0, 0, 0]])
+    torch.testing.assert_close(y.squeeze(2).t(), expected)
+    torch.testing.assert_close(reverse_padded_sequence(y, torch.tensor([4, 3, 1])), x)
+
+
+@pytest.mark.parametrize("rnn_type", [torch.nn.LSTM, torch.nn.GRU, torch.nn.RNN])
+@pytest.mark.parametrize("bidirectional", [False, True])
+@pytest.mark.parametrize("num_layers", [1, 3])
+def test_padded_rnn(rnn_type, bidirectional, num_layers):
+    torch.manual_seed(0)
+    rnn = rnn_type(5, 7, num_layers=num_layers, bidirectional=bidirectional)
+    lengths = torch.tensor([6, 9, 2, 9])
+    x = torch.randn(9, 4, 5, requires_grad=True)
+    y = padded_rnn(rnn, x, lengths)
+    expected, _ = pad_packed_sequence(
+        rnn(pack_padded_sequence(x, lengths, enforce_sorted=False))[0]
+    )
+    assert y.size() == (9, 4, 7 * (2 if bidirectional else 1))
+    mask = torch.arange(9).unsqueeze(1) < lengths
+    torch.testing.assert_close(y[mask], expected[mask])
+    # the gradients of the padding frames are zero
+    (dx,) = torch.autograd.grad([y[mask].sum()], [x])
+    (expected_dx,) = torch.autograd.grad([expected[mask].sum()], [x])
+    torch.testing.assert_close(dx, expected_dx)
+    assert not dx[~mask].any()
+
+
+def test_padded_rnn_raises():
+    with pytest.raises(ValueError, match="batch_first or proj_size"):
+        padded_rnn(
+            torch.nn.LSTM(5, 7, batch_first=True, bidirectional=True),
+            torch.randn(2, 3, 5),
+            torch.tensor([3, 2]),
+        )
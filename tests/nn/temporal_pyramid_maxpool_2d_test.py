@@ -1,7 +1,12 @@
+import pytest
 import torch
 
 from laia.data import PaddedTensor
 from laia.nn import TemporalPyramidMaxPool2d
+from laia.nn.temporal_pyramid_maxpool_2d import (
+    _adaptive_maxpool_2d,
+    _adaptive_maxpool_2d_per_sample,
+)
 
 
 def test_tensor():
@@ -58,3 +63,31 @@ def test_padded_tensor():
     # Check output and gradient w.r.t input
     torch.testing.assert_close(y, torch.tensor([[20.0, 18.0, 20.0]]))
     torch.testing.assert_close(dx, expected_dx)
+
+
+@pytest.mark.parametrize("output_sizes", [(1, 1), (1, 3), (2, 2), (3, 1), (4, 5)])
+@pytest.mark.parametrize("ties", [False, True])
+def test_adaptive_maxpool_2d_matches_per_sample(output_sizes, ties):
+    generator = torch.Generator().manual_seed(0)
+    x = torch.randn(6, 3, 9, 13, generator=generator)
+    if ties:
+        # few distinct values, so there are ties within the bins
+        x = x.round()
+    xs = torch.stack(
+        (
+            torch.randint(5, 10, (6,), generator=generator),
+            torch.randint(5, 14, (6,), generator=generator),
+        ),
+        dim=1,
+    )
+    x1 = x.clone().requires_grad_()
+    x2 = x.clone().requires_grad_()
+    y1 = _adaptive_maxpool_2d(x1, output_sizes, xs)
+    y2 = _adaptive_maxpool_2d_per_sample(x2, output_sizes, xs)
+    assert torch.equal(y1, y2)
+    dy = torch.randn(y1.size(), generator=generator)
+    (dx1,) = torch.autograd.grad([y1], [x1], [dy])
+    (dx2,) = torch.autograd.grad([y2], [x2], [dy])
+    # the gradients of overlapping bins can be summed in a different order
+    torch.testing.assert_close(dx1, dx2)
+    assert torch.equal(dx1 != 0, dx2 != 0)
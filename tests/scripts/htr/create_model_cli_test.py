@@ -143,7 +143,8 @@ crnn:
   rnn_units: 256
   rnn_dropout: 0.5
   rnn_type: LSTM
-  lin_dropout: 0.5"""
+  lin_dropout: 0.5
+  padded_rnn: false"""
 
 expected_syms = """<ctc> 0
 a 1
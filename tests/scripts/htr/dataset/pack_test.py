@@ -0,0 +1,27 @@
+from conftest import call_script
+from PIL import Image
+
+import laia.scripts.htr.dataset.pack as script
+from laia.data import PackedImageDataset
+from laia.utils import ImageLabelsStats
+
+
+def test_pack(tmpdir):
+    for i, width in enumerate((30, 50, 40)):
+        Image.new(mode="L", size=(width, 16)).save(str(tmpdir / f"tmp-{i}.png"))
+    (tmpdir / "train.txt").write_text("tmp-0 a b\ntmp-1 b\ntmp-2 c a\n", "utf-8")
+    args = [f"[{tmpdir}]", str(tmpdir / "train.txt"), str(tmpdir / "packed")]
+    _, stderr = call_script(script.__file__, args)
+    assert "Packed 3 images in 1 shard(s)" in stderr
+
+    dataset = PackedImageDataset(tmpdir / "packed")
+    assert len(dataset) == 3
+    assert dataset[1]["id"] == "tmp-1"
+    assert dataset[1]["txt"] == "b"
+    # the images are stored inverted
+    assert dataset[1]["img"].getextrema() == (255, 255)
+
+    stats = ImageLabelsStats(stage="fit", tables=[str(tmpdir / "packed")])
+    assert stats.widths == (30, 50, 40)
+    assert stats.heights == (16, 16, 16)
+    assert stats.character_set == {"a", "b", "c"}
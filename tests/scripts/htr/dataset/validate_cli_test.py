@@ -48,7 +48,12 @@ train:
   early_stopping_patience: 20
   gpu_stats: false
   augment_training: false
+  batched_augmentation: false
   log_to_wandb: false
+  pixels_per_step: null
+  activation_checkpointing: 0
+  activation_checkpointing_rnn: false
+  compile_model: false
 logging:
   fmt: '[%(asctime)s %(levelname)s %(name)s] %(message)s'
   level: INFO
@@ -83,6 +83,18 @@ data:
   color_mode: L
   num_workers: null
   reading_order: LTR
+  bucketing: false
+  num_buckets: 10
+  max_batch_pixels: null
+  index_cache_dir: null
+  img_cache_size: null
+  img_cache_dir: /dev/shm/pylaia-img-cache
+  streaming: false
+  uint8_pipeline: false
+  fixed_height: null
+  fixed_width: null
+  image_backend: pil
+  width_buckets: null
 logging:
   fmt: '[%(asctime)s %(levelname)s %(name)s] %(message)s'
   level: INFO
@@ -107,7 +119,14 @@ decode:
   tokens_path: null
   lexicon_path: null
   unk_token: <unk>
-  blank_token: <ctc>"""
+  blank_token: <ctc>
+  optimize_model: true
+  exported_model: null
+  quantize: null
+  quantize_calibration_batches: 8
+  chunk_width: null
+  chunk_context: 32
+  compile_model: false"""
 
 
 def test_config_output():
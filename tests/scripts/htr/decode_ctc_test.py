@@ -5,11 +5,14 @@ from unittest import mock
 import pytest
 import torch
 from conftest import call_script
+from PIL import Image
 from pytorch_lightning import seed_everything
 
-from laia.common.arguments import CommonArgs, DataArgs, DecodeArgs
+from laia.common.arguments import CommonArgs, DataArgs, DecodeArgs, TrainerArgs
 from laia.common.saver import ModelSaver
 from laia.dummies import DummyMNISTLines, DummyModel
+from laia.models.htr import LaiaCRNN
+from laia.models.htr.exportable_crnn import export_torchscript
 from laia.scripts.htr import decode_ctc as script
 
 
@@ -176,6 +179,140 @@ def test_segmentation(tmpdir, downloader, accelerator):
     assert all(l.startswith(e) for l, e in zip(lines, expected))
 
 
+@pytest.fixture
+def crnn_decode_inputs(tmpdir):
+    torch.manual_seed(0)
+    model_kwargs = dict(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=[2, 2],
+        cnn_dropout=[0.0, 0.0],
+        cnn_batchnorm=[False, False],
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=1,
+        rnn_dropout=0.0,
+        lin_dropout=0.0,
+    )
+    ModelSaver(tmpdir).save(LaiaCRNN, **model_kwargs)
+    model = LaiaCRNN(**model_kwargs)
+    ckpt = tmpdir / "model.ckpt"
+    torch.save(model.state_dict(), str(ckpt))
+    # prepare syms file
+    syms = tmpdir / "syms"
+    syms.write_text(
+        "\n".join(f"{c} {i}" for i, c in enumerate(["<ctc>", *"abcdefghijk"])),
+        "utf-8",
+    )
+    # prepare images and img list
+    img_dir = tmpdir / "imgs"
+    img_dir.mkdir()
+    for i, width in enumerate((30, 50, 40, 60, 20)):
+        Image.fromarray(
+            torch.randint(256, size=(16, width), dtype=torch.uint8).numpy()
+        ).save(str(img_dir / f"img-{i}.png"))
+    img_list = tmpdir / "img_list"
+    img_list.write_text("\n".join(f"img-{i}" for i in range(5)), "utf-8")
+    return model, str(ckpt), str(syms), str(img_list), str(img_dir)
+
+
+def decode_stdout(tmpdir, ckpt, syms, img_list, img_dir, decode):
+    stdout = StringIO()
+    with mock.patch("sys.stdout", new=stdout):
+        script.run(
+            syms,
+            img_list,
+            [img_dir],
+            common=CommonArgs(train_path=tmpdir, checkpoint=ckpt),
+            data=DataArgs(batch_size=2),
+            decode=decode,
+        )
+    return sorted(stdout.getvalue().strip().split("\n"))
+
+
+def test_decode_with_exported_model(tmpdir, crnn_decode_inputs):
+    model, *inputs = crnn_decode_inputs
+    exported_model = export_torchscript(model.eval(), str(tmpdir / "model.pt"))
+    expected = decode_stdout(tmpdir, *inputs, DecodeArgs())
+    lines = decode_stdout(tmpdir, *inputs, DecodeArgs(exported_model=exported_model))
+    assert [l.split(" ", maxsplit=1)[0] for l in lines] == [
+        f"img-{i}" for i in range(5)
+    ]
+    assert lines == expected
+
+
+@pytest.mark.parametrize("quantize", list(DecodeArgs.Quantization))
+def test_decode_quantized(tmpdir, crnn_decode_inputs, quantize):
+    _, *inputs = crnn_decode_inputs
+    lines = decode_stdout(
+        tmpdir,
+        *inputs,
+        DecodeArgs(quantize=quantize, quantize_calibration_batches=2),
+    )
+    assert [l.split(" ", maxsplit=1)[0] for l in lines] == [
+        f"img-{i}" for i in range(5)
+    ]
+
+
+def test_raises_static_quantization_with_streaming(tmpdir):
+    with pytest.raises(
+        AssertionError, match="static cannot be used with data.streaming"
+    ):
+        script.run(
+            "",
+            "/dev/stdin",
+            common=CommonArgs(train_path=tmpdir),
+            data=DataArgs(streaming=True),
+            decode=DecodeArgs(quantize=DecodeArgs.Quantization.static),
+        )
+
+
+@pytest.mark.parametrize("gpus", [1, "1", [0]])
+def test_raises_quantization_with_gpus(tmpdir, gpus):
+    with pytest.raises(AssertionError, match="cannot be used with trainer.gpus"):
+        script.run(
+            "",
+            "",
+            common=CommonArgs(train_path=tmpdir),
+            decode=DecodeArgs(quantize=DecodeArgs.Quantization.dynamic),
+            trainer=TrainerArgs(gpus=gpus),
+        )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"decode": DecodeArgs(exported_model="model.pt", chunk_width=64)},
+        {
+            "decode": DecodeArgs(
+                exported_model="model.pt",
+                quantize=DecodeArgs.Quantization.dynamic,
+            )
+        },
+        {
+            "decode": DecodeArgs(exported_model="model.pt"),
+            "trainer": TrainerArgs(gpus=1),
+        },
+    ],
+)
+def test_raises_exported_model_with_ignored_options(tmpdir, kwargs):
+    with pytest.raises(AssertionError, match="decode.exported_model cannot be used"):
+        script.run("", "", common=CommonArgs(train_path=tmpdir), **kwargs)
+
+
+def test_decode_chunked(tmpdir, crnn_decode_inputs):
+    _, *inputs = crnn_decode_inputs
+    lines = decode_stdout(tmpdir, *inputs, DecodeArgs(chunk_width=40, chunk_context=1))
+    assert [l.split(" ", maxsplit=1)[0] for l in lines] == [
+        f"img-{i}" for i in range(5)
+    ]
+
+
 def test_raises(tmpdir):
     # generate a model and a checkpoint
     model_args = [(1, 1), 1]
@@ -0,0 +1,155 @@
+import pytest
+import torch
+from PIL import Image
+
+from laia.common.arguments import (
+    CommonArgs,
+    DataArgs,
+    DistillArgs,
+    TrainArgs,
+    TrainerArgs,
+)
+from laia.common.loader import ModelLoader
+from laia.common.saver import ModelSaver
+from laia.models.htr import LaiaCRNN
+from laia.scripts.htr import distill
+from laia.scripts.htr import train_ctc as script
+from laia.utils import ArchiveMatrixWriter
+
+
+def crnn_kwargs(cnn_poolsize, rnn_units):
+    return dict(
+        num_input_channels=1,
+        num_output_labels=4,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=cnn_poolsize,
+        cnn_dropout=[0.0, 0.0],
+        cnn_batchnorm=[False, False],
+        image_sequencer="avgpool-4",
+        rnn_units=rnn_units,
+        rnn_layers=1,
+        rnn_dropout=0.0,
+        lin_dropout=0.0,
+    )
+
+
+@pytest.fixture
+def distill_inputs(tmpdir):
+    torch.manual_seed(0)
+    # the student downsamples the width by 2, the teacher by 4
+    ModelSaver(tmpdir / "student").save(LaiaCRNN, **crnn_kwargs([2, [2, 1]], 8))
+    teacher_kwargs = crnn_kwargs([2, 2], 16)
+    ModelSaver(tmpdir / "teacher").save(LaiaCRNN, **teacher_kwargs)
+    teacher = LaiaCRNN(**teacher_kwargs)
+    teacher_ckpt = tmpdir / "teacher.ckpt"
+    torch.save(teacher.state_dict(), str(teacher_ckpt))
+    syms = tmpdir / "syms"
+    syms.write_text("<ctc> 0\na 1\nb 2\n<space> 3", "utf-8")
+    img_dir = tmpdir / "imgs"
+    img_dir.mkdir()
+    tables = {"tr": [], "va": []}
+    for i, width in enumerate((40, 60, 50, 30, 44, 36)):
+        Image.fromarray(
+            torch.randint(256, size=(16, width), dtype=torch.uint8).numpy()
+        ).save(str(img_dir / f"img-{i}.png"))
+        tables["tr" if i < 4 else "va"].append(f"img-{i} a b a")
+    for split, lines in tables.items():
+        (tmpdir / f"{split}.txt").write_text("\n".join(lines), "utf-8")
+    return (
+        teacher,
+        str(teacher_ckpt),
+        str(syms),
+        [str(img_dir)],
+        str(tmpdir / "tr.txt"),
+        str(tmpdir / "va.txt"),
+    )
+
+
+def run_distill(tmpdir, syms, img_dirs, tr_txt_table, va_txt_table, distill_args):
+    script.run(
+        syms,
+        img_dirs,
+        tr_txt_table,
+        va_txt_table,
+        common=CommonArgs(train_path=str(tmpdir / "student")),
+        data=DataArgs(batch_size=2),
+        train=TrainArgs(checkpoint_k=1),
+        trainer=TrainerArgs(max_epochs=1, weights_summary=None),
+        distill=distill_args,
+    )
+    # the student is loaded from its checkpoints as usual
+    loader = ModelLoader(str(tmpdir / "student"), device="cpu")
+    checkpoint = loader.prepare_checkpoint(
+        "epoch=0-last.ckpt", str(tmpdir / "student" / "experiment"), "va_cer"
+    )
+    student = loader.load_by(checkpoint)
+    assert isinstance(student, LaiaCRNN)
+    assert "teacher" not in torch.load(checkpoint)["hyper_parameters"]
+
+
+def test_distill_from_model(tmpdir, distill_inputs):
+    _, teacher_ckpt, *inputs = distill_inputs
+    run_distill(
+        tmpdir,
+        *inputs,
+        DistillArgs(
+            teacher_train_path=str(tmpdir / "teacher"),
+            teacher_checkpoint=teacher_ckpt,
+            alpha=0.7,
+            temperature=2.0,
+        ),
+    )
+
+
+def test_distill_from_matrix(tmpdir, distill_inputs):
+    teacher, _, *inputs = distill_inputs
+    with torch.no_grad():
+        outputs = {
+            f"img-{i}": teacher(torch.rand(1, 1, 16, width))[:, 0].softmax(-1)
+            for i, width in enumerate((40, 60, 50, 30))
+        }
+    matrix = str(tmpdir / "teacher.ark")
+    ArchiveMatrixWriter(matrix).write_iterable(outputs.items())
+    run_distill(tmpdir, *inputs, DistillArgs(teacher_matrix=matrix))
+
+
+def test_raises_teacher_with_other_labels(tmpdir, distill_inputs):
+    _, _, *inputs = distill_inputs
+    teacher_kwargs = crnn_kwargs([2, 2], 16)
+    teacher_kwargs["num_output_labels"] = 5
+    ModelSaver(tmpdir / "teacher").save(LaiaCRNN, **teacher_kwargs)
+    teacher_ckpt = tmpdir / "teacher5.ckpt"
+    torch.save(LaiaCRNN(**teacher_kwargs).state_dict(), str(teacher_ckpt))
+    with pytest.raises(AssertionError, match="The teacher has 5 output labels"):
+        run_distill(
+            tmpdir,
+            *inputs,
+            DistillArgs(
+                teacher_train_path=str(tmpdir / "teacher"),
+                teacher_checkpoint=str(teacher_ckpt),
+            ),
+        )
+
+    matrix = str(tmpdir / "teacher.ark")
+    ArchiveMatrixWriter(matrix).write_iterable([("img-0", torch.randn(5, 5))])
+    with pytest.raises(AssertionError, match="matrices of width 5"):
+        run_distill(tmpdir, *inputs, DistillArgs(teacher_matrix=matrix))
+
+
+def test_get_args():
+    args = distill.get_args(
+        [
+            "syms",
+            "[]",
+            "tr.txt",
+            "va.txt",
+            "--distill.teacher_matrix=teacher.ark",
+            "--distill.alpha=0.8",
+        ]
+    )
+    assert args["distill"] == DistillArgs(teacher_matrix="teacher.ark", alpha=0.8)
+    assert args["train"] == TrainArgs()
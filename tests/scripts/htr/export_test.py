@@ -0,0 +1,101 @@
+import pytest
+import torch
+
+from laia.common.arguments import CommonArgs, ExportArgs
+from laia.common.loader import ModelLoader
+from laia.common.saver import ModelSaver
+from laia.dummies import DummyModel
+from laia.models.htr import LaiaCRNN
+from laia.scripts.htr import export as script
+
+
+def test_export(tmpdir):
+    torch.manual_seed(0)
+    kwargs = dict(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=[2, 2],
+        cnn_dropout=[0.0, 0.2],
+        cnn_batchnorm=[True, True],
+        image_sequencer="avgpool-4",
+        rnn_units=16,
+        rnn_layers=2,
+        rnn_dropout=0.5,
+        lin_dropout=0.5,
+    )
+    ModelSaver(tmpdir).save(LaiaCRNN, **kwargs)
+    model = LaiaCRNN(**kwargs)
+    for block in model.conv:
+        block.batchnorm.running_mean.uniform_(-1, 1)
+        block.batchnorm.running_var.uniform_(0.5, 2)
+    ckpt = tmpdir / "model.ckpt"
+    torch.save(model.state_dict(), str(ckpt))
+
+    filepaths = script.run(
+        common=CommonArgs(train_path=tmpdir, checkpoint=str(ckpt)),
+        export=ExportArgs(model_filename="exported"),
+    )
+    weights = str(tmpdir / "exported.ckpt")
+    assert filepaths == [str(tmpdir / "exported"), weights]
+
+    exported = ModelLoader(tmpdir, filename="exported").load_by(weights)
+    assert isinstance(exported, LaiaCRNN)
+    assert all(block.batchnorm is None for block in exported.conv)
+    model.eval()
+    exported.eval()
+    x = torch.randn(2, 1, 16, 32)
+    with torch.no_grad():
+        torch.testing.assert_close(exported(x), model(x), rtol=1e-4, atol=1e-5)
+
+
+def test_export_torchscript(tmpdir):
+    torch.manual_seed(0)
+    kwargs = dict(
+        num_input_channels=1,
+        num_output_labels=12,
+        cnn_num_features=[8, 16],
+        cnn_kernel_size=[3, 3],
+        cnn_stride=[1, 1],
+        cnn_dilation=[1, 1],
+        cnn_activation=[torch.nn.LeakyReLU] * 2,
+        cnn_poolsize=[2, 2],
+        cnn_dropout=[0.0, 0.0],
+        cnn_batchnorm=[False, False],
+        image_sequencer="maxpool-4",
+        rnn_units=16,
+        rnn_layers=1,
+        rnn_dropout=0.0,
+        lin_dropout=0.0,
+    )
+    ModelSaver(tmpdir).save(LaiaCRNN, **kwargs)
+    model = LaiaCRNN(**kwargs)
+    ckpt = tmpdir / "model.ckpt"
+    torch.save(model.state_dict(), str(ckpt))
+
+    filepaths = script.run(
+        common=CommonArgs(train_path=tmpdir, checkpoint=str(ckpt)),
+        export=ExportArgs(formats=[ExportArgs.Format.torchscript]),
+    )
+    assert filepaths == [str(tmpdir / "model_inference.pt")]
+    exported = torch.jit.load(filepaths[0])
+    model.eval()
+    x = torch.randn(2, 1, 16, 32)
+    with torch.no_grad():
+        y, ys = exported(x, torch.tensor([32, 32]))
+        torch.testing.assert_close(y, model(x), rtol=1e-4, atol=1e-5)
+    assert ys.tolist() == [8, 8]
+
+
+def test_raises(tmpdir):
+    model_args = [(1, 1), 1]
+    ModelSaver(tmpdir).save(DummyModel, *model_args)
+    ckpt = tmpdir / "model.ckpt"
+    torch.save(DummyModel(*model_args).state_dict(), str(ckpt))
+
+    with pytest.raises(AssertionError, match="Only LaiaCRNN models"):
+        script.run(common=CommonArgs(train_path=tmpdir, checkpoint=str(ckpt)))
@@ -57,6 +57,18 @@ data:
   color_mode: L
   num_workers: null
   reading_order: LTR
+  bucketing: false
+  num_buckets: 10
+  max_batch_pixels: null
+  index_cache_dir: null
+  img_cache_size: null
+  img_cache_dir: /dev/shm/pylaia-img-cache
+  streaming: false
+  uint8_pipeline: false
+  fixed_height: null
+  fixed_width: null
+  image_backend: pil
+  width_buckets: null
 logging:
   fmt: '[%(asctime)s %(levelname)s %(name)s] %(message)s'
   level: INFO
@@ -67,7 +79,9 @@ netout:
   output_transform: null
   matrix: null
   lattice: null
-  digits: 10"""
+  digits: 10
+  optimize_model: true
+  compile_model: false"""
 
 
 def test_config_output():
@@ -91,6 +91,18 @@ data:
   color_mode: L
   num_workers: null
   reading_order: LTR
+  bucketing: false
+  num_buckets: 10
+  max_batch_pixels: null
+  index_cache_dir: null
+  img_cache_size: null
+  img_cache_dir: /dev/shm/pylaia-img-cache
+  streaming: false
+  uint8_pipeline: false
+  fixed_height: null
+  fixed_width: null
+  image_backend: pil
+  width_buckets: null
 train:
   delimiters:
   - <space>
@@ -101,7 +113,12 @@ train:
   early_stopping_patience: 20
   gpu_stats: false
   augment_training: false
+  batched_augmentation: false
   log_to_wandb: false
+  pixels_per_step: null
+  activation_checkpointing: 0
+  activation_checkpointing_rnn: false
+  compile_model: false
 logging:
   fmt: '[%(asctime)s %(levelname)s %(name)s] %(message)s'
   level: INFO
@@ -276,3 +276,20 @@ def test_raises(tmpdir):
             common=CommonArgs(train_path=tmpdir),
             train=TrainArgs(delimiters=["<space>", "TEST"]),
         )
+
+
+def test_raises_pixels_per_step_with_accumulate_grad_batches(tmpdir):
+    prepare_model(tmpdir, "avgpool-8")
+    syms = tmpdir / "syms"
+    syms.write_text("<ctc> 0\n<space> 1", "utf-8")
+    with pytest.raises(AssertionError, match="cannot be used together"):
+        script.run(
+            str(syms),
+            [],
+            "",
+            "",
+            common=CommonArgs(train_path=tmpdir),
+            data=DataArgs(max_batch_pixels=1000),
+            train=TrainArgs(pixels_per_step=4000),
+            trainer=TrainerArgs(accumulate_grad_batches=2),
+        )
@@ -104,3 +104,29 @@ def test_archive_lattice_writer_write_iterable(tmpdir, device):
         "1\t2\t1\t1\t0,-5.0\n"
         "2\t0,0\n\n"
     )
+
+
+def test_archive_matrix_reader(tmpdir):
+    f = tmpdir / "matrix"
+    matrices = {
+        "key1": torch.rand(7, 9, dtype=torch.float),
+        "longerkey": torch.rand(8, 8, dtype=torch.double),
+        "key3": torch.rand(0, 3, dtype=torch.float),
+    }
+    kaldi.ArchiveMatrixWriter(f).write_iterable(matrices.items())
+    reader = kaldi.ArchiveMatrixReader(f)
+    assert len(reader) == 3
+    assert list(reader) == list(matrices)
+    assert "key1" in reader and "key2" not in reader
+    for key, matrix in matrices.items():
+        torch.testing.assert_close(reader[key], matrix)
+
+
+@pytest.mark.parametrize("size", [9, 10, 13, 20, -1])
+def test_archive_matrix_reader_truncated(tmpdir, size):
+    f = tmpdir / "matrix"
+    kaldi.ArchiveMatrixWriter(f).write("line_0001", torch.rand(2, 3))
+    data = f.read_binary()
+    f.write_binary(data[:size])
+    with pytest.raises(ValueError, match="Truncated archive"):
+        kaldi.ArchiveMatrixReader(f)
@@ -1,3 +1,5 @@
+import os
+
 import pytest
 from PIL import Image
 
@@ -158,3 +160,33 @@ def test_img_stats(
     assert img_stats.get_invalid_images_height(expected_height) == [
         str(tmpdir / filename) for filename in expected_filenames_invalid_height
     ]
+
+
+def test_img_stats_sizes(tmpdir):
+    prepare_data(tmpdir, IMG_SIZES_VALID)
+    img_stats = ImageLabelsStats(
+        stage="fit",
+        tables=[str(tmpdir / "train.txt")],
+        img_dirs=[tmpdir],
+    )
+    assert img_stats.sizes == {
+        str(tmpdir / "tmp-0.jpg"): (128, 1000),
+        str(tmpdir / "tmp-1.jpg"): (128, 2000),
+        str(tmpdir / "tmp-2.jpg"): (128, 1500),
+    }
+
+
+def test_img_stats_size_index(tmpdir):
+    prepare_data(tmpdir, IMG_SIZES_VALID)
+    ImageLabelsStats(stage="fit", tables=[str(tmpdir / "train.txt")], img_dirs=[tmpdir])
+    lines = (tmpdir / "train.txt.sizes").read_text("utf-8").splitlines()
+    assert [line.split("\t")[0] for line in lines] == ["tmp-0", "tmp-1", "tmp-2"]
+    # the sizes are read from the index
+    (tmpdir / "tmp-0.jpg").remove()
+    Image.new(mode="L", size=(10, 10)).save(str(tmpdir / "tmp-0.jpg"))
+    mtime = int(lines[0].split("\t")[-1])
+    os.utime(str(tmpdir / "tmp-0.jpg"), ns=(mtime, mtime))
+    img_stats = ImageLabelsStats(
+        stage="fit", tables=[str(tmpdir / "train.txt")], img_dirs=[tmpdir]
+    )
+    assert img_stats.widths == (1000, 2000, 1500)